@@ -0,0 +1,648 @@
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tracemalloc
+import numpy as np
+import pandas as pd
+from custom_package.merge_datasets import MergeDatasets
+from custom_package.data_preprocessing import PreprocessData
+from custom_package.standardize import Standardize
+from custom_package.code_counter import CountCodes
+from custom_package.response_encoder import ResponseEncoder
+from custom_package.one_hot_encoder import OneHotEncoder, SparseOneHotEncoder
+from custom_package.provider_features import ProviderFeatureStore
+from custom_package.compiled_model import CompileModel
+from custom_package.score_cache import ScoreCache, ScoreClaimsWithCache
+from custom_package.code_sketch import TopCodeSketch
+from custom_package.feature_kernels import ComputeAge, ComputeIsNotNull, ComputePhysicianCounts, \
+    ComputeIsSamePhysMultiRole
+from benchmarks.reference import encodeCatFeaturesLoop, getLegacyFeatures, fitResponseTableLoop
+from benchmarks.synthetic import FEATURES_TO_STD, GenerateCodeFeatures, GenerateBeneficiaryDates, \
+    GenerateStateCountry, GenerateProviderClaims, GenerateDatasets
+
+#region - Benchmarks--------------------------------------------------------------------------------------------------
+#=====================================================================================================================
+
+def BenchmarkCountCodes(listCountDatapoints=(10000, 100000), repeat=3, randomState=0):
+    '''
+    Compares the time taken by the original loop ('encodeCatFeatures') and by the 'CountCodes' function to encode the
+    top Physicians, Claim Diagnosis Codes and Claim Procedure Codes, after checking that both give identical features.
+    Returns a DataFrame with the best time (in seconds) of each implementation and the speedup.
+
+    Parameters:
+    ----------
+    listCountDatapoints: iterable
+        Number of datapoints of each of the synthetic datasets to benchmark.
+    repeat: int
+        Number of times each implementation is run. The best time is reported.
+    randomState: int
+        Seed of the random number generator.
+    '''
+
+    listResults = list() # List to store the result of each benchmark run.
+
+    for countDatapoints in listCountDatapoints:
+
+        data, codeGroups = GenerateCodeFeatures(countDatapoints, randomState)
+
+        timeLoop, timeVectorized = np.inf, np.inf
+
+        for _ in range(repeat):
+
+            dataLoop = data.copy()
+            startTime = time.perf_counter()
+            for existingFeatures, newFeatures, prefix in codeGroups:
+                dataLoop = encodeCatFeaturesLoop(dataLoop, existingFeatures, newFeatures, prefix)
+            timeLoop = min(timeLoop, time.perf_counter() - startTime)
+
+            startTime = time.perf_counter()
+            dataCodeCount = CountCodes(data, codeGroups)
+            timeVectorized = min(timeVectorized, time.perf_counter() - startTime)
+
+        # Check that both the implementations give identical features
+        pd.testing.assert_frame_equal(dataLoop[list(dataCodeCount.columns)], dataCodeCount)
+
+        listResults.append({'Datapoints': countDatapoints, 'LoopTime': timeLoop, 'CountCodesTime': timeVectorized,
+                            'Speedup': timeLoop/timeVectorized})
+
+    return pd.DataFrame(listResults)
+
+def BenchmarkFeatureKernels(countDatapoints=100000, repeat=3, randomState=0):
+    '''
+    Checks that each of the feature kernels ('ComputeAge', 'ComputeIsNotNull', 'ComputePhysicianCounts' and
+    'ComputeIsSamePhysMultiRole') gives the same values as the original row-wise 'apply' implementation, and reports
+    the best time (in seconds) of both the implementations for each feature.
+
+    Parameters:
+    ----------
+    countDatapoints: int
+        Number of datapoints of the synthetic dataset.
+    repeat: int
+        Number of times each implementation is run. The best time is reported.
+    randomState: int
+        Seed of the random number generator.
+    '''
+
+    dataCodes, codeGroups = GenerateCodeFeatures(countDatapoints, randomState)
+    dataDates, maxDate = GenerateBeneficiaryDates(countDatapoints, randomState)
+    data = pd.concat([dataCodes, dataDates], axis=1)
+
+    colPhys = codeGroups[0][0]
+
+    def physicianCount(index):
+        return lambda: ComputePhysicianCounts(data, colPhys)[index]
+
+    def isSamePhysMultiRole(countUnique):
+        def compute():
+            uniquePhysCount, physRoleCount = ComputePhysicianCounts(data, colPhys)
+            return ComputeIsSamePhysMultiRole(uniquePhysCount, physRoleCount, countUnique)
+        return compute
+
+    dictKernels = {
+        'Age': lambda: ComputeAge(data['DOB'], data['DOD'], maxDate),
+        'IsDead': lambda: ComputeIsNotNull(data['DOD']),
+        'UniquePhysCount': physicianCount(0),
+        'PhysRoleCount': physicianCount(1),
+        'IsSamePhysMultiRole1': isSamePhysMultiRole(1),
+        'IsSamePhysMultiRole2': isSamePhysMultiRole(2),
+        'ClmDiagnosisCode_1': lambda: ComputeIsNotNull(data['ClmDiagnosisCode_1'])
+    }
+
+    listResults = list() # List to store the result of each feature.
+
+    for feature, computeLegacy in getLegacyFeatures(data, colPhys, maxDate).items():
+
+        timeLegacy, timeKernel = np.inf, np.inf
+
+        for _ in range(repeat):
+
+            startTime = time.perf_counter()
+            valuesLegacy = computeLegacy()
+            timeLegacy = min(timeLegacy, time.perf_counter() - startTime)
+
+            startTime = time.perf_counter()
+            valuesKernel = dictKernels[feature]()
+            timeKernel = min(timeKernel, time.perf_counter() - startTime)
+
+        # Check that both the implementations give the same values
+        np.testing.assert_array_equal(np.asarray(valuesLegacy, dtype=int), valuesKernel, err_msg=feature)
+
+        listResults.append({'Feature': feature, 'Datapoints': countDatapoints, 'ApplyTime': timeLegacy,
+                            'KernelTime': timeKernel, 'Speedup': timeLegacy/timeKernel})
+
+    return pd.DataFrame(listResults)
+
+def BenchmarkResponseEncoderFit(listCountDatapoints=(10000, 100000, 1000000), repeat=3, legacyMaxDatapoints=100000,
+                                randomState=0):
+    '''
+    Reports the best time (in seconds) of the 'fit' method of ResponseEncoder on the 'State' and 'Country' features for
+    each dataset size, along with the time per million datapoints to show that the time grows linearly with the number
+    of datapoints. For the datasets up to 'legacyMaxDatapoints' datapoints, the original implementation is also timed and
+    its Response Tables are checked to be identical.
+
+    Parameters:
+    ----------
+    listCountDatapoints: iterable
+        Number of datapoints of each of the synthetic datasets to benchmark.
+    repeat: int
+        Number of times each implementation is run. The best time is reported.
+    legacyMaxDatapoints: int
+        Maximum number of datapoints for which the original implementation is run.
+    randomState: int
+        Seed of the random number generator.
+    '''
+
+    listResults = list() # List to store the result of each benchmark run.
+
+    for countDatapoints in listCountDatapoints:
+
+        X, y = GenerateStateCountry(countDatapoints, randomState)
+
+        timeFit = np.inf
+        for _ in range(repeat):
+            encoder = ResponseEncoder(categoricalFeatures=['State', 'Country'], className='PotentialFraud')
+            startTime = time.perf_counter()
+            encoder.fit(X, y)
+            timeFit = min(timeFit, time.perf_counter() - startTime)
+
+        result = {'Datapoints': countDatapoints, 'FitTime': timeFit, 'FitTimePerMillion': timeFit*1e6/countDatapoints,
+                  'LegacyFitTime': np.nan}
+
+        if countDatapoints <= legacyMaxDatapoints:
+
+            startTime = time.perf_counter()
+            responseTable = fitResponseTableLoop(X, y, ['State', 'Country'], 'PotentialFraud')
+            result['LegacyFitTime'] = time.perf_counter() - startTime
+
+            # Check that both the implementations give identical Response Tables
+            for feature in ['State', 'Country']:
+                pd.testing.assert_frame_equal(responseTable[feature], encoder.responseTable[feature])
+
+        listResults.append(result)
+
+    return pd.DataFrame(listResults)
+
+def BenchmarkOneHotEncoder(countDatapoints=1000000, repeat=1, randomState=0):
+    '''
+    Compares the time taken by the 'fit' and 'transform' methods of OneHotEncoder (CountVectorizer based) and of
+    SparseOneHotEncoder to one-hot encode the 'State' and 'Country' features, along with 3 numerical features, after
+    checking that both give the same sparse matrix. Returns a DataFrame with the best time (in seconds) of each method.
+
+    Parameters:
+    ----------
+    countDatapoints: int
+        Number of datapoints of the synthetic dataset.
+    repeat: int
+        Number of times each implementation is run. The best time is reported.
+    randomState: int
+        Seed of the random number generator.
+    '''
+
+    X, _ = GenerateStateCountry(countDatapoints, randomState)
+
+    rng = np.random.default_rng(randomState)
+    for col in ['Age', 'TotalClaimAmount', 'PhysRoleCount']:
+        X[col] = rng.integers(0, 100, countDatapoints)
+
+    listResults = list() # List to store the result of each implementation.
+    listMatrices = list() # List to store the matrix returned by each implementation.
+
+    for name, encoderClass in [('OneHotEncoder', OneHotEncoder), ('SparseOneHotEncoder', SparseOneHotEncoder)]:
+
+        timeFit, timeTransform = np.inf, np.inf
+
+        for _ in range(repeat):
+
+            encoder = encoderClass(categoricalFeatures=['State', 'Country'])
+
+            startTime = time.perf_counter()
+            encoder.fit(X)
+            timeFit = min(timeFit, time.perf_counter() - startTime)
+
+            startTime = time.perf_counter()
+            xEncoded = encoder.transform(X)
+            timeTransform = min(timeTransform, time.perf_counter() - startTime)
+
+        listMatrices.append(xEncoded)
+        listResults.append({'Encoder': name, 'Datapoints': countDatapoints, 'FitTime': timeFit,
+                            'TransformTime': timeTransform})
+
+    # Check that both the implementations give the same matrix
+    assert listMatrices[0].shape == listMatrices[1].shape and (listMatrices[0] != listMatrices[1]).nnz == 0
+
+    return pd.DataFrame(listResults)
+
+def BenchmarkProviderFeatureStore(countDatapoints=1000000, countDeltaDatapoints=10000, randomState=0):
+    '''
+    Compares the time taken to recompute the Provider aggregate features over all the claims (history and daily delta)
+    with the time taken to update a ProviderFeatureStore of the history with the delta only, after checking that both
+    give the same features. Returns a DataFrame with the time (in seconds) of each approach.
+
+    Parameters:
+    ----------
+    countDatapoints: int
+        Number of claims of the history.
+    countDeltaDatapoints: int
+        Number of claims of the delta.
+    randomState: int
+        Seed of the random number generator.
+    '''
+
+    data = GenerateProviderClaims(countDatapoints + countDeltaDatapoints, randomState)
+    dataHistory, dataDelta = data.iloc[:countDatapoints], data.iloc[countDatapoints:]
+
+    startTime = time.perf_counter()
+    featuresFull = ProviderFeatureStore().update(data).getFeatures()
+    timeFull = time.perf_counter() - startTime
+
+    store = ProviderFeatureStore().update(dataHistory)
+
+    startTime = time.perf_counter()
+    featuresIncremental = store.update(dataDelta).getFeatures()
+    timeIncremental = time.perf_counter() - startTime
+
+    # Check that both the approaches give the same features
+    pd.testing.assert_frame_equal(featuresFull.sort_index(), featuresIncremental.sort_index())
+
+    return pd.DataFrame([{'HistoryDatapoints': countDatapoints, 'DeltaDatapoints': countDeltaDatapoints,
+                          'FullRecomputeTime': timeFull, 'IncrementalUpdateTime': timeIncremental,
+                          'Speedup': timeFull/timeIncremental}])
+
+def BenchmarkStandardize(countDatapoints=1000000, countChunks=10, repeat=3, randomState=0):
+    '''
+    Compares the standardization of the numerical features done by Standardize.transform (float64 DataFrame copy) with
+    the float32 transform and with the no-copy transformArray of a float32 dataset, and checks that the running mean and
+    variance of partial_fit over chunks (merged across two halves of the chunks) give the same standardization as fit.
+    Returns a DataFrame with the best time (in seconds) and the size (in bytes) of the output of each method.
+
+    Parameters:
+    ----------
+    countDatapoints: int
+        Number of datapoints of the synthetic dataset.
+    countChunks: int
+        Number of chunks given to partial_fit.
+    repeat: int
+        Number of times each method is run. The best time is reported.
+    randomState: int
+        Seed of the random number generator.
+    '''
+
+    rng = np.random.default_rng(randomState)
+    X = pd.DataFrame(rng.integers(0, 1000, (countDatapoints, len(FEATURES_TO_STD))), columns=FEATURES_TO_STD)
+
+    standardize = Standardize(FEATURES_TO_STD).fit(X)
+
+    # Fit over chunks, in two parts merged at the end (as done by two worker processes)
+    listChunks = np.array_split(np.arange(countDatapoints), countChunks)
+    standardizeFirst, standardizeSecond = Standardize(FEATURES_TO_STD), Standardize(FEATURES_TO_STD)
+
+    for i, rows in enumerate(listChunks):
+        (standardizeFirst if i < countChunks//2 else standardizeSecond).partial_fit(X.iloc[rows])
+
+    standardizeFirst.merge(standardizeSecond)
+
+    assert np.allclose(standardizeFirst.standardScaler.mean_, standardize.standardScaler.mean_) and \
+           np.allclose(standardizeFirst.standardScaler.scale_, standardize.standardScaler.scale_)
+
+    X32 = X.astype(np.float32)
+    standardize32 = Standardize(FEATURES_TO_STD, dtype=np.float32).fit(X)
+    standardizeInPlace = Standardize(FEATURES_TO_STD, dtype=np.float32, copy=False).fit(X)
+
+    listResults = list() # List to store the result of each method.
+
+    for name, function in [('transform', lambda: standardize.transform(X)),
+                           ('transform float32', lambda: standardize32.transform(X)),
+                           # Standardizes X32 in place (again at each run, which takes the same time)
+                           ('transformArray float32 no-copy', lambda: standardizeInPlace.transformArray(X32))]:
+
+        bestTime = np.inf
+
+        for _ in range(repeat):
+
+            startTime = time.perf_counter()
+            output = function()
+            bestTime = min(bestTime, time.perf_counter() - startTime)
+
+        outputBytes = output.nbytes if isinstance(output, np.ndarray) else int(output.memory_usage(index=False).sum())
+        listResults.append({'Method': name, 'Datapoints': countDatapoints, 'Time': bestTime, 'OutputBytes': outputBytes})
+
+    return pd.DataFrame(listResults)
+
+def BenchmarkCompiledModel(listBatchSizes=(1, 100, 100000), countTrainDatapoints=10000, repeat=20, randomState=0):
+    '''
+    Compares the latency of the 'predict_proba' of a calibrated tree Model (XGBoost when it is installed, otherwise the
+    gradient boosting of sklearn, in a CalibratedClassifierCV) with the latency of its CompiledModel, for batches of
+    featurized datapoints of each size, after checking that both give the same probabilities (within 1e-6). Returns a
+    DataFrame with the best time (in milliseconds) of each implementation for each batch size.
+
+    Parameters:
+    ----------
+    listBatchSizes: iterable
+        Numbers of datapoints scored at once.
+    countTrainDatapoints: int
+        Number of datapoints used to train the Model.
+    repeat: int
+        Number of times each batch is scored (at least 3 times for the large batches). The best time is reported.
+    randomState: int
+        Seed of the random number generator.
+    '''
+
+    from sklearn.calibration import CalibratedClassifierCV
+
+    try:
+        from xgboost import XGBClassifier
+        estimator = XGBClassifier(n_estimators=100, max_depth=6, random_state=randomState)
+    except ImportError:
+        from sklearn.ensemble import GradientBoostingClassifier
+        estimator = GradientBoostingClassifier(n_estimators=100, max_depth=6, random_state=randomState)
+
+    rng = np.random.default_rng(randomState)
+    countFeatures = len(FEATURES_TO_STD)
+    X = pd.DataFrame(rng.normal(size=(max(listBatchSizes) + countTrainDatapoints, countFeatures)),
+                     columns=FEATURES_TO_STD)
+    y = (X.iloc[:, 0] + X.iloc[:, 1]*X.iloc[:, 2] + rng.normal(size=X.shape[0]) > 1).astype(int)
+
+    xTrain, yTrain, xTest = X.iloc[:countTrainDatapoints], y.iloc[:countTrainDatapoints], X.iloc[countTrainDatapoints:]
+
+    model = CalibratedClassifierCV(estimator, cv=3).fit(xTrain, yTrain)
+    compiledModel = CompileModel(model)
+
+    assert np.abs(model.predict_proba(xTest)[:, 1] - compiledModel.predict_proba(xTest)[:, 1]).max() < 1e-6
+
+    listResults = list() # List to store the result of each batch size.
+
+    for batchSize in listBatchSizes:
+
+        xBatch = xTest.iloc[:batchSize]
+        result = {'Model': type(estimator).__name__, 'BatchSize': batchSize}
+
+        for name, function in [('OriginalTime', model.predict_proba), ('CompiledTime', compiledModel.predict_proba)]:
+
+            bestTime = np.inf
+
+            for _ in range(repeat if batchSize <= 1000 else 3):
+
+                startTime = time.perf_counter()
+                function(xBatch)
+                bestTime = min(bestTime, time.perf_counter() - startTime)
+
+            result[name] = bestTime*1000
+
+        result['Speedup'] = result['OriginalTime']/result['CompiledTime']
+        listResults.append(result)
+
+    return pd.DataFrame(listResults)
+
+def BenchmarkScoreCache(countClaims=100000, amendedFraction=0.02, randomState=0):
+    '''
+    Compares the time taken to preprocess and score all the claims of a resubmitted batch with the time taken by
+    ScoreClaimsWithCache, whose cache already has the scores of the first submission, when a fraction of the claims
+    was amended. Checks that both give the same probabilities. Returns a DataFrame with the time (in seconds) of each
+    approach and the hit-rate statistics of the cached run.
+
+    Parameters:
+    ----------
+    countClaims: int
+        Number of claims of the synthetic dataset.
+    amendedFraction: float
+        Fraction of the claims amended (reimbursed amount changed) before the resubmission.
+    randomState: int
+        Seed of the random number generator.
+    '''
+
+    import tempfile
+    from sklearn.ensemble import RandomForestClassifier
+
+    data = MergeDatasets(*GenerateDatasets(countClaims, randomState))
+    maxDate = max(pd.to_datetime(data[col]).max() for col in ['ClaimEndDt', 'DischargeDt'])
+
+    X = PreprocessData(data, maxDate=maxDate, dropEmptyColumns=False)
+    y = X.pop('PotentialFraud')
+    featureColumns = [col for col in X.columns if col not in ['State', 'Country']]
+
+    model = RandomForestClassifier(n_estimators=50, max_depth=8, random_state=randomState, n_jobs=-1)
+    model.fit(X[featureColumns], y)
+
+    # Resubmission of the batch with a fraction of the claims amended
+    rng = np.random.default_rng(randomState)
+    dataResubmitted = data.copy()
+    amendedRows = rng.random(dataResubmitted.shape[0]) < amendedFraction
+    dataResubmitted.loc[amendedRows, 'InscClaimAmtReimbursed'] += 100
+
+    startTime = time.perf_counter()
+    xResubmitted = PreprocessData(dataResubmitted, maxDate=maxDate, dropEmptyColumns=False)[featureColumns]
+    predProb = model.predict_proba(xResubmitted)[:, 1]
+    timeFull = time.perf_counter() - startTime
+
+    with tempfile.TemporaryDirectory() as cacheDir:
+
+        scoreCache = ScoreCache(os.path.join(cacheDir, 'ScoreCache.sqlite'))
+        ScoreClaimsWithCache(data, model, scoreCache, 'benchmark', maxDate, featureColumns)
+
+        dataResult = ScoreClaimsWithCache(dataResubmitted, model, scoreCache, 'benchmark', maxDate, featureColumns)
+
+    assert np.abs(dataResult['FraudProbability'].to_numpy() - predProb).max() < 1e-12
+
+    stats = scoreCache.runStats[-1]
+
+    return pd.DataFrame([{'Claims': stats['Claims'], 'Hits': stats['Hits'], 'Misses': stats['Misses'],
+                          'HitRate': stats['HitRate'], 'FullScoringTime': timeFull, 'CachedScoringTime': stats['Time'],
+                          'Speedup': timeFull/stats['Time']}])
+
+def BenchmarkTopCodeSketch(countClaims=100000, countChunks=10, capacity=1000, randomState=0):
+    '''
+    Compares finding the top Physicians, Claim Diagnosis Codes and Claim Procedure Codes by exact counts of all the
+    codes of the dataset (as done by the EDA) with finding them by a TopCodeSketch updated chunk by chunk (the chunks
+    being split between two sketches merged at the end, as done by two worker processes), after checking that both
+    give the same top codes. Returns a DataFrame with the best time (in seconds), the peak memory (in bytes) and the
+    number of counted codes of each approach.
+
+    Parameters:
+    ----------
+    countClaims: int
+        Number of claims of the synthetic dataset.
+    countChunks: int
+        Number of chunks of the dataset.
+    capacity: int
+        Maximum number of codes counted by the sketch of each group.
+    randomState: int
+        Seed of the random number generator.
+    '''
+
+    data = MergeDatasets(*GenerateDatasets(countClaims, randomState))
+    countTopCodes = (3, 7, 5)
+
+    def findExact():
+        '''
+        Finds the top codes of each group by counting all the codes.
+        '''
+        sketch = TopCodeSketch()
+        dictCounts = {group: pd.concat([data[col].dropna().astype(str) for col in sketch.getColumns(data, group)])
+                      .value_counts() for group in sketch.sketches}
+        return dictCounts, {group: counts.index[:countTop].tolist() for (group, counts), countTop in
+                            zip(dictCounts.items(), countTopCodes)}
+
+    def findSketch():
+        '''
+        Finds the top codes of each group with two TopCodeSketches, merged at the end.
+        '''
+        listSketches = [TopCodeSketch(capacity), TopCodeSketch(capacity)]
+        for i, rows in enumerate(np.array_split(np.arange(data.shape[0]), countChunks)):
+            listSketches[i % 2].update(data.iloc[rows])
+        sketch = listSketches[0].merge(listSketches[1])
+        return sketch, sketch.getTopCodes(countTopCodes)
+
+    (dictCounts, topCodesExact), timeExact, peakMemoryExact = ProfileStage(findExact)
+    (sketch, topCodesSketch), timeSketch, peakMemorySketch = ProfileStage(findSketch)
+
+    assert topCodesExact == topCodesSketch
+
+    return pd.DataFrame([{'Method': 'Exact', 'Claims': countClaims, 'Time': timeExact,
+                          'PeakMemoryBytes': peakMemoryExact,
+                          'CountedCodes': sum(counts.shape[0] for counts in dictCounts.values())},
+                         {'Method': 'Sketch', 'Claims': countClaims, 'Time': timeSketch,
+                          'PeakMemoryBytes': peakMemorySketch,
+                          'CountedCodes': sum(s.counts.shape[0] for s in sketch.sketches.values())}])
+
+#endregion - Benchmarks-----------------------------------------------------------------------------------------------
+#=====================================================================================================================
+
+
+
+#region - Benchmark Suite---------------------------------------------------------------------------------------------
+#=====================================================================================================================
+
+def ProfileStage(function, repeat=3):
+    '''
+    Runs the given function 'repeat' times and returns its result, the best time (in seconds) and the peak memory (in
+    bytes) allocated while it runs. The peak memory is measured with tracemalloc in an additional run, so that the
+    tracing does not slow down the timed runs.
+
+    Parameters:
+    ----------
+    function: callable
+        Function (without arguments) to be profiled.
+    repeat: int
+        Number of timed runs. The best time is reported.
+    '''
+
+    bestTime = np.inf
+
+    for _ in range(repeat):
+
+        startTime = time.perf_counter()
+        result = function()
+        bestTime = min(bestTime, time.perf_counter() - startTime)
+
+    del result
+
+    tracemalloc.start()
+
+    try:
+        result = function()
+        _, peakMemory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return result, bestTime, peakMemory
+
+def RunBenchmarkSuite(listCountClaims=(10000, 100000), repeat=3, randomState=0, outputFile=None):
+    '''
+    Times and memory-profiles the stages of the data pipeline (MergeDatasets, PreprocessData, and the fit/transform
+    methods of ResponseEncoder, OneHotEncoder and Standardize) on synthetic datasets of each given number of claims.
+    Returns a DataFrame having, for each stage and dataset, the best time (in seconds), the throughput (rows per
+    second) and the peak memory allocated (in bytes). If 'outputFile' is given, the results are also written to it as
+    JSON, along with the environment (versions of python, numpy and pandas, platform), so that runs can be compared.
+
+    Parameters:
+    ----------
+    listCountClaims: iterable
+        Number of claims of each of the synthetic datasets to benchmark (e.g. from 10k to 10M).
+    repeat: int
+        Number of timed runs of each stage. The best time is reported.
+    randomState: int
+        Seed of the random number generator.
+    outputFile: str
+        Path of the JSON file to which the results are written.
+    '''
+
+    listResults = list() # List to store the result of each stage for each dataset.
+
+    for countClaims in listCountClaims:
+
+        dataProvider, dataBeneficiary, dataInpatient, dataOutpatient = GenerateDatasets(countClaims, randomState)
+
+        def profile(stage, function):
+            '''
+            Profiles the given stage and stores its result.
+            '''
+            result, bestTime, peakMemory = ProfileStage(function, repeat)
+            listResults.append({'Stage': stage, 'Claims': countClaims, 'Rows': rows, 'Time': bestTime,
+                                'RowsPerSecond': rows/bestTime if bestTime > 0 else np.inf,
+                                'PeakMemoryBytes': peakMemory})
+            return result
+
+        rows = dataInpatient.shape[0] + dataOutpatient.shape[0]
+        data = profile('MergeDatasets',
+                       lambda: MergeDatasets(dataProvider, dataBeneficiary, dataInpatient, dataOutpatient))
+
+        rows = data.shape[0]
+        X = profile('PreprocessData', lambda: PreprocessData(data))
+        y = X.pop('PotentialFraud')
+
+        standardize = Standardize(FEATURES_TO_STD)
+        profile('Standardize.fit', lambda: standardize.fit(X))
+        profile('Standardize.transform', lambda: standardize.transform(X))
+
+        responseEncoder = ResponseEncoder(['State', 'Country'], 'PotentialFraud')
+        profile('ResponseEncoder.fit', lambda: responseEncoder.fit(X, y))
+        profile('ResponseEncoder.transform', lambda: responseEncoder.transform(X))
+
+        oneHotEncoder = OneHotEncoder(['State', 'Country'])
+        profile('OneHotEncoder.fit', lambda: oneHotEncoder.fit(X))
+        profile('OneHotEncoder.transform', lambda: oneHotEncoder.transform(X))
+
+    dataResults = pd.DataFrame(listResults)
+
+    if outputFile is not None:
+
+        environment = {'Time': time.strftime('%Y-%m-%dT%H:%M:%S'), 'Python': platform.python_version(),
+                       'Numpy': np.__version__, 'Pandas': pd.__version__, 'Platform': platform.platform(),
+                       'Processor': platform.processor(), 'Repeat': repeat, 'RandomState': randomState}
+
+        with open(outputFile, 'w') as f:
+            json.dump({'Environment': environment, 'Results': dataResults.to_dict(orient='records')}, f, indent=2)
+
+    return dataResults
+
+#endregion - Benchmark Suite------------------------------------------------------------------------------------------
+#=====================================================================================================================
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description='Benchmarks of the custom_package functions and transformers.')
+    parser.add_argument('--suite', action='store_true',
+                        help='Run the benchmark suite of the pipeline stages instead of the comparison benchmarks.')
+    parser.add_argument('--claims', type=int, nargs='+', default=[10000, 100000],
+                        help='Number of claims of each synthetic dataset of the benchmark suite.')
+    parser.add_argument('--repeat', type=int, default=3, help='Number of timed runs of each stage.')
+    parser.add_argument('--output', default=None, help='JSON file to which the results of the suite are written.')
+    args = parser.parse_args()
+
+    if args.suite:
+
+        print(RunBenchmarkSuite(args.claims, args.repeat, outputFile=args.output).to_string(index=False))
+        sys.exit(0)
+
+    print(BenchmarkCountCodes().to_string(index=False))
+    print(BenchmarkFeatureKernels().to_string(index=False))
+    print(BenchmarkResponseEncoderFit().to_string(index=False))
+    print(BenchmarkOneHotEncoder().to_string(index=False))
+    print(BenchmarkProviderFeatureStore().to_string(index=False))
+    print(BenchmarkStandardize().to_string(index=False))
+    print(BenchmarkCompiledModel().to_string(index=False))
+    print(BenchmarkScoreCache().to_string(index=False))
+    print(BenchmarkTopCodeSketch().to_string(index=False))
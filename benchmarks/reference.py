@@ -0,0 +1,160 @@
+import numpy as np
+import pandas as pd
+
+#region - Reference Implementations-----------------------------------------------------------------------------------
+#=====================================================================================================================
+
+def encodeCatFeaturesLoop(dataset, existingFeatures, newFeatures, suffix=''):
+    '''
+    Original (loop based) implementation of the 'encodeCatFeatures' function of PreprocessData. It is kept only as the
+    reference for the parity checks and the benchmarks of the 'CountCodes' function.
+
+    Parameters:
+    ----------
+    dataset: pandas.core.frame.DataFrame
+        DataFrame containing the data for which the new set of encoded features has to be created.
+    exsitingFeatures: list
+        List of existing features to considered for counting.
+    newFeatures: list
+        List of new features to encoded and created
+    suffix: str
+        Suffix to add before the new feature names.
+    '''
+
+    # Fetch the number of datapoints in the given dataset
+    lenDatapoints = dataset.shape[0]
+
+    # Iterate through each of the new features:
+    for newFeature in newFeatures:
+
+        listIsExistAllFeatures = list() # List to store a list of 0s and 1s for each existing feature,
+        # if the new feature value exist in the existing features.
+
+        # Iterate through each of the existing feature set and perform the logic to count.
+        for existingFeature in existingFeatures:
+
+            listIsExist = list() # List to store '1' if the new feature value exist in the existing feature.
+
+            for value in list(dataset[existingFeature]):
+
+                if str(value) == str(newFeature):
+
+                    listIsExist.append(1)
+
+                else:
+
+                    listIsExist.append(0)
+
+            listIsExistAllFeatures.append(listIsExist)
+
+        arrayCount = np.zeros(lenDatapoints) # Array to store the count of the existing features containing the new features.
+
+        # Iterate through each of the list in 'listIsExistAllFeatures' and sum the counts.
+        for i in range(0, len(listIsExistAllFeatures)):
+
+            arrayCount = arrayCount + np.array(listIsExistAllFeatures[i])
+
+        dataset[suffix + newFeature] = arrayCount.astype(int)
+
+    return dataset
+
+def getLegacyFeatures(data, colPhys, maxDate):
+    '''
+    Returns a dictionary having the feature names as keys and, as values, the functions computing them with the original
+    row-wise 'apply' implementation of PreprocessData. It is kept only as the reference for the parity checks and the
+    benchmarks of the feature kernels.
+
+    Parameters:
+    ----------
+    data: pandas.core.frame.DataFrame
+        Dataset containing the 'DOB', 'DOD', Physician and Claim Diagnosis Code features.
+    colPhys: list
+        List of the Physician features.
+    maxDate: pandas.Timestamp
+        Maximum date of the dataset.
+    '''
+
+    def uniquePhysCount():
+        return data[colPhys].apply(lambda x: len(set([phys for phys in x if not pd.isnull(phys)])), axis=1)
+
+    def physRoleCount():
+        return data[colPhys].apply(lambda x: len([phys for phys in x if not pd.isnull(phys)]), axis=1)
+
+    def isSamePhysMultiRole(countUnique):
+        dataPhys = pd.DataFrame({'UniquePhysCount': uniquePhysCount(), 'PhysRoleCount': physRoleCount()})
+        return dataPhys.apply(lambda x: 1 if x['UniquePhysCount'] == countUnique and x['PhysRoleCount'] > countUnique
+                              else 0, axis=1)
+
+    return {
+        'Age': lambda: data.apply(lambda x: round(((x['DOD'] - x['DOB']).days)/365) if pd.notnull(x['DOD'])
+                                  else round(((maxDate - x['DOB']).days)/365), axis=1),
+        'IsDead': lambda: data['DOD'].apply(lambda x: 1 if pd.notnull(x) else 0),
+        'UniquePhysCount': uniquePhysCount,
+        'PhysRoleCount': physRoleCount,
+        'IsSamePhysMultiRole1': lambda: isSamePhysMultiRole(1),
+        'IsSamePhysMultiRole2': lambda: isSamePhysMultiRole(2),
+        'ClmDiagnosisCode_1': lambda: data['ClmDiagnosisCode_1'].apply(lambda x: 1 if not pd.isnull(x) else 0)
+    }
+
+def fitResponseTableLoop(X, y, categoricalFeatures, className):
+    '''
+    Original implementation of the 'fit' method of ResponseEncoder, which scans the whole dataset for each (feature value,
+    class label) pair. Returns the dictionary of the Response Tables. It is kept only as the reference for the parity
+    checks and the benchmarks of ResponseEncoder.
+
+    Parameters:
+    ----------
+    X: pandas.core.frame.DataFrame
+        DataFrame on which the Response Encoding has to be carried out.
+    y: pandas.core.series.Series
+        Class Labels of the DataFrame
+    categoricalFeatures: list
+        List of features for which the response encoding has to be done.
+    className: str
+        Name of the Class
+    '''
+
+    responseTable = dict()
+
+    data = pd.DataFrame()
+    for col in categoricalFeatures:
+        data[col] = X[col]
+    data[className] = y
+
+    for feature in categoricalFeatures:
+
+        dictResponseTable = dict()
+
+        uniqueFeatValues = np.sort(X[feature].unique())
+        uniqueClassLabels = np.sort(y.unique())
+
+        for featureVal in uniqueFeatValues:
+
+            countClass = list()
+            probClass = list()
+
+            for label in uniqueClassLabels:
+                countClass.append(data[(data[feature] == featureVal) & (data[className] == label)][className].count())
+
+            for label in uniqueClassLabels:
+                probClass.append(countClass[label]/sum(countClass))
+
+            if (feature not in dictResponseTable.keys()):
+                dictResponseTable[feature] = []
+            dictResponseTable[feature].append(featureVal)
+
+            for label in uniqueClassLabels:
+
+                if (feature + 'Class' + str(label) not in dictResponseTable.keys()):
+                    dictResponseTable[feature + 'Class' + str(label)] = []
+                if (feature + '_' + str(label) not in dictResponseTable.keys()):
+                    dictResponseTable[feature + '_' + str(label)] = []
+                dictResponseTable[feature + 'Class' + str(label)].append(countClass[label])
+                dictResponseTable[feature + '_' + str(label)].append(probClass[label])
+
+        responseTable[feature] = pd.DataFrame(dictResponseTable)
+
+    return responseTable
+
+#endregion - Reference Implementations--------------------------------------------------------------------------------
+#=====================================================================================================================
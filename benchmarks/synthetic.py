@@ -0,0 +1,248 @@
+import numpy as np
+import pandas as pd
+
+# Numerical features standardized by the Model pipeline
+FEATURES_TO_STD = ['Race', 'ClaimSettlementDelay', 'TreatmentDuration', 'Age', 'TotalClaimAmount', 'IPTotalAmount',
+                   'OPTotalAmount', 'UniquePhysCount', 'PhysRoleCount']
+
+#region - Synthetic Features------------------------------------------------------------------------------------------
+#=====================================================================================================================
+
+def GenerateCodeFeatures(countDatapoints, randomState=0):
+    '''
+    Generates a DataFrame having the Physician, Claim Diagnosis Code and Claim Procedure Code features of the claims
+    data, with skewed (Zipf like) code frequencies and empty values, along with the groups of codes to be counted.
+
+    Parameters:
+    ----------
+    countDatapoints: int
+        Number of datapoints to be generated.
+    randomState: int
+        Seed of the random number generator.
+    '''
+
+    rng = np.random.default_rng(randomState)
+
+    def sampleCodes(codes, nullRate):
+        '''
+        Samples the given codes with skewed frequencies and replaces a fraction 'nullRate' of the values with nan.
+        '''
+        weights = 1.0/np.arange(1, len(codes) + 1)**1.1
+        values = codes[rng.choice(len(codes), countDatapoints, p=weights/weights.sum())]
+        values = values.astype(object) if values.dtype != float else values
+        values[rng.random(countDatapoints) < nullRate] = np.nan
+        return values
+
+    topPhys = ['PHY412132', 'PHY337425', 'PHY330576']
+    topDiagCodes = ['4019', '2724', '42731', '25000', '2449', '53081', '4280']
+    topProcCodes = ['9904.0', '8154.0', '66.0', '3893.0', '3995.0']
+
+    phys = np.array(topPhys + ['PHY%06d' % i for i in range(10000)], dtype=object)
+    diagCodes = np.array(topDiagCodes + [str(5000 + i) for i in range(5000)], dtype=object)
+    procCodes = np.array([float(code) for code in topProcCodes] + [float(100 + i) for i in range(1000)])
+
+    data = pd.DataFrame()
+    for col, nullRate in [('AttendingPhysician', 0.01), ('OperatingPhysician', 0.8), ('OtherPhysician', 0.6)]:
+        data[col] = sampleCodes(phys, nullRate)
+    for i in range(1, 11):
+        data['ClmDiagnosisCode_' + str(i)] = sampleCodes(diagCodes, min(0.02 + 0.1*i, 0.98))
+    for i in [1, 2, 6]:
+        data['ClmProcedureCode_' + str(i)] = sampleCodes(procCodes, min(0.95 + 0.015*i, 0.995))
+
+    codeGroups = [
+        ([col for col in data.columns if 'Physician' in col], topPhys, ''),
+        ([col for col in data.columns if 'ClmDiagnosisCode' in col], topDiagCodes, 'ClmDiagCode_'),
+        ([col for col in data.columns if 'Procedure' in col], topProcCodes, 'ClmProcCode_')
+    ]
+
+    return data, codeGroups
+
+def GenerateBeneficiaryDates(countDatapoints, randomState=0):
+    '''
+    Generates a DataFrame having the 'DOB' and 'DOD' (mostly empty) features of the Beneficiaries, along with the
+    maximum date of the claims.
+
+    Parameters:
+    ----------
+    countDatapoints: int
+        Number of datapoints to be generated.
+    randomState: int
+        Seed of the random number generator.
+    '''
+
+    rng = np.random.default_rng(randomState)
+
+    maxDate = pd.Timestamp('2009-12-31')
+
+    data = pd.DataFrame()
+    data['DOB'] = pd.Timestamp('1909-01-01') + pd.to_timedelta(rng.integers(0, 365*75, countDatapoints), unit='D')
+    data['DOD'] = pd.Timestamp('2009-01-01') + pd.to_timedelta(rng.integers(0, 365, countDatapoints), unit='D')
+    data.loc[rng.random(countDatapoints) > 0.01, 'DOD'] = pd.NaT
+
+    return data, maxDate
+
+def GenerateStateCountry(countDatapoints, randomState=0):
+    '''
+    Generates a DataFrame having the 'State' (54 values) and 'Country' (up to 999 values) features of the Beneficiaries,
+    with skewed frequencies, along with the class labels ('PotentialFraud') depending on the 'State'.
+
+    Parameters:
+    ----------
+    countDatapoints: int
+        Number of datapoints to be generated.
+    randomState: int
+        Seed of the random number generator.
+    '''
+
+    rng = np.random.default_rng(randomState)
+
+    weights = 1.0/np.arange(1, 55)
+    data = pd.DataFrame()
+    data['State'] = rng.choice(np.arange(1, 55), countDatapoints, p=weights/weights.sum())
+    data['Country'] = (rng.zipf(1.3, countDatapoints) % 999)
+    y = pd.Series((rng.random(countDatapoints) < 0.2 + 0.3*(data['State'] % 3 == 0)).astype(int), name='PotentialFraud')
+
+    return data, y
+
+def GenerateProviderClaims(countDatapoints, randomState=0):
+    '''
+    Generates a DataFrame of claims having the columns used by ProviderFeatureStore ('Provider', 'BeneID', the Physician
+    features, the amounts and the 'AdmissionDt' of about 10% of the claims, which are the Inpatient claims).
+
+    Parameters:
+    ----------
+    countDatapoints: int
+        Number of datapoints to be generated.
+    randomState: int
+        Seed of the random number generator.
+    '''
+
+    rng = np.random.default_rng(randomState)
+
+    data = pd.DataFrame()
+    data['Provider'] = np.char.add('PRV', rng.integers(0, max(countDatapoints//100, 5), countDatapoints).astype(str))
+    data['BeneID'] = np.char.add('BENE', rng.integers(0, max(countDatapoints//4, 10), countDatapoints).astype(str))
+
+    for col, nullRate in [('AttendingPhysician', 0.01), ('OperatingPhysician', 0.8), ('OtherPhysician', 0.6)]:
+        data[col] = np.char.add('PHY', rng.integers(0, 20000, countDatapoints).astype(str)).astype(object)
+        data.loc[rng.random(countDatapoints) < nullRate, col] = np.nan
+
+    data['InscClaimAmtReimbursed'] = rng.integers(0, 5000, countDatapoints)
+    data['DeductibleAmtPaid'] = np.where(rng.random(countDatapoints) < 0.1, 1068.0, 0.0)
+    data['AdmissionDt'] = np.where(rng.random(countDatapoints) < 0.1, '2009-01-01', None)
+
+    return data
+
+def GenerateDatasets(countClaims, randomState=0):
+    '''
+    Generates the Provider, Beneficiary, Inpatient and Outpatient datasets with the same columns and datatypes as the
+    source CSV files (codes and dates as text, Claim Procedure Codes as float, 'RenalDiseaseIndicator' as '0'/'Y'),
+    with skewed (Zipf like) code frequencies, empty values in the same columns as the real data, about 10% of Inpatient
+    claims, 4 claims per Beneficiary and 100 claims per Provider.
+
+    Parameters:
+    ----------
+    countClaims: int
+        Number of claims (Inpatient and Outpatient) to be generated.
+    randomState: int
+        Seed of the random number generator.
+    '''
+
+    rng = np.random.default_rng(randomState)
+
+    countBene = max(countClaims//4, 10)
+    countProviders = max(countClaims//100, 5)
+
+    def sampleCodes(codes, count, nullRate):
+        '''
+        Samples the given codes with skewed frequencies and replaces a fraction 'nullRate' of the values with nan.
+        '''
+        weights = 1.0/np.arange(1, len(codes) + 1)**1.1
+        values = codes[rng.choice(len(codes), count, p=weights/weights.sum())]
+        values = values.astype(object) if values.dtype != float else values
+        values[rng.random(count) < nullRate] = np.nan
+        return values
+
+    def getIdentifiers(prefix, count):
+        '''
+        Returns the identifiers prefix + number (e.g. 'PRV00001') of the given count.
+        '''
+        return np.char.add(prefix, np.char.zfill(np.arange(count).astype(str), 5)).astype(object)
+
+    # Provider data
+    dataProvider = pd.DataFrame({'Provider': getIdentifiers('PRV', countProviders),
+                                 'PotentialFraud': np.where(rng.random(countProviders) < 0.1, 'Yes', 'No').astype(object)})
+
+    # Beneficiary data
+    days = pd.date_range('1909-01-01', '2009-12-31').strftime('%Y-%m-%d').to_numpy(dtype=object)
+    dod = days[rng.integers(len(days) - 365, len(days), countBene)]
+    dod[rng.random(countBene) > 0.01] = np.nan
+
+    dataBeneficiary = pd.DataFrame({'BeneID': getIdentifiers('BENE', countBene),
+                                    'DOB': days[rng.integers(0, 365*75, countBene)], 'DOD': dod,
+                                    'Gender': rng.integers(1, 3, countBene), 'Race': rng.choice([1, 2, 3, 5], countBene),
+                                    'RenalDiseaseIndicator': np.where(rng.random(countBene) < 0.15, 'Y', '0').astype(object),
+                                    'State': rng.integers(1, 55, countBene), 'County': rng.integers(0, 999, countBene),
+                                    'NoOfMonths_PartACov': 12, 'NoOfMonths_PartBCov': 12})
+
+    for col in ['ChronicCond_Alzheimer', 'ChronicCond_Heartfailure', 'ChronicCond_KidneyDisease', 'ChronicCond_Cancer',
+                'ChronicCond_ObstrPulmonary', 'ChronicCond_Depression', 'ChronicCond_Diabetes',
+                'ChronicCond_IschemicHeart', 'ChronicCond_Osteoporasis', 'ChronicCond_rheumatoidarthritis',
+                'ChronicCond_stroke']:
+        dataBeneficiary[col] = rng.integers(1, 3, countBene)
+
+    for col in ['IPAnnualReimbursementAmt', 'IPAnnualDeductibleAmt', 'OPAnnualReimbursementAmt', 'OPAnnualDeductibleAmt']:
+        dataBeneficiary[col] = rng.integers(0, 10000, countBene)
+
+    # Codes, the top codes (found by the EDA) being the most frequent ones
+    phys = np.array(['PHY412132', 'PHY337425', 'PHY330576'] + ['PHY%06d' % i for i in range(20000)], dtype=object)
+    diagCodes = np.array(['4019', '2724', '42731', '25000', '2449', '53081', '4280'] +
+                         [str(5000 + i) for i in range(5000)] + ['V%04d' % i for i in range(200)], dtype=object)
+    procCodes = np.array([9904.0, 8154.0, 66.0, 3893.0, 3995.0] + [float(100 + i) for i in range(1000)])
+    groupCodes = np.array(['%03d' % i for i in range(700)], dtype=object)
+
+    claimDays = pd.date_range('2008-11-01', '2010-01-31').strftime('%Y-%m-%d').to_numpy(dtype=object)
+
+    def generateClaims(count, isInpatient):
+        '''
+        Generates the given count of Inpatient or Outpatient claims.
+        '''
+        startDays = rng.integers(0, len(claimDays) - 60, count)
+        endDays = startDays + (rng.integers(0, 30, count) if isInpatient else rng.integers(0, 3, count))
+
+        data = pd.DataFrame({'BeneID': dataBeneficiary['BeneID'].to_numpy()[rng.integers(0, countBene, count)],
+                             'ClaimID': getIdentifiers('CLM' + str(int(isInpatient)), count),
+                             'ClaimStartDt': claimDays[startDays], 'ClaimEndDt': claimDays[endDays],
+                             'Provider': dataProvider['Provider'].to_numpy()[rng.integers(0, countProviders, count)],
+                             'InscClaimAmtReimbursed': rng.integers(0, 5000 if not isInpatient else 60000, count),
+                             'AttendingPhysician': sampleCodes(phys, count, 0.01),
+                             'OperatingPhysician': sampleCodes(phys, count, 0.4 if isInpatient else 0.8),
+                             'OtherPhysician': sampleCodes(phys, count, 0.6)})
+
+        if isInpatient:
+            data['AdmissionDt'] = data['ClaimStartDt']
+
+        data['ClmAdmitDiagnosisCode'] = sampleCodes(diagCodes, count, 0.0 if isInpatient else 0.75)
+        data['DeductibleAmtPaid'] = np.where(rng.random(count) < 0.02, np.nan,
+                                             1068.0 if isInpatient else rng.integers(0, 100, count).astype(float))
+
+        if isInpatient:
+            data['DischargeDt'] = data['ClaimEndDt']
+            data['DiagnosisGroupCode'] = sampleCodes(groupCodes, count, 0.0)
+
+        for i in range(1, 11):
+            data['ClmDiagnosisCode_' + str(i)] = sampleCodes(diagCodes, count, min(0.02 + 0.1*i, 0.98))
+
+        for i in range(1, 7):
+            data['ClmProcedureCode_' + str(i)] = sampleCodes(procCodes, count, 1.0 if i == 6 else
+                                                             min((0.5 if isInpatient else 0.97) + 0.1*i, 0.995))
+
+        return data
+
+    countInpatient = countClaims//10
+
+    return dataProvider, dataBeneficiary, generateClaims(countInpatient, True), \
+           generateClaims(countClaims - countInpatient, False)
+
+#endregion - Synthetic Features---------------------------------------------------------------------------------------
+#=====================================================================================================================
@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+
+def FactorizeColumn(column):
+    '''
+    Factorizes the given column into integer codes and the array of its unique values. The missing values are given
+    the code -1. Categorical columns reuse their existing codes and categories without expanding the values.
+
+    Parameters:
+    ----------
+    column: pandas.core.series.Series
+        Column to be factorized.
+    '''
+
+    # Categorical columns already hold the codes and the unique values (categories)
+    if isinstance(column.dtype, pd.CategoricalDtype):
+
+        return np.asarray(column.cat.codes), column.cat.categories.tolist()
+
+    codes, uniques = pd.factorize(np.asarray(column))
+
+    # Convert the unique values to python objects so that their string values match the ones of the original values.
+    return codes, np.asarray(uniques).tolist()
+
+def CountCodes(dataset, codeGroups):
+    '''
+    Function to create new encoded features for Categorical Features, based on their count of values in the existing
+    set of features. All the groups of codes are counted in a single vectorized pass over the stacked code columns.
+
+    A value is counted for a code when its string value is the same as the code (e.g. the float value 9904.0 is counted
+    for the code '9904.0'). Only the unique values of each column are converted to string, and the counts are
+    aggregated with a single 'bincount' over the (row, code) pairs.
+
+    Parameters:
+    ----------
+    dataset: pandas.core.frame.DataFrame
+        DataFrame containing the data for which the new set of encoded features has to be created.
+    codeGroups: list
+        List of tuples (existingFeatures, newFeatures, prefix) where 'existingFeatures' is the list of existing features
+        to be considered for counting, 'newFeatures' is the list of codes to be counted and 'prefix' is the prefix to add
+        before the new feature names.
+    '''
+
+    # Fetch the number of datapoints in the given dataset
+    lenDatapoints = dataset.shape[0]
+
+    listNewFeatures = list() # List to store the names of the new encoded features.
+    listCodeIndices = list() # List to store, for each existing feature, the index of the code of each of its value.
+
+    # Iterate through each group of codes, giving each of the codes a unique index across all the groups.
+    for existingFeatures, newFeatures, prefix in codeGroups:
+
+        # Dictionary to map the string value of a code to its index across all the groups.
+        dictCodeIndex = {str(code): len(listNewFeatures) + i for i, code in enumerate(newFeatures)}
+
+        listNewFeatures.extend([prefix + str(code) for code in newFeatures])
+
+        for existingFeature in existingFeatures:
+
+            codes, uniques = FactorizeColumn(dataset[existingFeature])
+
+            # Lookup of the code index of each unique value (-1 if the value is not a code to be counted). The last
+            # element is for the missing values (code -1), which have the string value 'nan'.
+            lookup = np.array([dictCodeIndex.get(str(value), -1) for value in uniques] + [dictCodeIndex.get('nan', -1)],
+                              dtype=np.int64)
+
+            listCodeIndices.append(lookup[codes])
+
+    countNewFeatures = len(listNewFeatures)
+
+    if len(listCodeIndices) == 0 or lenDatapoints == 0:
+
+        arrayCount = np.zeros((lenDatapoints, countNewFeatures), dtype=int)
+
+    else:
+
+        # Stack the code indices of all the existing features and keep only the values to be counted.
+        codeIndices = np.concatenate(listCodeIndices)
+        rowIndices = np.tile(np.arange(lenDatapoints, dtype=np.int64), len(listCodeIndices))
+        isCode = codeIndices >= 0
+
+        # Count the occurrences of each (row, code) pair.
+        arrayCount = np.bincount(rowIndices[isCode] * countNewFeatures + codeIndices[isCode],
+                                 minlength=lenDatapoints * countNewFeatures)
+        arrayCount = arrayCount.reshape(lenDatapoints, countNewFeatures).astype(int)
+
+    # Return the DataFrame containing the count of each code for each datapoint.
+    return pd.DataFrame(arrayCount, columns=listNewFeatures, index=dataset.index)
@@ -0,0 +1,221 @@
+import numpy as np
+import pandas as pd
+from custom_package.code_counter import FactorizeColumn
+
+class HeavyHitterSketch:
+    '''
+    Class implementing a mergeable Misra-Gries summary of the most frequent codes of a stream, in bounded memory: at
+    most 'capacity' codes are counted at a time.
+    Each update counts the codes of a chunk exactly and merges these counts into the summary. When the summary has more
+    than 'capacity' codes, the (capacity+1)-th largest count is subtracted from all the counts and the codes whose count
+    is no longer positive are removed. The estimated count of a code is then at most its true count and at least its
+    true count minus 'maxError' (which is at most the number of counted values divided by capacity+1), so that any code
+    more frequent than that is kept. Two summaries (e.g. of other chunks or of other workers) are merged in the same
+    way, with the same guarantee.
+    '''
+    def __init__(self, capacity=1000):
+        '''
+        Function to initialize the class members
+
+        Parameter(s):
+        ------------
+        capacity: int
+            Maximum number of codes counted by the summary.
+        '''
+        self.capacity = capacity
+        self.counts = pd.Series(dtype=np.int64) # Estimated count of each code (index: string value of the code).
+        self.countValues = 0 # Number of values (not missing) counted.
+        self.maxError = 0 # Maximum difference between the true and the estimated count of a code.
+
+    def prune(self):
+        '''
+        Reduces the summary to at most 'capacity' codes, by subtracting the (capacity+1)-th largest count from all the
+        counts.
+        '''
+
+        if self.counts.shape[0] <= self.capacity:
+            return
+
+        threshold = int(np.partition(self.counts.to_numpy(), -(self.capacity + 1))[-(self.capacity + 1)])
+
+        self.counts = self.counts[self.counts > threshold] - threshold
+        self.maxError += threshold
+
+    def addCounts(self, counts):
+        '''
+        Adds the given counts of codes to the summary and prunes it.
+
+        Parameters:
+        ----------
+        counts: pandas.core.series.Series
+            Count of each code (index: string value of the code).
+        '''
+
+        self.counts = self.counts.add(counts, fill_value=0).astype(np.int64)
+        self.prune()
+
+    def update(self, values):
+        '''
+        Counts the given codes (chunk of the stream) into the summary. As done by CountCodes, a code is the string value
+        of a value (e.g. the float value 9904.0 is the code '9904.0') and the missing values are not counted.
+
+        Parameters:
+        ----------
+        values: pandas.core.series.Series
+            Codes (e.g. the values of all the code columns of a chunk of claims).
+        '''
+
+        codes, uniques = FactorizeColumn(pd.Series(values))
+        codes = codes[codes >= 0]
+
+        # Count each unique value (only the unique values are converted to string)
+        counts = pd.Series(np.bincount(codes, minlength=len(uniques)), index=[str(value) for value in uniques])
+        counts = counts[counts > 0]
+
+        # Sum the counts of the values having the same string value (e.g. the text '9904.0' and the float 9904.0)
+        if counts.index.has_duplicates:
+            counts = counts.groupby(level=0).sum()
+
+        self.countValues += codes.shape[0]
+        self.addCounts(counts)
+
+        return self
+
+    def merge(self, other):
+        '''
+        Merges the summary of another stream (e.g. of another worker process) into this summary.
+
+        Parameters:
+        ----------
+        other: HeavyHitterSketch
+            Summary of the other stream.
+        '''
+
+        self.countValues += other.countValues
+        self.maxError += other.maxError
+        self.addCounts(other.counts)
+
+        return self
+
+    def getTop(self, countTop):
+        '''
+        Returns the given number of most frequent codes, by decreasing estimated count (and by code for equal counts).
+
+        Parameters:
+        ----------
+        countTop: int
+            Number of codes.
+        '''
+
+        dataCounts = pd.DataFrame({'Code': self.counts.index, 'Count': self.counts.to_numpy()})
+
+        return dataCounts.sort_values(['Count', 'Code'], ascending=[False, True])['Code'].head(countTop).tolist()
+
+class TopCodeSketch:
+    '''
+    Class to find the top Physicians, Claim Diagnosis Codes and Claim Procedure Codes of a stream of merged claims
+    chunks (as given by StreamMergedClaims), with a HeavyHitterSketch for each group of codes. The codes are counted
+    over the same columns as the ones encoded by PreprocessData. The sketches of several streams (e.g. of the chunks
+    processed by each worker) can be merged.
+    '''
+    def __init__(self, capacity=1000):
+        '''
+        Function to initialize the class members
+
+        Parameter(s):
+        ------------
+        capacity: int
+            Maximum number of codes counted by the sketch of each group.
+        '''
+        self.capacity = capacity
+        self.sketches = {group: HeavyHitterSketch(capacity) for group in ['Physicians', 'DiagnosisCodes',
+                                                                         'ProcedureCodes']}
+
+    def getColumns(self, data, group):
+        '''
+        Returns the columns of the given dataset having the codes of the given group.
+
+        Parameters:
+        ----------
+        data: pandas.core.frame.DataFrame
+            Merged claims dataset.
+        group: str
+            Group of codes ('Physicians', 'DiagnosisCodes' or 'ProcedureCodes').
+        '''
+
+        if group == 'Physicians':
+            return [col for col in data.columns if 'Physician' in col]
+        elif group == 'DiagnosisCodes':
+            return [col for col in data.columns if 'ClmDiagnosisCode' in col]
+
+        # The Claim Procedure Codes 3 to 5 are removed by PreprocessData before the codes are encoded
+        return [col for col in data.columns if 'Procedure' in col and
+                col not in ['ClmProcedureCode_3', 'ClmProcedureCode_4', 'ClmProcedureCode_5']]
+
+    def update(self, data):
+        '''
+        Counts the codes of the given chunk of merged claims into the sketches.
+
+        Parameters:
+        ----------
+        data: pandas.core.frame.DataFrame
+            Chunk of merged claims.
+        '''
+
+        # Count the values of all the columns of each group at once
+        for group, sketch in self.sketches.items():
+
+            columns = self.getColumns(data, group)
+
+            if len(columns) > 0:
+                sketch.update(np.concatenate([np.asarray(data[col]) for col in columns]))
+
+        return self
+
+    def merge(self, other):
+        '''
+        Merges the sketches of another stream into these sketches.
+
+        Parameters:
+        ----------
+        other: TopCodeSketch
+            Sketches of the other stream.
+        '''
+
+        for group, sketch in self.sketches.items():
+            sketch.merge(other.sketches[group])
+
+        return self
+
+    def getTopCodes(self, countTopCodes=(3, 7, 5)):
+        '''
+        Returns the dictionary of the top codes of each group, as expected by PreprocessData and DataPreprocessor.
+
+        Parameters:
+        ----------
+        countTopCodes: tuple
+            Number of top Physicians, Claim Diagnosis Codes and Claim Procedure Codes.
+        '''
+
+        return {group: sketch.getTop(countTop) for (group, sketch), countTop in zip(self.sketches.items(),
+                                                                                     countTopCodes)}
+
+def SketchTopCodes(chunks, capacity=1000):
+    '''
+    Counts the codes of the given chunks of merged claims (e.g. given by StreamMergedClaims) into a TopCodeSketch and
+    returns it, so that the top codes of a dataset larger than the memory are found in a single pass.
+
+    Parameters:
+    ----------
+    chunks: iterable
+        Chunks of merged claims (DataFrames).
+    capacity: int
+        Maximum number of codes counted by the sketch of each group.
+    '''
+
+    topCodeSketch = TopCodeSketch(capacity)
+
+    for chunk in chunks:
+        topCodeSketch.update(chunk)
+
+    return topCodeSketch
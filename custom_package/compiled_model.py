@@ -0,0 +1,541 @@
+import json
+import numpy as np
+import pandas as pd
+
+# Maximum number of (datapoint, tree) pairs traversed at once, so that the arrays of the current nodes stay in cache.
+MAX_TRAVERSAL_SIZE = 1 << 16
+
+class CompiledEnsemble:
+    '''
+    Class to predict with a tree ensemble flattened into arrays: the nodes of all the trees are stored in the same arrays
+    (feature, threshold, children, direction of the missing values and leaf value of each node), and the datapoints go
+    down all the trees at once, with one vectorized step for each level of the trees.
+    The nodes are numbered so that the right child of a node always follows its left child: a datapoint goes to the
+    left child of a node, or to the next node when its value of the feature of the node is greater than or equal to the
+    threshold of the node (or when the value is missing and the missing values go to the right). The leaves have no
+    threshold and point to themselves, so that all the datapoints are moved the same number of times (the depth of the
+    deepest tree).
+    '''
+    def __init__(self, features, thresholds, leftChildren, missingRight, leafValues, roots, depth, baseScore=0.0,
+                 transform='identity', featureNames=None):
+        '''
+        Function to initialize the class members
+
+        Parameter(s):
+        ------------
+        features: numpy.ndarray
+            Position of the feature of each node.
+        thresholds: numpy.ndarray
+            Threshold of each node (NaN for the leaves).
+        leftChildren: numpy.ndarray
+            Left child of each node (the right child is the next node), the node itself for the leaves.
+        missingRight: numpy.ndarray
+            Whether the missing values go to the right child of each node.
+        leafValues: numpy.ndarray
+            Value of each leaf (already weighted for the averaged ensembles), 0 for the other nodes.
+        roots: numpy.ndarray
+            Root node of each tree.
+        depth: int
+            Depth of the deepest tree.
+        baseScore: float
+            Value added to the sum of the leaf values of the trees.
+        transform: str
+            Function applied to the sum: 'identity' or 'logistic'.
+        featureNames: list
+            Names of the features, in order, used to order the columns of the given DataFrames.
+        '''
+        self.features = features.astype(np.int32)
+        self.thresholds = thresholds.astype(np.float64)
+        self.leftChildren = leftChildren.astype(np.int32)
+        self.missingRight = missingRight.astype(bool)
+        self.leafValues = leafValues.astype(np.float64)
+        self.roots = roots.astype(np.int32)
+        self.depth = int(depth)
+        self.baseScore = float(baseScore)
+        self.transform = transform
+        self.featureNames = None if featureNames is None else list(featureNames)
+
+    def getValues(self, X):
+        '''
+        Returns the values of the given features as a float32 array (as compared by the tree libraries), having the
+        columns in the order of the features of the ensemble.
+
+        Parameters:
+        ----------
+        X: pandas.core.frame.DataFrame or numpy.ndarray
+            Features of the datapoints.
+        '''
+
+        if isinstance(X, pd.DataFrame) and self.featureNames is not None:
+            X = X[self.featureNames]
+
+        return np.ascontiguousarray(X, dtype=np.float32)
+
+    def predictLeaves(self, X):
+        '''
+        Returns the array (datapoints x trees) of the value of the leaf reached by each datapoint in each tree.
+
+        Parameters:
+        ----------
+        X: pandas.core.frame.DataFrame or numpy.ndarray
+            Features of the datapoints.
+        '''
+
+        values = self.getValues(X)
+        countDatapoints, countFeatures = values.shape
+        countTrees = self.roots.shape[0]
+
+        hasMissing = bool(np.isnan(values).any())
+        leafValues = np.empty((countDatapoints, countTrees))
+
+        step = max(1, MAX_TRAVERSAL_SIZE//max(countTrees, 1))
+
+        for start in range(0, countDatapoints, step):
+
+            chunk = values[start:start + step]
+            flatValues = chunk.ravel()
+
+            # Offset of the values of each datapoint in the flattened array
+            offsets = (np.arange(chunk.shape[0], dtype=np.int32)*countFeatures)[:, np.newaxis]
+
+            # Current node of each datapoint in each tree
+            nodes = np.repeat(self.roots[np.newaxis, :], chunk.shape[0], axis=0)
+
+            for _ in range(self.depth):
+
+                nodeValues = flatValues[offsets + self.features[nodes]]
+
+                # Comparisons with the NaN thresholds of the leaves (and with the missing values) are False
+                goRight = nodeValues >= self.thresholds[nodes]
+
+                if hasMissing:
+                    goRight |= np.isnan(nodeValues) & self.missingRight[nodes]
+
+                nodes = self.leftChildren[nodes] + goRight
+
+            leafValues[start:start + chunk.shape[0]] = self.leafValues[nodes]
+
+        return leafValues
+
+    def predictRaw(self, X):
+        '''
+        Returns the sum of the leaf values of the trees plus the base score (e.g. the margin of XGBoost) of each datapoint.
+
+        Parameters:
+        ----------
+        X: pandas.core.frame.DataFrame or numpy.ndarray
+            Features of the datapoints.
+        '''
+
+        return self.predictLeaves(X).sum(axis=1) + self.baseScore
+
+    def transformRaw(self, output):
+        '''
+        Returns the given raw sums transformed by the function of the ensemble.
+
+        Parameters:
+        ----------
+        output: numpy.ndarray
+            Raw sums returned by predictRaw.
+        '''
+
+        return 1/(1 + np.exp(-output)) if self.transform == 'logistic' else output
+
+    def predict(self, X):
+        '''
+        Returns the output of the ensemble for each datapoint: the raw sum transformed by the function of the ensemble
+        (e.g. the probability of the positive class for XGBoost).
+
+        Parameters:
+        ----------
+        X: pandas.core.frame.DataFrame or numpy.ndarray
+            Features of the datapoints.
+        '''
+
+        return self.transformRaw(self.predictRaw(X))
+
+def getEnsembleArrays(listTrees):
+    '''
+    Returns the arrays of a CompiledEnsemble (features, thresholds, left children, missing values to the right, leaf
+    values, roots and depth) built from the given trees. Each tree is given as a dictionary of arrays having its own
+    node numbering: 'feature', 'threshold' (a datapoint goes to the left when its value is lower than the threshold),
+    'left' and 'right' (-1 for the leaves), 'missingLeft' and 'value' (leaf values). The nodes of each tree are
+    numbered again level by level, so that the right child of each node follows its left child.
+
+    Parameters:
+    ----------
+    listTrees: list
+        List of the trees (or a list of CompiledEnsembles, whose trees are concatenated).
+    '''
+
+    if len(listTrees) > 0 and isinstance(listTrees[0], CompiledEnsemble):
+
+        offsets = np.cumsum([0] + [ensemble.features.shape[0] for ensemble in listTrees[:-1]])
+
+        return [np.concatenate([ensemble.features for ensemble in listTrees]),
+                np.concatenate([ensemble.thresholds for ensemble in listTrees]),
+                np.concatenate([ensemble.leftChildren + offset for ensemble, offset in zip(listTrees, offsets)]),
+                np.concatenate([ensemble.missingRight for ensemble in listTrees]),
+                np.concatenate([ensemble.leafValues for ensemble in listTrees]),
+                np.concatenate([ensemble.roots + offset for ensemble, offset in zip(listTrees, offsets)]),
+                max(ensemble.depth for ensemble in listTrees)]
+
+    listArrays = {name: list() for name in ['feature', 'threshold', 'left', 'missingRight', 'value']}
+    roots, offset, depth = list(), 0, 0
+
+    for tree in listTrees:
+
+        isLeaf = tree['left'] < 0
+
+        # Nodes in the new order: level by level, the children of each node of a level next to each other
+        listLevels, level = [np.array([0])], np.array([0])
+
+        while not isLeaf[level].all():
+            level = level[~isLeaf[level]]
+            level = np.column_stack([tree['left'][level], tree['right'][level]]).ravel()
+            listLevels.append(level)
+
+        order = np.concatenate(listLevels)
+        newIds = np.full(isLeaf.shape[0], -1)
+        newIds[order] = np.arange(order.shape[0]) + offset
+
+        isLeaf = isLeaf[order]
+
+        listArrays['feature'].append(np.where(isLeaf, 0, tree['feature'][order]))
+        listArrays['threshold'].append(np.where(isLeaf, np.nan, tree['threshold'][order]))
+        listArrays['left'].append(np.where(isLeaf, newIds[order], newIds[np.maximum(tree['left'][order], 0)]))
+        listArrays['missingRight'].append(~isLeaf & ~tree['missingLeft'][order])
+        listArrays['value'].append(np.where(isLeaf, tree['value'][order], 0))
+
+        roots.append(offset)
+        offset += order.shape[0]
+        depth = max(depth, len(listLevels) - 1)
+
+    return [np.concatenate(listArrays[name]) for name in ['feature', 'threshold', 'left', 'missingRight', 'value']] + \
+           [np.array(roots, dtype=np.int32), depth]
+
+def compileSklearnTrees(estimator):
+    '''
+    Returns the CompiledEnsemble of the given sklearn decision tree, random forest, extra trees or (binary) gradient
+    boosting Model, giving the probability of the positive class for the classifiers (the raw margin for the gradient
+    boosting, with a logistic transform) and the predicted value for the regressors.
+
+    Parameters:
+    ----------
+    estimator: sklearn.base.BaseEstimator
+        Trained sklearn tree Model.
+    '''
+
+    isBoosting = type(estimator).__name__.startswith('GradientBoosting')
+
+    listEstimators = [estimator] if hasattr(estimator, 'tree_') else list(np.ravel(estimator.estimators_))
+    listTrees = list()
+
+    for treeEstimator in listEstimators:
+
+        tree = treeEstimator.tree_
+        values = tree.value[:, 0, :]
+
+        if isBoosting:
+            # Regression trees fitted on the gradients, weighted by the learning rate
+            values = values[:, 0]*estimator.learning_rate
+        elif values.shape[1] > 1:
+            # Probability of the positive class (the values are the weighted counts of the classes, or their fractions),
+            # averaged over the trees
+            values = values[:, -1]/values.sum(axis=1)/len(listEstimators)
+        else:
+            values = values[:, 0]/len(listEstimators)
+
+        # The sklearn trees send the datapoints to the left when the value is lower than or equal to the threshold,
+        # compared in float32: this is the same as being lower than the next float64 above the threshold.
+        listTrees.append({'feature': tree.feature, 'threshold': np.nextafter(tree.threshold, np.inf),
+                          'left': tree.children_left, 'right': tree.children_right,
+                          'missingLeft': np.asarray(getattr(tree, 'missing_go_to_left', np.zeros(tree.node_count)),
+                                                    dtype=bool),
+                          'value': values})
+
+    ensemble = CompiledEnsemble(*getEnsembleArrays(listTrees), featureNames=getattr(estimator, 'feature_names_in_', None))
+
+    if isBoosting:
+
+        if hasattr(estimator, 'classes_') and len(estimator.classes_) != 2:
+            raise ValueError('Only the binary GradientBoostingClassifier can be compiled.')
+
+        # Initial raw prediction (log-odds of the prior of the positive class for the classifier), found as the raw
+        # prediction of the Model for a datapoint minus the sum of the leaf values of its trees.
+        xZero = np.zeros((1, estimator.n_features_in_))
+        xZero = xZero if ensemble.featureNames is None else pd.DataFrame(xZero, columns=ensemble.featureNames)
+        rawPrediction = estimator.decision_function(xZero) if hasattr(estimator, 'classes_') else estimator.predict(xZero)
+
+        ensemble.baseScore = float(np.ravel(rawPrediction)[0] - ensemble.predictRaw(xZero)[0])
+        ensemble.transform = 'logistic' if hasattr(estimator, 'classes_') else 'identity'
+
+    return ensemble
+
+def parseBaseScore(value):
+    '''
+    Returns the base score (of the first output) saved in the configuration of an XGBoost Booster: a number as text
+    (e.g. '5E-1') before XGBoost 2, a vector as text (e.g. '[3.8853887E-1]') since XGBoost 2.
+
+    Parameters:
+    ----------
+    value: str
+        Value of 'base_score' in the configuration.
+    '''
+
+    return float(str(value).strip().strip('[]').split(',')[0])
+
+def compileXGBoost(estimator):
+    '''
+    Returns the CompiledEnsemble of the given XGBoost Model (XGBClassifier, XGBRegressor or Booster, with the 'gbtree'
+    booster), giving the same output as its 'predict_proba' (binary classification) or 'predict' (regression). The
+    trees are read from the JSON dump of the Booster.
+
+    Parameters:
+    ----------
+    estimator: object
+        Trained XGBoost Model.
+    '''
+
+    booster = estimator.get_booster() if hasattr(estimator, 'get_booster') else estimator
+    config = json.loads(booster.save_config())
+
+    if config['learner']['gradient_booster']['name'] != 'gbtree':
+        raise ValueError('Only the gbtree booster of XGBoost can be compiled.')
+
+    featureNames = booster.feature_names
+    dictFeatures = {name: i for i, name in enumerate(featureNames or [])}
+
+    # Trees used for the predictions (up to the best iteration when early stopping was used)
+    listDumps = booster.get_dump(dump_format='json')
+    bestIteration = getattr(booster, 'best_iteration', None) if hasattr(booster, 'best_iteration') else None
+    if bestIteration is not None:
+        numParallelTree = int(config['learner']['gradient_booster'].get('gbtree_model_param', {})
+                              .get('num_parallel_tree', 1))
+        listDumps = listDumps[:(int(bestIteration) + 1)*numParallelTree]
+
+    listTrees = list()
+
+    for dump in listDumps:
+
+        dictNodes = dict() # Dictionary to store the node id as key and the node as value.
+        listNodes = [json.loads(dump)]
+
+        while listNodes:
+            node = listNodes.pop()
+            dictNodes[node['nodeid']] = node
+            listNodes.extend(node.get('children', []))
+
+        countNodes = max(dictNodes) + 1
+        tree = {'feature': np.zeros(countNodes, dtype=np.int32), 'threshold': np.zeros(countNodes),
+                'left': np.full(countNodes, -1), 'right': np.full(countNodes, -1),
+                'missingLeft': np.zeros(countNodes, dtype=bool), 'value': np.zeros(countNodes)}
+
+        for nodeId, node in dictNodes.items():
+
+            if 'leaf' in node:
+                tree['value'][nodeId] = node['leaf']
+                continue
+
+            split = node['split']
+            tree['feature'][nodeId] = dictFeatures[split] if split in dictFeatures else int(str(split).lstrip('f'))
+            # XGBoost compares the float32 value with the float32 split condition (lower goes to 'yes')
+            tree['threshold'][nodeId] = np.float32(node['split_condition'])
+            tree['left'][nodeId], tree['right'][nodeId] = node['yes'], node['no']
+            tree['missingLeft'][nodeId] = node['missing'] == node['yes']
+
+        listTrees.append(tree)
+
+    objective = config['learner']['objective']['name']
+    baseScore = parseBaseScore(config['learner']['learner_model_param']['base_score'])
+
+    if objective in ['binary:logistic', 'reg:logistic']:
+        # The base score is a probability: the margin starts from its log-odds
+        return CompiledEnsemble(*getEnsembleArrays(listTrees), baseScore=np.log(baseScore/(1 - baseScore)),
+                                transform='logistic', featureNames=featureNames)
+    elif objective in ['binary:logitraw', 'reg:squarederror', 'reg:pseudohubererror', 'reg:absoluteerror']:
+        return CompiledEnsemble(*getEnsembleArrays(listTrees), baseScore=baseScore, transform='identity',
+                                featureNames=featureNames)
+
+    raise ValueError('The XGBoost objective ' + objective + ' cannot be compiled.')
+
+def CompileEstimator(estimator):
+    '''
+    Returns the CompiledEnsemble of the given tree Model (XGBoost or sklearn trees).
+
+    Parameters:
+    ----------
+    estimator: object
+        Trained tree Model.
+    '''
+
+    module = type(estimator).__module__
+
+    if module.startswith('xgboost'):
+        return compileXGBoost(estimator)
+    elif module.startswith('sklearn') and (hasattr(estimator, 'tree_') or hasattr(estimator, 'estimators_')):
+        return compileSklearnTrees(estimator)
+
+    raise ValueError('The Model ' + type(estimator).__name__ + ' cannot be compiled.')
+
+def compileCalibrator(calibrator):
+    '''
+    Returns the calibration of the given sklearn calibrator as a tuple of arrays: ('sigmoid', a, b) for the sigmoid
+    (Platt) calibration and ('isotonic', thresholds, values) for the isotonic calibration.
+
+    Parameters:
+    ----------
+    calibrator: object
+        Calibrator of a CalibratedClassifierCV.
+    '''
+
+    if hasattr(calibrator, 'a_'):
+        return ('sigmoid', float(calibrator.a_), float(calibrator.b_))
+    elif hasattr(calibrator, 'X_thresholds_'):
+        return ('isotonic', np.asarray(calibrator.X_thresholds_, dtype=np.float64),
+                np.asarray(calibrator.y_thresholds_, dtype=np.float64))
+
+    raise ValueError('The calibrator ' + type(calibrator).__name__ + ' cannot be compiled.')
+
+class CompiledModel:
+    '''
+    Class to score claims with a Model (Pipeline) whose tree ensemble and calibration have been flattened into arrays
+    by CompileModel. The featurization steps of the Pipeline (e.g. Standardize and ResponseEncoder) are kept as they are;
+    the final Model is replaced by its CompiledEnsembles (one for each calibrated classifier of a CalibratedClassifierCV)
+    and their calibrations, so that a prediction needs neither the DMatrix of XGBoost nor the validation of sklearn.
+    It is meant for the low-latency scoring of single claims and small batches; the large batches are scored faster by
+    the native prediction of the tree libraries (see BenchmarkCompiledModel).
+    '''
+    def __init__(self, listMembers, featurizer=None, classes=(0, 1)):
+        '''
+        Function to initialize the class members
+
+        Parameter(s):
+        ------------
+        listMembers: list
+            List of the (CompiledEnsemble, output, calibration) of each member, whose probabilities are averaged.
+            'output' is 'raw' (margin, as the decision_function of the Model) or 'proba' (probability of the positive
+            class); 'calibration' is a tuple returned by compileCalibrator, or None.
+        featurizer: object
+            Fitted featurization steps applied to the claims before the ensembles (or None).
+        classes: tuple
+            Class labels (negative, positive).
+        '''
+        self.listMembers = listMembers
+        self.featurizer = featurizer
+        self.classes_ = np.asarray(classes)
+
+        # Trees of all the members in a single ensemble, so that the datapoints go down all of them at once, along with
+        # the position of the first tree of each member.
+        self.ensemble = CompiledEnsemble(*getEnsembleArrays([member[0] for member in listMembers]),
+                                         featureNames=listMembers[0][0].featureNames)
+        self.memberStarts = np.cumsum([0] + [member[0].roots.shape[0] for member in listMembers[:-1]])
+
+    def predictPositive(self, X):
+        '''
+        Returns the probability of the positive class of each datapoint.
+
+        Parameters:
+        ----------
+        X: pandas.core.frame.DataFrame
+            Claims (preprocessed with PreprocessData, as given to the Model).
+        '''
+
+        xFeatures = X if self.featurizer is None else self.featurizer.transform(X)
+
+        # Sum of the leaf values of the trees of each member
+        sums = np.add.reduceat(self.ensemble.predictLeaves(xFeatures), self.memberStarts, axis=1)
+
+        probPositive = np.zeros(xFeatures.shape[0])
+
+        for i, (ensemble, output, calibration) in enumerate(self.listMembers):
+
+            prediction = sums[:, i] + ensemble.baseScore
+            prediction = prediction if output == 'raw' else ensemble.transformRaw(prediction)
+
+            if calibration is None:
+                probMember = prediction
+            elif calibration[0] == 'sigmoid':
+                probMember = 1/(1 + np.exp(calibration[1]*prediction + calibration[2]))
+            else:
+                probMember = np.interp(prediction, calibration[1], calibration[2])
+
+            # Probabilities which minimally exceed 1 (as done by the calibrated classifiers of sklearn)
+            if calibration is not None:
+                probMember[(1.0 < probMember) & (probMember <= 1.0 + 1e-5)] = 1.0
+
+            probPositive += probMember
+
+        return probPositive/len(self.listMembers)
+
+    def predict_proba(self, X):
+        '''
+        Returns the probabilities of the classes (negative, positive) of each datapoint, as the 'predict_proba' of the
+        original Model.
+
+        Parameters:
+        ----------
+        X: pandas.core.frame.DataFrame
+            Claims (preprocessed with PreprocessData, as given to the Model).
+        '''
+
+        probPositive = self.predictPositive(X)
+
+        return np.column_stack([1 - probPositive, probPositive])
+
+    def predict(self, X):
+        '''
+        Returns the predicted class of each datapoint (positive when its probability is at least 0.5).
+
+        Parameters:
+        ----------
+        X: pandas.core.frame.DataFrame
+            Claims (preprocessed with PreprocessData, as given to the Model).
+        '''
+
+        return self.classes_[(self.predictPositive(X) >= 0.5).astype(int)]
+
+def CompileModel(model):
+    '''
+    Exports the given trained Model (a tree Model, a CalibratedClassifierCV of a tree Model, or a Pipeline ending with
+    one of them) as a CompiledModel, whose arrays can be saved with joblib (e.g. ModelRegistry.register) and
+    memory-mapped when loaded.
+
+    Parameters:
+    ----------
+    model: object
+        Trained Model or Pipeline.
+    '''
+
+    featurizer, estimator = None, model
+
+    if hasattr(model, 'steps'):
+        featurizer, estimator = (model[:-1] if len(model.steps) > 1 else None), model.steps[-1][1]
+
+    classes = tuple(getattr(estimator, 'classes_', (0, 1)))
+
+    if len(classes) != 2:
+        raise ValueError('Only the binary classification Models can be compiled.')
+
+    listMembers = list() # List to store the (ensemble, output, calibration) of each member.
+
+    if hasattr(estimator, 'calibrated_classifiers_'):
+
+        for calibratedClassifier in estimator.calibrated_classifiers_:
+
+            baseEstimator = getattr(calibratedClassifier, 'estimator', None)
+            if baseEstimator is None:
+                baseEstimator = calibratedClassifier.base_estimator
+
+            # The calibration is fitted on the decision_function of the Model when it has one, on the probabilities
+            # of the positive class otherwise.
+            output = 'raw' if hasattr(baseEstimator, 'decision_function') else 'proba'
+
+            listMembers.append((CompileEstimator(baseEstimator), output,
+                                compileCalibrator(calibratedClassifier.calibrators[0])))
+
+    else:
+
+        listMembers.append((CompileEstimator(estimator), 'proba', None))
+
+    return CompiledModel(listMembers, featurizer, classes)
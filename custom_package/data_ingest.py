@@ -0,0 +1,265 @@
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+import numpy as np
+import pandas as pd
+
+# Version of the cache format. The cached datasets of another version are parsed again.
+CACHE_VERSION = 2
+
+def getColumnKind(col):
+    '''
+    Returns the kind of the given column in the schema used to parse the source CSV files:
+    'category' for the codes (stored as integer codes and their categories), 'datetime' for the dates, 'renal' for the
+    'RenalDiseaseIndicator' (normalized to 0/1), 'string' for the identifiers and the class label, and 'numeric' for the
+    other columns (the Claim Procedure Codes are numeric, as they are when reading the whole file).
+
+    Parameters:
+    ----------
+    col: str
+        Name of the column.
+    '''
+
+    if 'Physician' in col or 'DiagnosisCode' in col or 'DiagnosisGroupCode' in col:
+        return 'category'
+    elif 'Dt' in col or col in ['DOB', 'DOD']:
+        return 'datetime'
+    elif col == 'RenalDiseaseIndicator':
+        return 'renal'
+    elif col in ['BeneID', 'ClaimID', 'Provider', 'PotentialFraud']:
+        return 'string'
+
+    return 'numeric'
+
+def GetStringCategorical(column):
+    '''
+    Returns the given text (object or categorical) column as a categorical column whose categories are strings: the
+    values which are not strings (e.g. the numbers of a large file inferred as mixed numbers and strings, in different
+    blocks of rows) are converted to their string value, by which the codes are compared, so that the categories stay
+    unique once saved as strings (see SaveColumnarCache).
+
+    Parameters:
+    ----------
+    column: pandas.core.series.Series
+        Text column.
+    '''
+
+    if isinstance(column.dtype, pd.CategoricalDtype):
+
+        if pd.api.types.infer_dtype(column.cat.categories, skipna=True) == 'string':
+            return column
+
+        column = column.astype(object)
+
+    if pd.api.types.infer_dtype(column, skipna=True) != 'string':
+        column = column.map(str, na_action='ignore')
+
+    return column.astype('category')
+
+def GetFileHash(path):
+    '''
+    Returns the SHA-256 hash of the given file.
+
+    Parameters:
+    ----------
+    path: str
+        Path of the file.
+    '''
+
+    sha256 = hashlib.sha256()
+
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            sha256.update(block)
+
+    return sha256.hexdigest()
+
+def ParseDataset(sourceFile):
+    '''
+    Parses the given source CSV file (Provider, Beneficiary, Inpatient or Outpatient data) once, with the explicit
+    schema of getColumnKind: the codes are converted to categoricals, the dates to datetime64 and the
+    'RenalDiseaseIndicator' to 0/1. The codes keep the datatype inferred by pandas.read_csv for the whole file (e.g. a
+    Claim Diagnosis Code column having only numbers and empty values is read as float, so that its code 4019 is the
+    code '4019.0' as when reading the file without this cache), so that the features given by PreprocessData are
+    unchanged.
+
+    Parameters:
+    ----------
+    sourceFile: str
+        Path of the source CSV file.
+    '''
+
+    columns = pd.read_csv(sourceFile, nrows=0).columns
+    dictKinds = {col: getColumnKind(col) for col in columns}
+
+    data = pd.read_csv(sourceFile, dtype={col: object for col, kind in dictKinds.items()
+                                          if kind in ['string', 'renal', 'datetime']})
+
+    for col, kind in dictKinds.items():
+
+        if kind == 'category':
+            # The codes inferred as numbers keep their datatype, the text codes get string categories
+            data[col] = GetStringCategorical(data[col]) if data[col].dtype == object else data[col].astype('category')
+        elif kind == 'datetime':
+            data[col] = pd.to_datetime(data[col])
+        elif kind == 'renal':
+            # RenalDiseaseIndicator column has two unique values: 0 and 'Y'. Replace the value of 'Y' with 1.
+            data[col] = pd.to_numeric(data[col].replace(to_replace='Y', value=1)).astype(np.int8)
+
+    return data
+
+def SaveColumnarCache(data, cachePath, sourceHash):
+    '''
+    Saves the given parsed dataset as a directory having one '.npy' file per column (the integer codes and the
+    categories for the categorical columns) and a 'schema.json' file. The directory is written under a temporary name
+    and renamed at the end, so that a partially written cache is never read.
+
+    Parameters:
+    ----------
+    data: pandas.core.frame.DataFrame
+        Parsed dataset (as returned by ParseDataset).
+    cachePath: str
+        Path of the cache directory.
+    sourceHash: str
+        SHA-256 hash of the source file.
+    '''
+
+    tempPath = tempfile.mkdtemp(dir=os.path.dirname(cachePath) or '.', prefix='.tmp-')
+
+    schema = {'version': CACHE_VERSION, 'sourceHash': sourceHash, 'rows': int(data.shape[0]), 'columns': list()}
+
+    for i, col in enumerate(data.columns):
+
+        fileName = 'col%03d' % i
+        kind = 'numeric'
+
+        if isinstance(data[col].dtype, pd.CategoricalDtype):
+            np.save(os.path.join(tempPath, fileName + '.codes.npy'), np.asarray(data[col].cat.codes))
+            categories = data[col].cat.categories
+            np.save(os.path.join(tempPath, fileName + '.categories.npy'),
+                    categories.to_numpy(dtype=str) if categories.dtype == object else categories.to_numpy())
+            kind = 'category'
+        elif data[col].dtype == object:
+            # Missing values are stored as empty strings
+            np.save(os.path.join(tempPath, fileName + '.npy'), data[col].fillna('').to_numpy(dtype=str))
+            kind = 'string'
+        else:
+            np.save(os.path.join(tempPath, fileName + '.npy'), data[col].to_numpy())
+
+        schema['columns'].append({'name': col, 'kind': kind, 'file': fileName})
+
+    with open(os.path.join(tempPath, 'schema.json'), 'w') as f:
+        json.dump(schema, f)
+
+    # Another process may have written the same cache in the meantime
+    try:
+        os.rename(tempPath, cachePath)
+    except OSError:
+        shutil.rmtree(tempPath, ignore_errors=True)
+
+def LoadColumnarCache(cachePath, mmapMode='r'):
+    '''
+    Loads a dataset saved with SaveColumnarCache. The numeric and date columns and the codes of the categorical columns
+    are memory-mapped (read-only by default) and used without copying them; only the string columns are converted to
+    python objects.
+
+    Parameters:
+    ----------
+    cachePath: str
+        Path of the cache directory.
+    mmapMode: str
+        Memory-map mode ('r', 'r+', 'c' or None to read the arrays in memory), as in numpy.load.
+    '''
+
+    with open(os.path.join(cachePath, 'schema.json')) as f:
+        schema = json.load(f)
+
+    dictColumns = dict() # Dictionary to store the column name as key and its values as value.
+
+    for column in schema['columns']:
+
+        filePath = os.path.join(cachePath, column['file'])
+
+        if column['kind'] == 'category':
+
+            categories = np.load(filePath + '.categories.npy')
+            categories = categories.astype(object) if categories.dtype.kind == 'U' else categories
+            codes = np.load(filePath + '.codes.npy', mmap_mode=mmapMode)
+            dictColumns[column['name']] = pd.Categorical.from_codes(codes, categories=categories)
+
+        elif column['kind'] == 'string':
+
+            values = np.load(filePath + '.npy').astype(object)
+            values[values == ''] = np.nan
+            dictColumns[column['name']] = values
+
+        else:
+
+            dictColumns[column['name']] = np.load(filePath + '.npy', mmap_mode=mmapMode)
+
+    return pd.DataFrame(dictColumns, copy=False)
+
+def IngestDataset(sourceFile, cacheDir='Cache', mmapMode='r'):
+    '''
+    Returns the parsed dataset of the given source CSV file. The dataset is parsed once and cached in a columnar format
+    keyed by the hash of the source file; the later calls load the cache (memory-mapped) instead of parsing the file.
+
+    Parameters:
+    ----------
+    sourceFile: str
+        Path of the source CSV file.
+    cacheDir: str
+        Directory containing the cached datasets.
+    mmapMode: str
+        Memory-map mode used to load the cached dataset, as in numpy.load.
+    '''
+
+    sourceHash = GetFileHash(sourceFile)
+    fileName = os.path.splitext(os.path.basename(sourceFile))[0]
+    cachePath = os.path.join(cacheDir, '%s-%s-v%d' % (fileName, sourceHash[:16], CACHE_VERSION))
+
+    if not os.path.isfile(os.path.join(cachePath, 'schema.json')):
+
+        os.makedirs(cacheDir, exist_ok=True)
+        SaveColumnarCache(ParseDataset(sourceFile), cachePath, sourceHash)
+
+    return LoadColumnarCache(cachePath, mmapMode)
+
+def IngestDatasets(providerFile, beneficiaryFile, inpatientFile, outpatientFile, cacheDir='Cache', mmapMode='r'):
+    '''
+    Returns the parsed Provider, Beneficiary, Inpatient and Outpatient datasets (see IngestDataset), to be combined by
+    MergeDatasets. The categorical columns common to the Inpatient and Outpatient datasets are given the same categories,
+    so that they stay categorical when both datasets are concatenated.
+
+    Parameters:
+    ----------
+    providerFile: str
+        Path of the Provider CSV file.
+    beneficiaryFile: str
+        Path of the Beneficiary CSV file.
+    inpatientFile: str
+        Path of the Inpatient claims CSV file.
+    outpatientFile: str
+        Path of the Outpatient claims CSV file.
+    cacheDir: str
+        Directory containing the cached datasets.
+    mmapMode: str
+        Memory-map mode used to load the cached datasets, as in numpy.load.
+    '''
+
+    dataProvider, dataBeneficiary, dataInpatient, dataOutpatient = [
+        IngestDataset(sourceFile, cacheDir, mmapMode)
+        for sourceFile in [providerFile, beneficiaryFile, inpatientFile, outpatientFile]]
+
+    for col in dataInpatient.columns:
+
+        if col in dataOutpatient.columns and isinstance(dataInpatient[col].dtype, pd.CategoricalDtype) and \
+                isinstance(dataOutpatient[col].dtype, pd.CategoricalDtype):
+
+            categories = dataInpatient[col].cat.categories.union(dataOutpatient[col].cat.categories)
+            dataInpatient[col] = dataInpatient[col].cat.set_categories(categories)
+            dataOutpatient[col] = dataOutpatient[col].cat.set_categories(categories)
+
+    return dataProvider, dataBeneficiary, dataInpatient, dataOutpatient
@@ -1,7 +1,56 @@
 import numpy as np
 import pandas as pd
+from sklearn.base import BaseEstimator, TransformerMixin
+from custom_package.code_counter import CountCodes
+from custom_package.code_sketch import TopCodeSketch
+from custom_package.profiling import GetProfiler, Profiled
+from custom_package.feature_kernels import ComputeAge, ComputeIsNotNull, ComputePhysicianCounts, \
+    ComputeIsSamePhysMultiRole
+
+# Top Physicians, Claim Diagnosis Codes and Claim Procedure Codes (found by the EDA) for which encoded features are created.
+TOP_PHYSICIANS = ['PHY412132', 'PHY337425', 'PHY330576']
+TOP_DIAGNOSIS_CODES = ['4019', '2724', '42731', '25000', '2449', '53081', '4280']
+TOP_PROCEDURE_CODES = ['9904.0', '8154.0', '66.0', '3893.0', '3995.0']
+
+def getTopCodeLists(topCodes=None):
+    '''
+    Returns the lists of the top Physicians, Claim Diagnosis Codes and Claim Procedure Codes given by the dictionary of
+    top codes (as returned by TopCodeSketch.getTopCodes). The lists found by the EDA are used for the missing groups.
+
+    Parameters:
+    ----------
+    topCodes: dict
+        Dictionary having the group ('Physicians', 'DiagnosisCodes' or 'ProcedureCodes') as key and the list of its top
+        codes as value, or None.
+    '''
+
+    topCodes = topCodes or dict()
+
+    return list(topCodes.get('Physicians', TOP_PHYSICIANS)), list(topCodes.get('DiagnosisCodes', TOP_DIAGNOSIS_CODES)), \
+        list(topCodes.get('ProcedureCodes', TOP_PROCEDURE_CODES))
 
-def PreprocessData(xData):
+def GetMaxDate(data):
+    '''
+    Returns the maximum Claim End Date or Discharge Date of the given dataset, used to compute the 'Age' feature. The
+    columns missing from the dataset (e.g. the Discharge Date of the Outpatient claims) or having no date are ignored.
+    
+    Parameters:
+    ----------
+    data: pandas.core.frame.DataFrame
+        Merged Dataset (as returned by MergeDatasets).
+    '''
+    
+    # Maximum of each date column, without the columns missing from the dataset or having no date
+    listMaxDates = [pd.to_datetime(data[col]).max() for col in ['ClaimEndDt', 'DischargeDt'] if col in data.columns]
+    listMaxDates = [maxDate for maxDate in listMaxDates if pd.notnull(maxDate)]
+    
+    if len(listMaxDates) == 0:
+        raise ValueError('The maximum date cannot be found as the dataset has no Claim End Date and no Discharge Date: '
+                         'maxDate has to be given.')
+    
+    return max(listMaxDates)
+
+def PreprocessData(xData, maxDate=None, dropEmptyColumns=True, topCodes=None):
     '''
     Function to implement the data pipeline for transforming the dataset into the required format as required by the
     Model.
@@ -10,8 +59,24 @@ def PreprocessData(xData):
     ----------
     xData: DataFrame
         Dataset containing the features.
+    maxDate: pandas.Timestamp
+        Maximum Claim End Date or Discharge Date, used to compute the 'Age' of the Beneficiaries who are alive. If None,
+        it is computed from the given dataset. It has to be given when the dataset is processed in chunks, so that the
+        'Age' does not depend on the chunk.
+    dropEmptyColumns: bool
+        Whether to drop the columns having all null values. It has to be False when the dataset is processed in chunks,
+        so that all the chunks have the same columns.
+    topCodes: dict
+        Top Physicians, Claim Diagnosis Codes and Claim Procedure Codes for which encoded features are created (e.g. as
+        found by a TopCodeSketch). If None, the codes found by the EDA.
     '''
     
+    # Top codes for which encoded features are created
+    topPhysicians, topDiagnosisCodes, topProcedureCodes = getTopCodeLists(topCodes)
+    
+    # Profiler of the regions (does nothing unless the profiling is enabled)
+    profiler = GetProfiler('PreprocessData', xData)
+    
     # Create a copy of the dataset
     data = xData.copy()
     
@@ -35,7 +100,7 @@ def PreprocessData(xData):
         data['RenalDiseaseIndicator'].replace(to_replace='Y', value=1, inplace=True)
         
         # Convert the datatype of the 'RenalDiseaseIndicator' feature to numeric.
-        data['RenalDiseaseIndicator'] = data['RenalDiseaseIndicator'].apply(pd.to_numeric)
+        data['RenalDiseaseIndicator'] = pd.to_numeric(data['RenalDiseaseIndicator'])
 
         # 'Chronic Condition' columns
         # 'ChronicCond_' columns contains two unique values: 1 and 2. Replace the value of 2 with 0 to indicate 1 as 'Yes' 
@@ -60,7 +125,8 @@ def PreprocessData(xData):
         #region - Other columns ------------------------------------------------------------------------------------
 
         # Drop the columns having all null values
-        data.dropna(axis=1, how='all', inplace=True)
+        if dropEmptyColumns:
+            data.dropna(axis=1, how='all', inplace=True)
 
         # Replace the class label 'PotentialFraud' values. Replace 'Yes' with 1 and 'No' with 0.
         if ('PotentialFraud' in data.columns):
@@ -78,6 +144,8 @@ def PreprocessData(xData):
     # Remove the above set of columns from the dataframe.
     data.drop(columns=columnsToRemove, inplace=True)
     
+    profiler.endRegion('DataCleanup', data)
+    
     #endregion - Data Cleanup----------------------------------------------------------------------------------------
     #================================================================================================================
     
@@ -100,20 +168,22 @@ def PreprocessData(xData):
     data['TreatmentDuration'].fillna(0, inplace=True) # Filling empty values with 0 because the features 
     # 'DischargeDt' and 'AdmissionDt' exist only for Inpatient records.
 
-    data['TreatmentDuration'] = data['TreatmentDuration'].apply(int)
+    data['TreatmentDuration'] = data['TreatmentDuration'].astype(int)
     
-    maxDate = max(data['ClaimEndDt'].max(), data['DischargeDt'].max())
+    if maxDate is None:
+        maxDate = max(data['ClaimEndDt'].max(), data['DischargeDt'].max())
     
     # Generate 'Age' feature from DOB based on the DOD or the maximum date.
-    data['Age'] = data.apply(lambda x: round(((x['DOD'] - x['DOB']).days)/365) if pd.notnull(x['DOD'])
-                             else round(((maxDate - x['DOB']).days)/365), axis=1)
+    data['Age'] = ComputeAge(data['DOB'], data['DOD'], maxDate)
     
     # Generate new Feature 'IsDead' based on whether there is a value in the DOD column or not
-    data['IsDead'] = data['DOD'].apply(lambda x: 1 if pd.notnull(x) else 0)
+    data['IsDead'] = ComputeIsNotNull(data['DOD'])
     
     # Remove the set of date columns from the dataframe
     data.drop(columns=colDate, inplace=True)
     
+    profiler.endRegion('DateFeatures', data)
+    
     #endregion - Date Features---------------------------------------------------------------------------------------
     #================================================================================================================
     
@@ -137,6 +207,8 @@ def PreprocessData(xData):
     # Remove the set of old amount features from the dataframe
     data.drop(columns=colAmt, inplace=True)
     
+    profiler.endRegion('AmountFeatures', data)
+    
     #endregion - Amount Features-------------------------------------------------------------------------------------
     #================================================================================================================
     
@@ -156,80 +228,36 @@ def PreprocessData(xData):
     # Fetch the columns related to Physicians
     colPhys = [col for col in data.columns if 'Physician' in col]
     
-    # Prepare the feature 'UniquePhysCount'
-    data['UniquePhysCount'] = data[colPhys].apply(lambda x: len(set([phys for phys in x if not pd.isnull(phys)])), axis=1)
-    
-    # Prepare the feature 'PhysRoleCount'
-    data['PhysRoleCount'] = data[colPhys].apply(lambda x: len([phys for phys in x if not pd.isnull(phys)]), axis=1)
+    # Prepare the features 'UniquePhysCount' and 'PhysRoleCount'
+    data['UniquePhysCount'], data['PhysRoleCount'] = ComputePhysicianCounts(data, colPhys)
     
     # Prepare the feature 'IsSamePhysMultiRole1'
-    data['IsSamePhysMultiRole1'] = data[['UniquePhysCount','PhysRoleCount']] \
-                                .apply(lambda x: 1 if x['UniquePhysCount'] == 1 and x['PhysRoleCount'] > 1 else 0, axis=1)
+    data['IsSamePhysMultiRole1'] = ComputeIsSamePhysMultiRole(data['UniquePhysCount'], data['PhysRoleCount'], 1)
     
     # Prepare the feature 'IsSamePhysMultiRole2'
-    data['IsSamePhysMultiRole2'] = data[['UniquePhysCount','PhysRoleCount']] \
-                                .apply(lambda x: 1 if x['UniquePhysCount'] == 2 and x['PhysRoleCount'] > 2 else 0, axis=1)
+    data['IsSamePhysMultiRole2'] = ComputeIsSamePhysMultiRole(data['UniquePhysCount'], data['PhysRoleCount'], 2)
     
-    def encodeCatFeatures(dataset, existingFeatures, newFeatures, suffix=''):
-        '''
-        Function to create new encoded features for Categorical Features, based on their count of values 
-        in the existing set of features.
-
-        Parameters:
-        ----------
-        dataset: pandas.core.frame.DataFrame
-            DataFrame containing the data for which the new set of encoded features has to be created.
-        exsitingFeatures: list
-            List of existing features to considered for counting.
-        newFeatures: list
-            List of new features to encoded and created
-        suffix: str
-            Suffix to add before the new feature names.
-        '''
-
-        # Fetch the number of datapoints in the given dataset
-        lenDatapoints = dataset.shape[0]
-
-        # Iterate through each of the new features:
-        for newFeature in newFeatures:
-
-            listIsExistAllFeatures = list() # List to store a list of 0s and 1s for each existing feature,
-            # if the new feature value exist in the existing features.
-
-            # Iterate through each of the existing feature set and perform the logic to count.
-            for existingFeature in existingFeatures:
-
-                listIsExist = list() # List to store '1' if the new feature value exist in the existing feature.
-
-                for value in list(dataset[existingFeature]):
-
-                    if str(value) == str(newFeature):
-
-                        listIsExist.append(1)
-
-                    else:
-
-                        listIsExist.append(0)
-
-                listIsExistAllFeatures.append(listIsExist)
-
-            arrayCount = np.zeros(lenDatapoints) # Array to store the count of the existing features containing the new features.
-
-            # Iterate through each of the list in 'listIsExistAllFeatures' and sum the counts.
-            for i in range(0, len(listIsExistAllFeatures)):
-
-                arrayCount = arrayCount + np.array(listIsExistAllFeatures[i])
-
-            dataset[suffix + newFeature] = arrayCount.astype(int)
-
-        return dataset
+    # Fetch the columns related to the Claims Diagnosis Codes and the Claims Procedure Codes
+    colDiagCode = [col for col in data.columns if 'ClmDiagnosisCode' in col]
+    colProcCode = [col for col in data.columns if 'Procedure' in col]
+    
+    # Call the CountCodes function to generate the new encoded features for the top Physicians, the top Claim Diagnosis
+    # Codes and the top Claim Procedure Codes, all in a single pass over the code features.
+    dataCodeCount = CountCodes(data, [
+        (colPhys, topPhysicians, ''),
+        (colDiagCode, topDiagnosisCodes, 'ClmDiagCode_'),
+        (colProcCode, topProcedureCodes, 'ClmProcCode_')
+    ])
     
-    # Call the encodedFeatures function to generate new features: 'PHY412132', 'PHY337425', 'PHY330576'
-    data = encodeCatFeatures(data, colPhys, ['PHY412132', 'PHY337425', 'PHY330576'])
+    # Add the new features of the top Physicians (by default: 'PHY412132', 'PHY337425', 'PHY330576')
+    for newFeature in topPhysicians:
+        data[newFeature] = dataCodeCount[newFeature]
     
     # Now remove the original features related to the Physicians
     data.drop(columns=['AttendingPhysician','OperatingPhysician','OtherPhysician'], inplace=True)
     
+    profiler.endRegion('PhysicianFeatures', data)
+    
     #endregion - Physician Features----------------------------------------------------------------------------------
     #================================================================================================================
     
@@ -238,15 +266,15 @@ def PreprocessData(xData):
     #region - Claim Diagnosis Features-------------------------------------------------------------------------------
     #================================================================================================================
     
-    # Fetch the columns related to the Claims Diagnosis Codes
-    colDiagCode = [col for col in data.columns if 'ClmDiagnosisCode' in col]
-    
-    # Call the encodeCatFeatures function to generate new feature for the top 7 Claim Diagnosis Codes
-    data = encodeCatFeatures(data, colDiagCode, ['4019', '2724', '42731', '25000', '2449', '53081', '4280'], 'ClmDiagCode_')
+    # Add the new features for the top Claim Diagnosis Codes
+    for newFeature in [col for col in dataCodeCount.columns if col.startswith('ClmDiagCode_')]:
+        data[newFeature] = dataCodeCount[newFeature]
     
     # For each of the Claim Diagnosis Code Features, replace the values with 1 if there is a value, else replace with 0 .
     for diagCode in colDiagCode:
-        data[diagCode] = data[diagCode].apply(lambda x: 1 if not pd.isnull(x) else 0)
+        data[diagCode] = ComputeIsNotNull(data[diagCode])
+    
+    profiler.endRegion('ClaimDiagnosisFeatures', data)
     
     #endregion - Claim Diagnosis Features----------------------------------------------------------------------------
     #================================================================================================================
@@ -256,15 +284,15 @@ def PreprocessData(xData):
     #region - Claim Procedure Features-------------------------------------------------------------------------------
     #================================================================================================================
     
-    # Fetch the columns related to the Claims Procedure Codes
-    colProcCode = [col for col in data.columns if 'Procedure' in col]
-    
-    # Call the encodeCatFeatures function to generate new feature for the top 5 Claim Procedure Codes
-    data = encodeCatFeatures(data, colProcCode, ['9904.0', '8154.0', '66.0', '3893.0', '3995.0'], 'ClmProcCode_')
+    # Add the new features for the top Claim Procedure Codes
+    for newFeature in [col for col in dataCodeCount.columns if col.startswith('ClmProcCode_')]:
+        data[newFeature] = dataCodeCount[newFeature]
     
     # For each of the Claim Procedure Code Features, replace the values with 1 if there is a value, else replace with 0 .
     for procCode in colProcCode:
-        data[procCode] = data[procCode].apply(lambda x: 1 if not pd.isnull(x) else 0)
+        data[procCode] = ComputeIsNotNull(data[procCode])
+    
+    profiler.endRegion('ClaimProcedureFeatures', data)
     
     #endregion - Claim Procedure Features----------------------------------------------------------------------------
     #================================================================================================================
@@ -277,7 +305,9 @@ def PreprocessData(xData):
     # For each of the Claim Admit Diagnosis Code and Diagnosis Group Code Features, 
     # replace the values with 1 if there is a value, else replace with 0 .
     for code in ['ClmAdmitDiagnosisCode', 'DiagnosisGroupCode']:
-        data[code] = data[code].apply(lambda x: 1 if not pd.isnull(x) else 0)
+        data[code] = ComputeIsNotNull(data[code])
+    
+    profiler.endRegion('ClaimAdmitDiagnosisCodeFeatures', data)
     
     #endregion - Claim Admit Diagnosis Code and Diagnosis Group Code Features----------------------------------------
     #================================================================================================================
@@ -290,6 +320,8 @@ def PreprocessData(xData):
     # Gender Feature has two values: 1 and 2. Replace 2 with 0.
     data['Gender'].replace(to_replace=2, value=0, inplace=True)
     
+    profiler.endRegion('GenderFeature', data)
+    
     #endregion - Gender Feature--------------------------------------------------------------------------------------
     #================================================================================================================
     
@@ -298,4 +330,218 @@ def PreprocessData(xData):
                        'ClmDiagnosisCode_5', 'ClmDiagnosisCode_6', 'ClmDiagnosisCode_7', 'ClmDiagnosisCode_8'], 
               inplace=True)
     
-    return data
\ No newline at end of file
+    profiler.end(data)
+    
+    return data
+
+
+class DataPreprocessor(BaseEstimator, TransformerMixin):
+    '''
+    Class to implement the data pipeline of PreprocessData as a transformer, which can be used in the sklearn's Pipeline
+    and pickled along with the Model.
+    The fit() method freezes the input columns, the plan of the output features and the maximum date, so that the
+    transform() method does not have to find the columns again. The transform() method computes each output feature
+    directly from the input columns into a single preallocated float32 array, without copying the input DataFrame.
+    '''
+    def __init__(self, maxDate=None, dropEmptyColumns=True, asFrame=True, topCodes=None, countTopCodes=(3, 7, 5)):
+        '''
+        Function to initialize the class members
+
+        Parameter(s):
+        ------------
+        maxDate: pandas.Timestamp
+            Maximum Claim End Date or Discharge Date, used to compute the 'Age' feature. If None, it is found from the
+            dataset given to the fit() method.
+        dropEmptyColumns: bool
+            Whether to leave out the columns having all null values in the dataset given to the fit() method.
+        asFrame: bool
+            Whether transform() returns a DataFrame (True) or the float32 array (False) of the output features.
+        topCodes: object
+            Top Physicians, Claim Diagnosis Codes and Claim Procedure Codes for which encoded features are created:
+            None for the codes found by the EDA, a dictionary of the codes (as returned by TopCodeSketch.getTopCodes),
+            a TopCodeSketch (e.g. updated over a stream of claims larger than the memory, and merged across workers)
+            or 'sketch' to find them from the dataset given to the fit() method.
+        countTopCodes: tuple
+            Number of top Physicians, Claim Diagnosis Codes and Claim Procedure Codes taken from the TopCodeSketch.
+        '''
+        self.maxDate = maxDate
+        self.dropEmptyColumns = dropEmptyColumns
+        self.asFrame = asFrame
+        self.topCodes = topCodes
+        self.countTopCodes = countTopCodes
+
+    @Profiled
+    def fit(self, X, y=None):
+        '''
+        Function called on a Dataset (usually Train Dataset) to freeze the input and output features and the maximum date.
+
+        Parameters:
+        ----------
+        X: pandas.core.frame.DataFrame
+            Merged Dataset (as returned by MergeDatasets).
+        '''
+
+        # Input columns, and the columns having all null values which are left out (as done by PreprocessData)
+        self.inputColumns_ = list(X.columns)
+        self.emptyColumns_ = [col for col in X.columns if X[col].isna().all()] if self.dropEmptyColumns else []
+
+        columns = [col for col in self.inputColumns_ if col not in self.emptyColumns_ and
+                   col not in ['ClmProcedureCode_3', 'ClmProcedureCode_4', 'ClmProcedureCode_5']]
+
+        # Columns used to generate the new features
+        self.colPhys_ = [col for col in columns if 'Physician' in col]
+        self.colDiagCode_ = [col for col in columns if 'ClmDiagnosisCode' in col]
+        self.colProcCode_ = [col for col in columns if 'Procedure' in col]
+
+        # Columns which are not output features
+        columnsToRemove = [col for col in columns if ('Dt' in col or 'DOB' in col or 'DOD' in col or 'Amt' in col)]
+        columnsToRemove += self.colPhys_ + ['ClaimID', 'BeneID', 'Provider', 'NoOfMonths_PartACov', 'NoOfMonths_PartBCov',
+                                           'PotentialFraud', 'DiagnosisGroupCode', 'ClmProcedureCode_1',
+                                           'ClmDiagnosisCode_3', 'ClmDiagnosisCode_4', 'ClmDiagnosisCode_5',
+                                           'ClmDiagnosisCode_6', 'ClmDiagnosisCode_7', 'ClmDiagnosisCode_8']
+
+        # Plan of the input columns kept as output features: list of (input column, kind of transformation)
+        self.columnPlan_ = list()
+
+        for col in columns:
+
+            if col in columnsToRemove:
+                continue
+            elif col in self.colDiagCode_ + self.colProcCode_ + ['ClmAdmitDiagnosisCode']:
+                kind = 'indicator'
+            elif col == 'RenalDiseaseIndicator':
+                kind = 'renal'
+            elif 'Chronic' in col or col == 'Gender':
+                kind = 'binary'
+            else:
+                kind = 'numeric'
+
+            self.columnPlan_.append((col, kind))
+
+        # Maximum date used to compute the 'Age' feature
+        if self.maxDate is None:
+            self.maxDate_ = GetMaxDate(X)
+        else:
+            self.maxDate_ = pd.Timestamp(self.maxDate)
+
+        # Top codes for which encoded features are created, kept with the fitted transformer
+        if isinstance(self.topCodes, str) and self.topCodes == 'sketch':
+            topCodes = TopCodeSketch().update(X).getTopCodes(self.countTopCodes)
+        elif isinstance(self.topCodes, TopCodeSketch):
+            topCodes = self.topCodes.getTopCodes(self.countTopCodes)
+        else:
+            topCodes = self.topCodes
+
+        topPhysicians, topDiagnosisCodes, topProcedureCodes = getTopCodeLists(topCodes)
+        self.topCodes_ = {'Physicians': topPhysicians, 'DiagnosisCodes': topDiagnosisCodes,
+                          'ProcedureCodes': topProcedureCodes}
+
+        # Names of the output features, in the same order as the features returned by PreprocessData
+        self.featureNames_ = ['Country' if col == 'County' else col for col, _ in self.columnPlan_]
+        self.featureNames_ += ['ClaimSettlementDelay', 'TreatmentDuration', 'Age', 'IsDead', 'TotalClaimAmount',
+                               'IPTotalAmount', 'OPTotalAmount', 'UniquePhysCount', 'PhysRoleCount',
+                               'IsSamePhysMultiRole1', 'IsSamePhysMultiRole2']
+        self.featureNames_ += topPhysicians + ['ClmDiagCode_' + code for code in topDiagnosisCodes] + \
+                              ['ClmProcCode_' + code for code in topProcedureCodes]
+
+        return self
+
+    def getColumn(self, X, col):
+        '''
+        Returns the given column of the dataset, or a column of null values if the dataset does not have it (e.g. the
+        Admission Date for a dataset having only Outpatient claims).
+
+        Parameters:
+        ----------
+        X: pandas.core.frame.DataFrame
+            Dataset to be transformed.
+        col: str
+            Name of the column.
+        '''
+
+        if col in X.columns:
+            return X[col]
+
+        return pd.Series(np.nan, index=X.index)
+
+    @Profiled
+    def transform(self, X, y=None):
+        '''
+        Function called on a Dataset (Train/Test Dataset) to generate the features required by the Model, using the
+        columns, the features and the maximum date frozen by the fit() method.
+
+        Parameters:
+        ----------
+        X: pandas.core.frame.DataFrame
+            Merged Dataset (as returned by MergeDatasets).
+        '''
+
+        # Preallocate the array of the output features
+        xTransformed = np.empty((X.shape[0], len(self.featureNames_)), dtype=np.float32)
+
+        # Input columns kept as output features
+        for i, (col, kind) in enumerate(self.columnPlan_):
+
+            values = self.getColumn(X, col)
+
+            if kind == 'indicator':
+                # Replace the values with 1 if there is a value, else replace with 0.
+                xTransformed[:, i] = ComputeIsNotNull(values)
+            elif kind == 'renal':
+                # Replace the value of 'Y' with 1.
+                xTransformed[:, i] = pd.to_numeric(values.replace(to_replace='Y', value=1))
+            elif kind == 'binary':
+                # Replace the value of 2 with 0.
+                values = np.asarray(values, dtype=np.float32)
+                xTransformed[:, i] = np.where(values == 2, 0, values)
+            else:
+                xTransformed[:, i] = values
+
+        i = len(self.columnPlan_)
+
+        # Date Features
+        dates = {col: pd.to_datetime(self.getColumn(X, col)) for col in
+                 ['ClaimStartDt', 'ClaimEndDt', 'AdmissionDt', 'DischargeDt', 'DOB', 'DOD']}
+
+        xTransformed[:, i] = (dates['ClaimEndDt'] - dates['ClaimStartDt']).dt.days
+        xTransformed[:, i+1] = (dates['DischargeDt'] - dates['AdmissionDt']).dt.days.fillna(0).astype(int)
+        xTransformed[:, i+2] = ComputeAge(dates['DOB'], dates['DOD'], self.maxDate_)
+        xTransformed[:, i+3] = ComputeIsNotNull(dates['DOD'])
+
+        # Amount Features
+        xTransformed[:, i+4] = self.getColumn(X, 'InscClaimAmtReimbursed') + \
+                               self.getColumn(X, 'DeductibleAmtPaid').fillna(0)
+        xTransformed[:, i+5] = self.getColumn(X, 'IPAnnualReimbursementAmt') + self.getColumn(X, 'IPAnnualDeductibleAmt')
+        xTransformed[:, i+6] = self.getColumn(X, 'OPAnnualReimbursementAmt') + self.getColumn(X, 'OPAnnualDeductibleAmt')
+
+        # Physician Features
+        colPhys = [col for col in self.colPhys_ if col in X.columns]
+        uniquePhysCount, physRoleCount = ComputePhysicianCounts(X, colPhys)
+
+        xTransformed[:, i+7] = uniquePhysCount
+        xTransformed[:, i+8] = physRoleCount
+        xTransformed[:, i+9] = ComputeIsSamePhysMultiRole(uniquePhysCount, physRoleCount, 1)
+        xTransformed[:, i+10] = ComputeIsSamePhysMultiRole(uniquePhysCount, physRoleCount, 2)
+
+        # Encoded features of the top Physicians, Claim Diagnosis Codes and Claim Procedure Codes found by fit()
+        topPhysicians, topDiagnosisCodes, topProcedureCodes = getTopCodeLists(self.topCodes_)
+
+        dataCodeCount = CountCodes(X, [
+            (colPhys, topPhysicians, ''),
+            ([col for col in self.colDiagCode_ if col in X.columns], topDiagnosisCodes, 'ClmDiagCode_'),
+            ([col for col in self.colProcCode_ if col in X.columns], topProcedureCodes, 'ClmProcCode_')
+        ])
+
+        xTransformed[:, i+11:] = dataCodeCount.values
+
+        if self.asFrame:
+            return pd.DataFrame(xTransformed, columns=self.featureNames_, index=X.index)
+
+        return xTransformed
+
+    def get_feature_names_out(self, input_features=None):
+        '''
+        Returns the names of the output features.
+        '''
+
+        return np.array(self.featureNames_, dtype=object)
@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+
+def getCompactDtype(col, column):
+    '''
+    Returns the compact datatype of the given column of the merged dataset (as returned by MergeDatasets), or None if
+    the column is kept as it is:
+    - int8 for the binary flags ('ChronicCond_', 'Gender', 'RenalDiseaseIndicator') and 'Race',
+    - category for the codes (Physicians, Diagnosis and Procedure Codes), the geography ('State', 'County') and the
+      repeated identifiers ('BeneID', 'Provider'),
+    - float32 for the amounts,
+    - datetime64 for the dates read as strings,
+    - the smallest integer datatype for the other integer columns.
+
+    Parameters:
+    ----------
+    col: str
+        Name of the column.
+    column: pandas.core.series.Series
+        Values of the column.
+    '''
+
+    dtype = column.dtype
+
+    if isinstance(dtype, pd.CategoricalDtype) or np.issubdtype(dtype, np.datetime64):
+        return None
+
+    if 'Chronic' in col or col in ['Gender', 'RenalDiseaseIndicator', 'Race']:
+        return np.int8 if column.notnull().all() else None
+
+    if 'Physician' in col or 'Code' in col or col in ['State', 'County', 'Country', 'BeneID', 'Provider']:
+        return 'category'
+
+    if 'Amt' in col:
+        return np.float32
+
+    if ('Dt' in col or col in ['DOB', 'DOD']) and dtype == object:
+        return 'datetime64[ns]'
+
+    if np.issubdtype(dtype, np.integer):
+        return pd.to_numeric(pd.Series([column.min(), column.max()]), downcast='integer').dtype if len(column) else None
+
+    return None
+
+def CompactDtypes(data):
+    '''
+    Converts, in place, the columns of the given merged dataset to compact datatypes (see getCompactDtype), so that the
+    dataset can be preprocessed with less memory, and returns a report having, for each converted column, the datatype
+    and the number of bytes before and after the conversion (with a last 'Total' row).
+    PreprocessData, ResponseEncoder and Standardize accept the compact datatypes.
+
+    Parameters:
+    ----------
+    data: pandas.core.frame.DataFrame
+        Merged dataset (as returned by MergeDatasets).
+    '''
+
+    listReport = list() # List to store the conversion of each column.
+
+    bytesBefore = data.memory_usage(index=False, deep=True)
+
+    for col in list(data.columns):
+
+        dtype = getCompactDtype(col, data[col])
+
+        if dtype is None:
+            continue
+
+        dtypeBefore = data[col].dtype
+
+        if col == 'RenalDiseaseIndicator' and dtypeBefore == object:
+            # RenalDiseaseIndicator column has two unique values: 0 and 'Y'. Replace the value of 'Y' with 1.
+            data[col] = pd.to_numeric(data[col].replace(to_replace='Y', value=1)).astype(dtype)
+        else:
+            data[col] = data[col].astype(dtype)
+
+        listReport.append({'Column': col, 'DtypeBefore': str(dtypeBefore), 'DtypeAfter': str(data[col].dtype),
+                           'BytesBefore': int(bytesBefore[col]),
+                           'BytesAfter': int(data[col].memory_usage(index=False, deep=True))})
+
+    bytesAfter = data.memory_usage(index=False, deep=True)
+
+    dataReport = pd.DataFrame(listReport, columns=['Column', 'DtypeBefore', 'DtypeAfter', 'BytesBefore', 'BytesAfter'])
+    dataReport.loc[len(dataReport)] = ['Total', '', '', int(bytesBefore.sum()), int(bytesAfter.sum())]
+
+    return dataReport
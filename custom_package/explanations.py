@@ -0,0 +1,404 @@
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from collections import OrderedDict
+
+def getModelSteps(model):
+    '''
+    Returns the featurization steps (a Pipeline without its last step, or None) and the final estimator of the given
+    Model.
+
+    Parameters:
+    ----------
+    model: object
+        Trained Model or Pipeline (e.g. Standardize, ResponseEncoder and XGBoost as in 'Model/BestModel.pkl').
+    '''
+
+    if hasattr(model, 'steps'):
+        return (model[:-1] if len(model.steps) > 1 else None), model.steps[-1][1]
+
+    return None, model
+
+def getEstimatorKind(estimator):
+    '''
+    Returns the kind of explanation available for the given estimator: 'xgboost' and 'lightgbm' (exact TreeSHAP
+    contributions computed by the library), 'sklearn-tree-path' (decision trees and random forests of sklearn, explained
+    by the Saabas path attribution of their decision paths, which is not SHAP) or 'perturbation' for the other
+    estimators. A tree Model wrapped in CalibratedClassifierCV is rejected, since its calibrated probability is not
+    explained by the contributions of its trees.
+
+    Parameters:
+    ----------
+    estimator: object
+        Final estimator of the Model.
+    '''
+
+    module = type(estimator).__module__
+
+    if type(estimator).__name__ == 'CalibratedClassifierCV':
+
+        # Estimator being calibrated ('base_estimator' before sklearn 1.2)
+        calibratedEstimator = getattr(estimator, 'estimator', None)
+        calibratedEstimator = getattr(estimator, 'base_estimator', None) if calibratedEstimator is None else \
+            calibratedEstimator
+
+        if calibratedEstimator is not None and getEstimatorKind(calibratedEstimator) != 'perturbation':
+            raise ValueError('A ' + type(calibratedEstimator).__name__ + ' Model wrapped in CalibratedClassifierCV '
+                             'cannot be explained by its trees: explain the uncalibrated Model instead.')
+
+    if module.startswith('xgboost'):
+        return 'xgboost'
+    elif module.startswith('lightgbm'):
+        return 'lightgbm'
+    elif module.startswith('sklearn') and (hasattr(estimator, 'tree_') or
+                                           (hasattr(estimator, 'estimators_') and
+                                            all(hasattr(tree, 'tree_') for tree in np.ravel(estimator.estimators_)) and
+                                            type(estimator).__name__.startswith(('RandomForest', 'ExtraTrees')))):
+        return 'sklearn-tree-path'
+
+    return 'perturbation'
+
+def getTreeContributionMatrix(tree, classIndex, countFeatures):
+    '''
+    Returns the sparse matrix (nodes x features) of the contribution of each node of the given sklearn tree: the change
+    of the value of the tree (probability of the class, or the predicted value for a regressor) from the parent node to
+    the node, assigned to the feature on which the parent node splits. Along with the value of the root node.
+
+    Parameters:
+    ----------
+    tree: sklearn.tree._tree.Tree
+        Tree of a sklearn decision tree.
+    classIndex: int
+        Position of the explained class (0 for a regressor).
+    countFeatures: int
+        Number of features.
+    '''
+
+    values = tree.value[:, 0, :]
+
+    # Probability of the class at each node (the values are the weighted counts of the classes, or their fractions)
+    values = values[:, classIndex]/values.sum(axis=1) if values.shape[1] > 1 else values[:, 0]
+
+    # Parent of each node
+    parents = np.full(tree.node_count, -1)
+    parents[tree.children_left[tree.children_left >= 0]] = np.flatnonzero(tree.children_left >= 0)
+    parents[tree.children_right[tree.children_right >= 0]] = np.flatnonzero(tree.children_right >= 0)
+
+    nodes = np.flatnonzero(parents >= 0)
+
+    matrix = sp.csr_matrix((values[nodes] - values[parents[nodes]], (nodes, tree.feature[parents[nodes]])),
+                           shape=(tree.node_count, countFeatures))
+
+    return matrix, values[0]
+
+class BatchExplainer:
+    '''
+    Class to explain the predictions of a Model for whole batches of claims at once, as a table having the contribution
+    of each feature to the prediction of each claim (instead of a LIME report needing thousands of Model calls for each
+    claim):
+    - XGBoost and LightGBM: exact tree path attribution (TreeSHAP) computed by the library ('pred_contribs' /
+      'pred_contrib'), in the raw margin (log-odds) of the Model.
+    - sklearn decision trees and random forests: path attribution (Saabas) of the probability of the positive class,
+      computed for all the claims and trees with a single sparse product of the decision paths. It is not SHAP: each
+      split is credited to its feature only along the path of the claim, but the contributions also sum to the output.
+    - other Models: perturbation of each feature with the values of background datapoints, done for the whole batch with
+      one call of the Model on the stacked perturbed datasets.
+    The 'Output' of a claim is its 'BaseValue' plus its contributions: for the tree Models, it is the output of the
+    Model (margin or probability); for the perturbation fallback, it is an approximation of the probability.
+    The explanations are cached by the fingerprint of the claim (hash of its features), so that the claims explained
+    before are not explained again.
+    '''
+    def __init__(self, model, backgroundData=None, countBackground=50, positiveClass=1, maxCacheEntries=100000,
+                 batchSize=100000, randomState=0):
+        '''
+        Function to initialize the class members
+
+        Parameter(s):
+        ------------
+        model: object
+            Trained Model or Pipeline (the steps before the last one are used to featurize the claims).
+        backgroundData: pandas.core.frame.DataFrame
+            Dataset (in the same form as the explained claims, e.g. the train dataset) whose datapoints replace the
+            features in the perturbation fallback. Required only for the Models explained by perturbation.
+        countBackground: int
+            Number of background datapoints (sampled from 'backgroundData') used by the perturbation fallback.
+        positiveClass: object
+            Class label whose probability is explained (fraud).
+        maxCacheEntries: int
+            Maximum number of claim explanations kept in the cache. The least recently used explanation is removed first.
+        batchSize: int
+            Maximum number of rows of the stacked perturbed datasets given to the Model at once.
+        randomState: int
+            Seed of the random number generator used to sample the background datapoints.
+        '''
+        self.model = model
+        self.featurizer, self.estimator = getModelSteps(model)
+        self.kind = getEstimatorKind(self.estimator)
+        self.positiveClass = positiveClass
+        self.maxCacheEntries = maxCacheEntries
+        self.batchSize = batchSize
+        self.cache = OrderedDict() # Dictionary to store the fingerprint of a claim as key and its explanation as value.
+        self.hits = 0 # Number of claims whose explanation was found in the cache.
+        self.misses = 0 # Number of claims explained.
+        self.background = None # Featurized background datapoints of the perturbation fallback.
+        self.featureNames = None # Names of the features given to the final estimator.
+
+        if self.kind == 'perturbation':
+
+            if backgroundData is None:
+                raise ValueError('backgroundData is required to explain a ' + type(self.estimator).__name__ +
+                                 ' Model by perturbation.')
+
+            backgroundData = backgroundData.sample(n=min(countBackground, backgroundData.shape[0]),
+                                                   random_state=randomState)
+            self.background = self.featurize(backgroundData)
+
+    def featurize(self, X):
+        '''
+        Returns the features of the given claims, as given to the final estimator of the Model.
+
+        Parameters:
+        ----------
+        X: pandas.core.frame.DataFrame
+            Claims to be explained (preprocessed with PreprocessData).
+        '''
+
+        return X if self.featurizer is None else self.featurizer.transform(X)
+
+    def getClassIndex(self):
+        '''
+        Returns the position of the positive class in the classes of the estimator (0 for a regressor).
+        '''
+
+        classes = list(getattr(self.estimator, 'classes_', []))
+
+        if len(classes) == 0:
+            return 0
+
+        return classes.index(self.positiveClass) if self.positiveClass in classes else len(classes) - 1
+
+    def explainTrees(self, xFeatures):
+        '''
+        Returns the contributions (datapoints x features) and the base values of the given features for the sklearn
+        decision tree or random forest, from the decision paths of all the trees at once.
+
+        Parameters:
+        ----------
+        xFeatures: pandas.core.frame.DataFrame
+            Features of the claims.
+        '''
+
+        listTrees = [self.estimator] if hasattr(self.estimator, 'tree_') else list(np.ravel(self.estimator.estimators_))
+        classIndex = self.getClassIndex()
+
+        listMatrices, baseValue = list(), 0.0
+
+        for tree in listTrees:
+
+            matrix, rootValue = getTreeContributionMatrix(tree.tree_, classIndex, xFeatures.shape[1])
+            listMatrices.append(matrix)
+            baseValue += rootValue/len(listTrees)
+
+        # Nodes visited by each datapoint in all the trees (the nodes of the trees are stacked in the same order)
+        decisionPath = self.estimator.decision_path(xFeatures)
+        decisionPath = decisionPath[0] if isinstance(decisionPath, tuple) else decisionPath
+
+        contributions = (decisionPath @ sp.vstack(listMatrices).tocsr()).toarray()/len(listTrees)
+
+        return contributions, np.full(xFeatures.shape[0], baseValue)
+
+    def predictOutput(self, xFeatures):
+        '''
+        Returns the output explained by the perturbation fallback: the probability of the positive class (or the
+        prediction of a regressor).
+
+        Parameters:
+        ----------
+        xFeatures: pandas.core.frame.DataFrame
+            Features of the datapoints.
+        '''
+
+        if hasattr(self.estimator, 'predict_proba'):
+            return self.estimator.predict_proba(xFeatures)[:, self.getClassIndex()]
+
+        return np.asarray(self.estimator.predict(xFeatures), dtype=np.float64)
+
+    def explainPerturbation(self, xFeatures):
+        '''
+        Returns the contributions (datapoints x features) and the base values of the given features by perturbation:
+        the contribution of a feature is the mean decrease of the output when the feature is replaced by its value in
+        each background datapoint. All the perturbed datasets are stacked and given to the Model in batches of rows.
+
+        Parameters:
+        ----------
+        xFeatures: pandas.core.frame.DataFrame
+            Features of the claims.
+        '''
+
+        countDatapoints, countFeatures = xFeatures.shape
+        values = xFeatures.to_numpy(dtype=np.float64)
+        background = self.background.to_numpy(dtype=np.float64)
+
+        output = self.predictOutput(xFeatures)
+        baseValue = self.predictOutput(self.background).mean()
+
+        # Perturbed datasets, one for each (background datapoint, feature) pair, stacked: the rows of the feature j of the
+        # background datapoint b are the datapoints having the feature j replaced by its value in b.
+        countPerturbations = background.shape[0]*countFeatures
+        perturbedOutput = np.empty(countPerturbations*countDatapoints)
+
+        # Perturbations given to the Model at once, so that the stacked datasets have at most 'batchSize' rows
+        step = max(1, self.batchSize//max(countDatapoints, 1))
+
+        for start in range(0, countPerturbations, step):
+
+            perturbations = np.arange(start, min(start + step, countPerturbations))
+            stacked = np.tile(values, (perturbations.shape[0], 1))
+
+            rows = np.arange(stacked.shape[0])
+            features = np.repeat(perturbations % countFeatures, countDatapoints)
+            stacked[rows, features] = background[np.repeat(perturbations//countFeatures, countDatapoints), features]
+
+            perturbedOutput[start*countDatapoints:(start + perturbations.shape[0])*countDatapoints] = \
+                self.predictOutput(pd.DataFrame(stacked, columns=xFeatures.columns))
+
+        perturbedOutput = perturbedOutput.reshape(background.shape[0], countFeatures, countDatapoints)
+
+        contributions = (output[np.newaxis, :] - perturbedOutput).mean(axis=0).T
+
+        return contributions, np.full(countDatapoints, baseValue)
+
+    def explainFeatures(self, xFeatures):
+        '''
+        Returns the contributions (datapoints x features) and the base values of the given features, with the explanation
+        method of the Model.
+
+        Parameters:
+        ----------
+        xFeatures: pandas.core.frame.DataFrame
+            Features of the claims.
+        '''
+
+        if self.kind == 'xgboost':
+
+            import xgboost as xgb
+
+            booster = self.estimator.get_booster() if hasattr(self.estimator, 'get_booster') else self.estimator
+            contributions = booster.predict(xgb.DMatrix(xFeatures), pred_contribs=True)
+
+        elif self.kind == 'lightgbm':
+
+            contributions = np.asarray(self.estimator.predict(xFeatures, pred_contrib=True))
+
+        elif self.kind == 'sklearn-tree-path':
+
+            return self.explainTrees(xFeatures)
+
+        else:
+
+            return self.explainPerturbation(xFeatures)
+
+        # The last column of the contributions given by XGBoost and LightGBM is the base value (bias)
+        return contributions[:, :-1], contributions[:, -1]
+
+    def explain(self, X):
+        '''
+        Explains the predictions of the Model for the given claims and returns a DataFrame (with the index of the claims)
+        having the contribution of each feature, the 'BaseValue' and the explained 'Output' (base value plus the
+        contributions). Only the claims which are not in the cache are explained. An empty batch gives an empty
+        DataFrame having the same columns.
+
+        Parameters:
+        ----------
+        X: pandas.core.frame.DataFrame
+            Claims to be explained (preprocessed with PreprocessData, as given to the Model).
+        '''
+
+        # Fingerprint of each claim (hash of its features)
+        fingerprints = pd.util.hash_pandas_object(X, index=False).to_numpy()
+
+        isCached = np.array([fingerprint in self.cache for fingerprint in fingerprints], dtype=bool)
+        rowsToExplain = np.flatnonzero(~isCached)
+
+        # Explain the claims which are not in the cache, once for each distinct claim
+        uniqueFingerprints, uniqueRows = np.unique(fingerprints[rowsToExplain], return_index=True)
+
+        if uniqueFingerprints.shape[0] > 0:
+
+            xFeatures = self.featurize(X.iloc[rowsToExplain[uniqueRows]])
+            self.featureNames = list(xFeatures.columns)
+
+            contributions, baseValues = self.explainFeatures(xFeatures)
+
+            for fingerprint, contribution, baseValue in zip(uniqueFingerprints, contributions, baseValues):
+                self.cache[fingerprint] = np.append(contribution, baseValue).astype(np.float32)
+
+        # Features of an empty batch, when no claim was explained before
+        if self.featureNames is None:
+            self.featureNames = list(self.featurize(X).columns)
+
+        self.hits += int(isCached.sum())
+        self.misses += uniqueFingerprints.shape[0]
+
+        # Gather the explanation of each claim from the cache (marking the explanations as recently used)
+        explanations = np.empty((X.shape[0], len(self.featureNames) + 1), dtype=np.float32)
+
+        for i, fingerprint in enumerate(fingerprints):
+            explanations[i] = self.cache[fingerprint]
+            self.cache.move_to_end(fingerprint)
+
+        # Remove the least recently used explanations
+        while len(self.cache) > self.maxCacheEntries:
+            self.cache.popitem(last=False)
+
+        dataExplanations = pd.DataFrame(explanations, columns=self.featureNames + ['BaseValue'], index=X.index)
+        dataExplanations['Output'] = explanations.sum(axis=1)
+
+        return dataExplanations
+
+def GetTopContributions(dataExplanations, countTop=5):
+    '''
+    Returns the compact (long) table of the given explanations: for each claim, its 'countTop' features having the
+    largest absolute contributions, with their rank and contribution, along with the base value and the explained output
+    of the claim. This table replaces the LIME report of each claim and can be saved with SaveExplanations.
+
+    Parameters:
+    ----------
+    dataExplanations: pandas.core.frame.DataFrame
+        Explanations returned by BatchExplainer.explain.
+    countTop: int
+        Number of features kept for each claim.
+    '''
+
+    featureNames = [col for col in dataExplanations.columns if col not in ['BaseValue', 'Output']]
+    contributions = dataExplanations[featureNames].to_numpy()
+    countTop = min(countTop, len(featureNames))
+
+    # Features of each claim in decreasing order of absolute contribution
+    topFeatures = np.argsort(-np.abs(contributions), axis=1, kind='stable')[:, :countTop]
+    rows = np.repeat(np.arange(contributions.shape[0]), countTop)
+
+    return pd.DataFrame({'Claim': np.repeat(dataExplanations.index.to_numpy(), countTop),
+                         'Rank': np.tile(np.arange(1, countTop + 1), contributions.shape[0]),
+                         'Feature': np.asarray(featureNames, dtype=object)[topFeatures.ravel()],
+                         'Contribution': contributions[rows, topFeatures.ravel()],
+                         'BaseValue': np.repeat(dataExplanations['BaseValue'].to_numpy(), countTop),
+                         'Output': np.repeat(dataExplanations['Output'].to_numpy(), countTop)})
+
+def SaveExplanations(dataExplanations, outputFile):
+    '''
+    Saves the given explanations (or compact table of the top contributions) as a CSV file, or as a Parquet file when
+    the name of the file ends with '.parquet'.
+
+    Parameters:
+    ----------
+    dataExplanations: pandas.core.frame.DataFrame
+        Explanations or top contributions.
+    outputFile: str
+        Path of the output file.
+    '''
+
+    if outputFile.endswith('.parquet'):
+        dataExplanations.to_parquet(outputFile, index=False)
+    else:
+        dataExplanations.to_csv(outputFile, index=False)
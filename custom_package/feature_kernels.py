@@ -0,0 +1,117 @@
+import numpy as np
+import pandas as pd
+from custom_package.code_counter import FactorizeColumn
+
+def ComputeAge(dob, dod, maxDate):
+    '''
+    Computes the 'Age' feature (in years) from the DOB based on the DOD or, if the DOD is empty, on the maximum date.
+    The number of days is rounded to years in the same way as 'round(days/365)'.
+
+    Parameters:
+    ----------
+    dob: pandas.core.series.Series
+        Date of Birth of the Beneficiaries (datetime64).
+    dod: pandas.core.series.Series
+        Date of Death of the Beneficiaries (datetime64), empty if the Beneficiary is alive.
+    maxDate: pandas.Timestamp
+        Maximum date of the dataset, used for the Beneficiaries who are alive.
+    '''
+
+    # Use the maximum date for the Beneficiaries not having a Date of Death.
+    endDate = np.where(pd.notnull(dod), np.asarray(dod, dtype='datetime64[ns]'), np.datetime64(pd.Timestamp(maxDate)))
+
+    # Number of (whole) days between the Date of Birth and the end date.
+    days = (endDate - np.asarray(dob, dtype='datetime64[ns]')) // np.timedelta64(1, 'D')
+
+    # np.round rounds half to even, as the python's round function does.
+    return np.round(days/365).astype(int)
+
+def ComputeIsNotNull(values):
+    '''
+    Returns an array having 1 where there is a value and 0 where the value is empty.
+
+    Parameters:
+    ----------
+    values: array-like
+        Values to be checked.
+    '''
+
+    # pd.notnull checks the codes of the categorical values, without converting them to objects.
+    return np.asarray(pd.notnull(values)).astype(int)
+
+def ComputePhysicianCounts(data, colPhys):
+    '''
+    Computes the 'UniquePhysCount' (number of unique Physicians) and the 'PhysRoleCount' (number of Physician roles
+    having a value) features. The Physician features are factorized into a single integer matrix, so that the unique
+    Physicians are counted by sorting each row of the matrix instead of building a set for each datapoint.
+
+    Parameters:
+    ----------
+    data: pandas.core.frame.DataFrame
+        Dataset containing the Physician features.
+    colPhys: list
+        List of the Physician features.
+    '''
+
+    lenDatapoints = data.shape[0]
+
+    if len(colPhys) == 0:
+
+        return np.zeros(lenDatapoints, dtype=int), np.zeros(lenDatapoints, dtype=int)
+
+    listCodes = list() # List to store the codes of each of the Physician features.
+    listUniques = list() # List to store the unique values of each of the Physician features.
+
+    for col in colPhys:
+
+        codes, uniques = FactorizeColumn(data[col])
+        listCodes.append(codes)
+        listUniques.append(uniques)
+
+    # Factorize the unique values of all the Physician features together, so that a Physician gets the same code in
+    # all the features.
+    _, jointUniques = pd.factorize(np.array(sum(listUniques, []), dtype=object))
+    jointUniques = list(jointUniques)
+    dictJointCode = {value: code for code, value in enumerate(jointUniques)}
+
+    # Matrix of Physician codes (-1 for the empty values) having a row for each datapoint and a column for each feature.
+    matrixPhys = np.empty((lenDatapoints, len(colPhys)), dtype=np.int64)
+
+    for i, (codes, uniques) in enumerate(zip(listCodes, listUniques)):
+
+        # The last element of the lookup is for the empty values (code -1)
+        lookup = np.array([dictJointCode[value] for value in uniques] + [-1], dtype=np.int64)
+        matrixPhys[:, i] = lookup[codes]
+
+    isPresent = matrixPhys >= 0
+
+    # Count the number of Physician roles having a value
+    physRoleCount = isPresent.sum(axis=1)
+
+    # Sort each row, then count the first value and each value different from its previous value, ignoring empty values.
+    matrixSorted = np.sort(matrixPhys, axis=1)
+    isNewValue = np.ones(matrixSorted.shape, dtype=bool)
+    isNewValue[:, 1:] = matrixSorted[:, 1:] != matrixSorted[:, :-1]
+    uniquePhysCount = (isNewValue & (matrixSorted >= 0)).sum(axis=1)
+
+    return uniquePhysCount.astype(int), physRoleCount.astype(int)
+
+def ComputeIsSamePhysMultiRole(uniquePhysCount, physRoleCount, countUnique):
+    '''
+    Returns an array having 1 where the number of unique Physicians is 'countUnique' and the number of Physician roles
+    having a value is more than 'countUnique', and 0 otherwise.
+
+    Parameters:
+    ----------
+    uniquePhysCount: array-like
+        Number of unique Physicians of each datapoint.
+    physRoleCount: array-like
+        Number of Physician roles having a value of each datapoint.
+    countUnique: int
+        Number of unique Physicians (1 for 'IsSamePhysMultiRole1' and 2 for 'IsSamePhysMultiRole2').
+    '''
+
+    uniquePhysCount = np.asarray(uniquePhysCount)
+    physRoleCount = np.asarray(physRoleCount)
+
+    return ((uniquePhysCount == countUnique) & (physRoleCount > countUnique)).astype(int)
@@ -0,0 +1,317 @@
+import os
+import pickle
+import hashlib
+import tempfile
+import functools
+import numpy as np
+import pandas as pd
+
+def updateArray(digest, values):
+    '''
+    Adds the given array to the given hash object: its datatype, its shape and its raw bytes, so that two arrays give
+    the same hash only when they have the same values. The text (object) values have no raw bytes and are first
+    converted to their 64-bit pandas hash.
+
+    Parameters:
+    ----------
+    digest: hashlib object
+        Hash object to be updated.
+    values: numpy.ndarray
+        Array of values.
+    '''
+
+    values = np.asarray(values)
+    digest.update(repr((str(values.dtype), values.shape)).encode())
+
+    if values.dtype == object:
+        values = pd.util.hash_array(values.ravel())
+
+    digest.update(np.ascontiguousarray(values).view(np.uint8))
+
+def updateFingerprint(digest, value):
+    '''
+    Adds the given value to the given hash object. The DataFrames, Series and arrays are added with their names,
+    datatypes, index and the raw bytes of their values, the other values with their representation.
+
+    Parameters:
+    ----------
+    digest: hashlib object
+        Hash object to be updated.
+    value: object
+        DataFrame, Series, array or other value (parameters, keys).
+    '''
+
+    if isinstance(value, pd.DataFrame):
+
+        digest.update(b'DataFrame' + repr(list(value.columns)).encode())
+        updateFingerprint(digest, value.index)
+
+        for i in range(value.shape[1]):
+            updateFingerprint(digest, value.iloc[:, i])
+
+    elif isinstance(value, (pd.Series, pd.Index)):
+
+        digest.update(type(value).__name__.encode() + repr((value.name, str(value.dtype), len(value))).encode())
+
+        if isinstance(value, pd.Series):
+            updateFingerprint(digest, value.index)
+
+        if isinstance(value, pd.RangeIndex):
+            digest.update(repr((value.start, value.stop, value.step)).encode())
+        elif isinstance(value.dtype, pd.CategoricalDtype):
+            updateArray(digest, value.cat.codes if isinstance(value, pd.Series) else value.codes)
+            updateFingerprint(digest, value.dtype.categories)
+        else:
+            updateArray(digest, np.asarray(value))
+
+    elif isinstance(value, np.ndarray):
+
+        digest.update(b'ndarray')
+        updateArray(digest, value)
+
+    else:
+
+        digest.update(repr(value).encode())
+
+def GetFingerprint(*values):
+    '''
+    Returns the fingerprint (hexadecimal hash) of the given values: two calls give the same fingerprint only when the
+    values have the same content, whichever objects hold them.
+
+    Parameters:
+    ----------
+    values: object
+        DataFrames, Series, arrays or other values (parameters, keys).
+    '''
+
+    digest = hashlib.blake2b(digest_size=20)
+
+    for value in values:
+        updateFingerprint(digest, value)
+
+    return digest.hexdigest()
+
+class FoldCache:
+    '''
+    Class to keep, on disk, the fitted state and the transformed datasets of the transformers (ResponseEncoder,
+    Standardize), content-addressed by the fingerprint of the input dataset and of the parameters of the transformer.
+    A transformer refitted on the same fold (e.g. by each RandomizedSearchCV run having the same training dataset)
+    loads its fitted state and its transformed dataset instead of computing them again, so that only the classifier is
+    refitted.
+    Each entry is a pickle file named by its key. The files are used as a LRU cache: reading an entry updates its
+    modification time, and the least recently used entries are removed when the total size is above maxBytes. As the
+    entries are only files, the same directory can be shared by the processes of the searches (n_jobs=-1).
+    '''
+    def __init__(self, cacheDir='FoldCache', maxBytes=2*1024**3):
+        '''
+        Function to initialize the class members
+
+        Parameter(s):
+        ------------
+        cacheDir: str
+            Directory containing the entries of the cache.
+        maxBytes: int
+            Maximum total size (in bytes) of the entries of the cache.
+        '''
+        self.cacheDir = cacheDir
+        self.maxBytes = maxBytes
+        self.hits = 0 # Number of entries found in the cache (by this object).
+        self.misses = 0 # Number of entries not found in the cache (by this object).
+
+    def __deepcopy__(self, memo):
+        # The cache is shared (not copied) by the transformers cloned by sklearn (e.g. for each candidate of a search),
+        # so that they count their hits and misses in the same object.
+        return self
+
+    def getPath(self, key):
+        '''
+        Returns the path of the entry of the given key.
+
+        Parameters:
+        ----------
+        key: str
+            Key (fingerprint) of the entry.
+        '''
+
+        return os.path.join(self.cacheDir, key + '.pkl')
+
+    def get(self, key):
+        '''
+        Returns the value of the entry of the given key, or None if the cache does not have this entry.
+
+        Parameters:
+        ----------
+        key: str
+            Key (fingerprint) of the entry.
+        '''
+
+        path = self.getPath(key)
+
+        try:
+
+            with open(path, 'rb') as f:
+                value = pickle.load(f)
+
+            # Mark the entry as recently used
+            os.utime(path)
+
+        except (OSError, EOFError, pickle.UnpicklingError):
+
+            # Missing entry, or entry removed by another process while reading it
+            self.misses += 1
+            return None
+
+        self.hits += 1
+
+        return value
+
+    def put(self, key, value):
+        '''
+        Adds the given value to the cache as the entry of the given key, then removes the least recently used entries if
+        the cache is too large. The entry is written under a temporary name and renamed at the end, so that a partially
+        written entry is never read.
+
+        Parameters:
+        ----------
+        key: str
+            Key (fingerprint) of the entry.
+        value: object
+            Value to be cached (picklable).
+        '''
+
+        os.makedirs(self.cacheDir, exist_ok=True)
+
+        fileDescriptor, tempPath = tempfile.mkstemp(dir=self.cacheDir, prefix='.tmp-')
+
+        with os.fdopen(fileDescriptor, 'wb') as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+        os.replace(tempPath, self.getPath(key))
+
+        self.evict()
+
+    def evict(self):
+        '''
+        Removes the least recently used entries until the total size of the cache is at most maxBytes.
+        '''
+
+        listEntries = list() # List to store the (last use time, size, path) of each entry.
+
+        for entry in os.scandir(self.cacheDir):
+            if entry.name.endswith('.pkl'):
+                try:
+                    stat = entry.stat()
+                    listEntries.append((stat.st_mtime, stat.st_size, entry.path))
+                except OSError:
+                    pass
+
+        totalBytes = sum(entry[1] for entry in listEntries)
+
+        for _, size, path in sorted(listEntries):
+
+            if totalBytes <= self.maxBytes:
+                break
+
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+            totalBytes -= size
+
+    def clear(self):
+        '''
+        Removes all the entries of the cache.
+        '''
+
+        if os.path.isdir(self.cacheDir):
+            for entry in os.scandir(self.cacheDir):
+                if entry.name.endswith('.pkl'):
+                    os.remove(entry.path)
+
+def getCacheParams(transformer):
+    '''
+    Returns the parameters of the given transformer which define its fitted state, i.e. all its parameters except the
+    cache itself.
+
+    Parameters:
+    ----------
+    transformer: sklearn.base.BaseEstimator
+        Transformer having a 'cache' parameter.
+    '''
+
+    return sorted((name, value) for name, value in transformer.get_params(deep=False).items() if name != 'cache')
+
+def CachedFit(method):
+    '''
+    Decorator caching the fitted state of the transformer in its FoldCache (the 'cache' parameter): the fit() method is
+    called only when the cache does not have the fitted state for the same class, parameters and input dataset (and
+    class labels). When the transformer has no cache, the method is called directly.
+
+    Parameters:
+    ----------
+    method: function
+        fit() method having the dataset and the class labels as arguments.
+    '''
+
+    @functools.wraps(method)
+    def cachedMethod(self, X, y=None):
+
+        cache = getattr(self, 'cache', None)
+
+        if cache is None:
+            return method(self, X, y)
+
+        key = GetFingerprint(type(self).__name__, 'fit', getCacheParams(self), X, y)
+        state = cache.get(key)
+
+        if state is None:
+
+            method(self, X, y)
+
+            state = {name: value for name, value in self.__dict__.items() if name not in ['cache', 'foldCacheKey']}
+            cache.put(key, state)
+
+        else:
+
+            self.__dict__.update(state)
+
+        # Key of the fitted state, part of the keys of the datasets transformed with this state
+        self.foldCacheKey = key
+
+        return self
+
+    return cachedMethod
+
+def CachedTransform(method):
+    '''
+    Decorator caching the datasets transformed by the transformer in its FoldCache (the 'cache' parameter), keyed by
+    the fitted state and the input dataset. When the transformer has no cache, or was not fitted with the cache, the
+    method is called directly.
+
+    Parameters:
+    ----------
+    method: function
+        transform() method having the dataset as first argument.
+    '''
+
+    @functools.wraps(method)
+    def cachedMethod(self, X, y=None):
+
+        cache = getattr(self, 'cache', None)
+        fitKey = getattr(self, 'foldCacheKey', None)
+
+        if cache is None or fitKey is None:
+            return method(self, X, y)
+
+        key = GetFingerprint(fitKey, 'transform', X)
+        result = cache.get(key)
+
+        if result is None:
+
+            result = method(self, X, y)
+            cache.put(key, result)
+
+        return result
+
+    return cachedMethod
@@ -1,5 +1,122 @@
+import numpy as np
 import pandas as pd
 
+# Whether pd.merge (inner, without sorting) groups the rows by key, in order of first appearance of the keys. Since
+# pandas 2.2, it keeps the order of the left rows instead.
+MERGE_GROUPS_KEYS = tuple(int(part) for part in pd.__version__.split('.')[:2]) < (2, 2)
+
+class ClaimEnricher:
+    '''
+    Class to combine batches of claims with the Beneficiary data and the Provider data, as MergeDatasets does.
+    The indexes of the Beneficiary data on 'BeneID' and of the Provider data on 'Provider' are built once, so that the
+    same Beneficiary and Provider data can be used for many batches of claims. The columns of the Beneficiary and
+    Provider data are attached to the claims by gathering the rows at the positions looked up from these indexes,
+    instead of merging full DataFrames.
+    '''
+    def __init__(self, dataProvider, dataBeneficiary):
+        '''
+        Function to initialize the class members
+
+        Parameter(s):
+        ------------
+        dataProvider: pandas.core.frame.DataFrame
+            DataFrame containing the Provider Unique Identifier.
+        dataBeneficiary: pandas.core.frame.DataFrame
+            DataFrame containing the Beneficiary related data.
+        '''
+        self.beneIndex = pd.Index(dataBeneficiary['BeneID']) # Index of the Beneficiaries.
+        self.providerIndex = pd.Index(dataProvider['Provider']) # Index of the Providers.
+
+        if not (self.beneIndex.is_unique and self.providerIndex.is_unique):
+            raise ValueError('BeneID and Provider must be unique in the Beneficiary and Provider data.')
+
+        # Beneficiary and Provider data without their key columns (the key columns come from the claims).
+        self.dataBeneficiary = dataBeneficiary.drop(columns='BeneID').reset_index(drop=True)
+        self.dataProvider = dataProvider.drop(columns='Provider').reset_index(drop=True)
+
+    def getPositions(self, dataClaims):
+        '''
+        Returns the positions of the Beneficiary and of the Provider of each claim in the Beneficiary and Provider data
+        (-1 for a Beneficiary or a Provider which is not present).
+
+        Parameters:
+        ----------
+        dataClaims: pandas.core.frame.DataFrame
+            DataFrame containing the claims.
+        '''
+
+        return self.beneIndex.get_indexer(dataClaims['BeneID']), self.providerIndex.get_indexer(dataClaims['Provider'])
+
+    def enrich(self, listClaims, claimColumns=None, mergeOrder=False):
+        '''
+        Combines the given claims with the Beneficiary and Provider data and returns the combined dataset. The claims of
+        all the given DataFrames (e.g. Inpatient and Outpatient claims) are concatenated once, aligned to the same
+        columns. As with MergeDatasets, the claims without a matching Beneficiary or Provider are left out.
+
+        Parameters:
+        ----------
+        listClaims: list
+            List of DataFrames containing the claims (or a single DataFrame).
+        claimColumns: list
+            Columns of the claims data, to which the claims are aligned. If None, the union of the columns of the given
+            DataFrames is used, in the same order as pd.concat.
+        mergeOrder: bool
+            Whether to order the claims as pd.merge does in MergeDatasets with the installed version of pandas (see
+            MERGE_GROUPS_KEYS): grouped by Provider, then by Beneficiary, in order of first appearance, before pandas
+            2.2; in the order of the given claims since pandas 2.2. If False, the order of the given claims is kept.
+        '''
+
+        if isinstance(listClaims, pd.DataFrame):
+            listClaims = [listClaims]
+
+        if claimColumns is None:
+
+            claimColumns = list() # List to store the union of the columns of all the DataFrames.
+
+            for dataClaims in listClaims:
+                claimColumns.extend([col for col in dataClaims.columns if col not in claimColumns])
+
+        # Positions of the Beneficiary and Provider of the claims of all the DataFrames
+        listPositions = [self.getPositions(dataClaims) for dataClaims in listClaims]
+        benePositions = np.concatenate([positions[0] for positions in listPositions])
+        providerPositions = np.concatenate([positions[1] for positions in listPositions])
+
+        # Rows of the concatenated claims to be kept, in the order of the combined dataset
+        if mergeOrder and MERGE_GROUPS_KEYS:
+
+            # pd.merge groups the rows by key, in order of first appearance: first by Beneficiary, then by Provider.
+            rows = np.flatnonzero(benePositions >= 0)
+            rows = rows[np.argsort(pd.factorize(benePositions[rows])[0], kind='stable')]
+            rows = rows[providerPositions[rows] >= 0]
+            rows = rows[np.argsort(pd.factorize(providerPositions[rows])[0], kind='stable')]
+
+        else:
+
+            rows = np.flatnonzero((benePositions >= 0) & (providerPositions >= 0))
+
+        # Concatenate the claims aligned to the same columns, then keep the rows (both done block by block, for all the
+        # columns having the same datatype at once).
+        dataClaims = listClaims[0] if len(listClaims) == 1 else pd.concat(listClaims, ignore_index=True, copy=False)
+
+        if list(dataClaims.columns) != list(claimColumns):
+            dataClaims = dataClaims.reindex(columns=claimColumns, copy=False)
+
+        dataEnriched = dataClaims.take(rows)
+        dataEnriched.index = pd.RangeIndex(rows.shape[0])
+
+        # Gather the rows of the Beneficiary and Provider of each claim and add their columns. The columns are added one by
+        # one instead of concatenating the DataFrames, which would copy all the columns again to consolidate them.
+        for dataReference, positions in [(self.dataBeneficiary, benePositions[rows]),
+                                         (self.dataProvider, providerPositions[rows])]:
+
+            dataGathered = dataReference.take(positions)
+            dataGathered.index = dataEnriched.index
+
+            for col in dataGathered.columns:
+                dataEnriched[col] = dataGathered[col]
+
+        return dataEnriched
+
 def MergeDatasets(dataProvider, dataBeneficiary, dataInpatient, dataOutpatient):
         
     '''
@@ -18,6 +135,17 @@ def MergeDatasets(dataProvider, dataBeneficiary, dataInpatient, dataOutpatient):
         DataFrame containing the Outpatient claims related data       
     '''
 
+    # Columns added to the claims from the Beneficiary and Provider data
+    referenceColumns = [col for col in dataBeneficiary.columns if col != 'BeneID'] + \
+                       [col for col in dataProvider.columns if col != 'Provider']
+
+    # When the Beneficiaries and Providers are unique (and no column would be renamed by the merges), gather their
+    # columns for each claim from indexes on 'BeneID' and 'Provider', in the same order as the merges below.
+    if dataBeneficiary['BeneID'].is_unique and dataProvider['Provider'].is_unique and \
+            len(set(referenceColumns)) == len(referenceColumns) and \
+            len(set(referenceColumns) & (set(dataInpatient.columns) | set(dataOutpatient.columns))) == 0:
+        return ClaimEnricher(dataProvider, dataBeneficiary).enrich([dataInpatient, dataOutpatient], mergeOrder=True)
+
     # Concatenate the Inpatient and Outpatient dataset as these contain almost similar information
     dataConcat = pd.concat([dataInpatient, dataOutpatient])
 
@@ -28,4 +156,4 @@ def MergeDatasets(dataProvider, dataBeneficiary, dataInpatient, dataOutpatient):
     dataFinal = pd.merge(left=dataMerge, right=dataProvider, on='Provider')
 
     # Return the final dataframe
-    return dataFinal
\ No newline at end of file
+    return dataFinal
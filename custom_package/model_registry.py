@@ -0,0 +1,198 @@
+import os
+import pickle
+import hashlib
+import threading
+import pandas as pd
+from collections import OrderedDict
+
+class ModelRegistry:
+    '''
+    Class to load versioned Model (Pipeline) artifacts once and keep them warm in an in-process LRU cache, so that
+    repeated predictions do not unpickle the Model again.
+    The artifacts are stored in a directory as '<version>.joblib' (saved by register()) or '<version>.pkl' (pickled
+    Models such as 'Model/BestModel.pkl'). The cache is keyed by the version and the SHA-256 hash of the artifact file,
+    so that an artifact replaced on disk is loaded again.
+    '''
+    def __init__(self, registryDir='Model', maxModels=4, mmapMode=None):
+        '''
+        Function to initialize the class members
+
+        Parameter(s):
+        ------------
+        registryDir: str
+            Directory containing the Model artifacts.
+        maxModels: int
+            Maximum number of Models kept in the cache. The least recently used Model is removed first.
+        mmapMode: str
+            Memory-map mode ('r', 'r+', 'c' or None) used to load the large arrays of the joblib artifacts, as in
+            joblib.load. The pickled (.pkl) artifacts are always loaded in memory.
+        '''
+        self.registryDir = registryDir
+        self.maxModels = maxModels
+        self.mmapMode = mmapMode
+        self.cache = OrderedDict() # Dictionary to store the (version, file hash) as key and the loaded Model as value.
+        self.fileHashes = dict() # Dictionary to store the path as key and the (size, modification time, hash) as value.
+        self.lock = threading.Lock()
+
+    def getPath(self, version):
+        '''
+        Returns the path of the artifact of the given version.
+
+        Parameters:
+        ----------
+        version: str
+            Version of the Model (name of the artifact file without extension).
+        '''
+
+        for extension in ['.joblib', '.pkl']:
+
+            path = os.path.join(self.registryDir, str(version) + extension)
+
+            if os.path.isfile(path):
+                return path
+
+        raise FileNotFoundError('No artifact found for the version ' + str(version) + ' in ' + self.registryDir)
+
+    def getFileHash(self, path):
+        '''
+        Returns the SHA-256 hash of the given file. The hash is computed again only when the size or the modification
+        time of the file changes.
+
+        Parameters:
+        ----------
+        path: str
+            Path of the file.
+        '''
+
+        stat = os.stat(path)
+
+        if path in self.fileHashes and self.fileHashes[path][:2] == (stat.st_size, stat.st_mtime_ns):
+            return self.fileHashes[path][2]
+
+        sha256 = hashlib.sha256()
+
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                sha256.update(block)
+
+        self.fileHashes[path] = (stat.st_size, stat.st_mtime_ns, sha256.hexdigest())
+
+        return self.fileHashes[path][2]
+
+    def register(self, model, version):
+        '''
+        Saves the given Model as the artifact of the given version (with joblib, so that its large arrays can be
+        memory-mapped when loaded) and returns the path of the artifact.
+
+        Parameters:
+        ----------
+        model: object
+            Trained Model (or Pipeline).
+        version: str
+            Version of the Model.
+        '''
+
+        import joblib
+
+        os.makedirs(self.registryDir, exist_ok=True)
+
+        path = os.path.join(self.registryDir, str(version) + '.joblib')
+        joblib.dump(model, path)
+
+        # Remove the Model previously loaded for this version
+        self.invalidate(version)
+
+        return path
+
+    def load(self, version):
+        '''
+        Returns the Model of the given version, from the cache if it is already loaded, otherwise from its artifact.
+
+        Parameters:
+        ----------
+        version: str
+            Version of the Model.
+        '''
+
+        path = self.getPath(version)
+
+        with self.lock:
+
+            key = (str(version), self.getFileHash(path))
+
+            if key in self.cache:
+
+                # Mark the Model as the most recently used
+                self.cache.move_to_end(key)
+
+                return self.cache[key]
+
+            if path.endswith('.joblib'):
+
+                import joblib
+                model = joblib.load(path, mmap_mode=self.mmapMode)
+
+            else:
+
+                with open(path, 'rb') as f:
+                    model = pickle.load(f)
+
+            # Remove the other Models of this version (older artifacts) and the least recently used Models
+            for oldKey in [oldKey for oldKey in self.cache if oldKey[0] == str(version)]:
+                del self.cache[oldKey]
+
+            self.cache[key] = model
+
+            while len(self.cache) > self.maxModels:
+                self.cache.popitem(last=False)
+
+            return model
+
+    def invalidate(self, version=None):
+        '''
+        Removes the Model of the given version from the cache, or all the Models if no version is given.
+
+        Parameters:
+        ----------
+        version: str
+            Version of the Model.
+        '''
+
+        with self.lock:
+
+            for key in list(self.cache):
+                if version is None or key[0] == str(version):
+                    del self.cache[key]
+
+            if version is None:
+                self.fileHashes.clear()
+
+    def predict(self, X, version):
+        '''
+        Predicts the Class Label of the given dataset with the Model of the given version.
+
+        Parameters:
+        ----------
+        X: pandas.core.frame.DataFrame
+            Dataset to be predicted.
+        version: str
+            Version of the Model.
+        '''
+
+        return self.load(version).predict(X)
+
+    def predictProba(self, X, versions):
+        '''
+        Returns a DataFrame having, for each of the given versions, the probability of the positive class (fraud) of
+        each datapoint of the given dataset, e.g. for A/B scoring of several Models.
+
+        Parameters:
+        ----------
+        X: pandas.core.frame.DataFrame
+            Dataset to be predicted.
+        versions: list
+            List of versions of the Models.
+        '''
+
+        return pd.DataFrame({str(version): self.load(version).predict_proba(X)[:, 1] for version in versions},
+                            index=X.index)
@@ -1,7 +1,10 @@
+import numpy as np
 import pandas as pd
-from scipy.sparse import hstack
+from scipy.sparse import hstack, csr_matrix
 from sklearn.feature_extraction.text import CountVectorizer
 from sklearn.base import BaseEstimator, TransformerMixin
+from custom_package.code_counter import FactorizeColumn
+from custom_package.profiling import Profiled
 
 class OneHotEncoder(BaseEstimator, TransformerMixin):
     '''
@@ -26,6 +29,7 @@ class OneHotEncoder(BaseEstimator, TransformerMixin):
             # 'CountVectorizer not considering single letter text': https://stackoverflow.com/a/63339533/16007029
             self.countVectorizers[feature] = CountVectorizer(tokenizer=lambda x: x.split())
         
+    @Profiled
     def fit(self, X, y=None):        
         '''
         Function called on a Dataset (usually Train Dataset) to generate One-hot Encoded Features.
@@ -44,6 +48,7 @@ class OneHotEncoder(BaseEstimator, TransformerMixin):
             
         return self
     
+    @Profiled
     def transform(self, X, y=None):
         '''
         Function called on a Dataset (Train/Test Dataset) and/or Class Label to generate One-hot Encoded Features.
@@ -76,3 +81,124 @@ class OneHotEncoder(BaseEstimator, TransformerMixin):
             
         # Return this DataFrame with all the numerical features and the one-hot encoded features for the categorical features
         return xEncoded
+
+
+class SparseOneHotEncoder(BaseEstimator, TransformerMixin):
+    '''
+    Class to do One-hot Encoding for the Categorical features, giving the same features as OneHotEncoder without
+    running CountVectorizer on each datapoint. The categories of a value are its tokens as for OneHotEncoder (its
+    lowercase string value split on whitespace): a value having several tokens (e.g. 'New York') sets the feature of
+    each token, and a repeated token (e.g. 'York York') is counted. The vocabulary of each feature is sorted in the same
+    way as the one of CountVectorizer.
+    The fit() method learns the vocabulary of each feature. The transform() method tokenizes the unique values of each
+    feature only, and builds the final CSR matrix in one pass.
+    This class can be used in the sklearn's Pipeline to avoid data leakdage issues
+    '''
+    def __init__(self, categoricalFeatures):
+        '''
+        Function to initialize the class members
+        
+        Parameter(s):
+        ------------
+        categoricalFeatures: list
+            List of features for which the one-hot encoding has to be done.
+        '''
+        self.categoricalFeatures = categoricalFeatures # Categorical Features for which One-hot Encoding has to be done.
+        self.vocabulary = dict() # Dictionary to store the feature name as key and the Index of its categories as value.
+        
+    def getTokens(self, values):
+        '''
+        Returns the list of the tokens (lowercase string value split on whitespace, as the tokenizer of OneHotEncoder) of
+        each of the given values.
+        
+        Parameters:
+        ----------
+        values: list
+            List of values.
+        '''
+        
+        return [str(value).lower().split() for value in values]
+        
+    @Profiled
+    def fit(self, X, y=None):
+        '''
+        Function called on a Dataset (usually Train Dataset) to learn the vocabulary (sorted categories) of each feature.
+        This function is called only for the train dataset and not for any cv/test dataset to avoid data leakage.
+        
+        Parameters:
+        ----------
+        X: pandas.core.frame.DataFrame
+            DataFrame on which the One-hot Encoding has to be carried out.
+        '''
+        
+        for feature in self.categoricalFeatures:
+            
+            codes, uniques = FactorizeColumn(X[feature])
+            
+            # Only the values present in the dataset are categories (the unused categories of a categorical column are
+            # not), as for OneHotEncoder.
+            uniques = [uniques[code] for code in np.unique(codes[codes >= 0])]
+            
+            # The empty values are a category ('nan') too, as for OneHotEncoder.
+            if np.any(codes < 0):
+                uniques = uniques + [np.nan]
+            
+            self.vocabulary[feature] = pd.Index(sorted(set(token for tokens in self.getTokens(uniques)
+                                                           for token in tokens)))
+            
+        return self
+    
+    @Profiled
+    def transform(self, X, y=None):
+        '''
+        Function called on a Dataset (Train/Test Dataset) to generate One-hot Encoded Features, using the vocabulary
+        learnt by the fit() method. The tokens which are not in the vocabulary get no one-hot encoded feature.
+        Returns a CSR matrix having the other (numerical) features followed by the one-hot encoded features of each
+        categorical feature.
+        
+        Parameters:
+        ----------
+        X: pandas.core.frame.DataFrame
+            DataFrame on which the One-hot Encoding has to be done.
+        '''
+        
+        lenDatapoints = X.shape[0]
+        
+        listRows = list() # List to store the row index of each one-hot encoded token.
+        listCols = list() # List to store the column index (in the one-hot encoded features) of each token.
+        countCols = 0 # Number of one-hot encoded features of the previous categorical features.
+        
+        for feature in self.categoricalFeatures:
+            
+            # Columns of the tokens of each unique value of the feature (-1 for the unknown tokens). The last unique
+            # value is for the empty values (code -1).
+            codes, uniques = FactorizeColumn(X[feature])
+            listTokens = self.getTokens(uniques + [np.nan])
+            
+            countTokens = np.array([len(tokens) for tokens in listTokens], dtype=np.int64)
+            tokenCols = self.vocabulary[feature].get_indexer([token for tokens in listTokens for token in tokens])
+            
+            # Columns of the tokens of each datapoint, gathered from the tokens of its unique value
+            countTokensDatapoints = countTokens[codes]
+            rows = np.repeat(np.arange(lenDatapoints), countTokensDatapoints)
+            positions = np.arange(rows.shape[0]) - np.repeat(np.cumsum(countTokensDatapoints) - countTokensDatapoints,
+                                                             countTokensDatapoints)
+            cols = tokenCols[np.repeat((np.cumsum(countTokens) - countTokens)[codes], countTokensDatapoints) + positions]
+            
+            isKnown = cols >= 0
+            listRows.append(rows[isKnown])
+            listCols.append(cols[isKnown] + countCols)
+            
+            countCols += len(self.vocabulary[feature])
+            
+        rows = np.concatenate(listRows) if listRows else np.array([], dtype=np.int64)
+        cols = np.concatenate(listCols) if listCols else np.array([], dtype=np.int64)
+        
+        # Matrix of the one-hot encoded features (the repeated tokens of a datapoint are summed)
+        xOneHot = csr_matrix((np.ones(len(rows), dtype=np.int64), (rows, cols)), shape=(lenDatapoints, countCols))
+        
+        # Matrix of the numerical features, converted to a sparse matrix only once
+        xNumerical = csr_matrix(X.drop(columns=self.categoricalFeatures).to_numpy())
+        
+        # Return the matrix with all the numerical features and the one-hot encoded features
+        return hstack((xNumerical, xOneHot), format='csr')
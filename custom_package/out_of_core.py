@@ -0,0 +1,296 @@
+import os
+import json
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+from custom_package.data_preprocessing import PreprocessData
+from custom_package.data_ingest import SaveColumnarCache, LoadColumnarCache
+from custom_package.streaming import FindMaxDate, StreamMergedClaims
+
+def WriteFeatureShards(chunks, shardDir, className='PotentialFraud'):
+    '''
+    Writes the given preprocessed chunks (having the features and the class label, as returned by PreprocessData) as
+    feature shards: one columnar directory for each chunk (see SaveColumnarCache), with the features as float32 and the
+    class label as int8, and a 'manifest.json' file having the features and, for each shard, its number of rows and of
+    positive class labels. All the shards have the features of the first chunk. Returns the manifest.
+
+    Parameters:
+    ----------
+    chunks: iterable
+        Preprocessed chunks (DataFrames).
+    shardDir: str
+        Directory to which the shards are written.
+    className: str
+        Name of the class label column.
+    '''
+
+    os.makedirs(shardDir, exist_ok=True)
+
+    manifest = {'className': className, 'featureColumns': None, 'shards': list()}
+
+    for i, chunk in enumerate(chunks):
+
+        if manifest['featureColumns'] is None:
+            manifest['featureColumns'] = [col for col in chunk.columns if col != className]
+
+        data = chunk.reindex(columns=manifest['featureColumns'], fill_value=0).astype(np.float32)
+        data[className] = np.asarray(chunk[className], dtype=np.int8)
+
+        shardName = 'shard%05d' % i
+        SaveColumnarCache(data.reset_index(drop=True), os.path.join(shardDir, shardName), '')
+
+        manifest['shards'].append({'name': shardName, 'rows': int(data.shape[0]),
+                                   'positives': int((data[className] == 1).sum())})
+
+    with open(os.path.join(shardDir, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f, indent=1)
+
+    return manifest
+
+def WriteClaimShards(dataProvider, dataBeneficiary, claimFiles, shardDir, maxDate=None, chunkSize=100000):
+    '''
+    Reads the given claims files in chunks, combines each chunk with the Beneficiary and Provider data, preprocesses it
+    with PreprocessData and writes it as a feature shard (see WriteFeatureShards), so that the training dataset is
+    preprocessed once and never held in memory as a whole. Returns the manifest of the shards.
+
+    Parameters:
+    ----------
+    dataProvider: pandas.core.frame.DataFrame
+        DataFrame containing the Provider Unique Identifier and the class label.
+    dataBeneficiary: pandas.core.frame.DataFrame
+        DataFrame containing the Beneficiary related data.
+    claimFiles: list
+        List of the paths of the claims CSV files (e.g. Inpatient and Outpatient claims).
+    shardDir: str
+        Directory to which the shards are written.
+    maxDate: pandas.Timestamp
+        Maximum Claim End Date or Discharge Date. If None, it is found by a first pass over the claims files which
+        reads only the date columns.
+    chunkSize: int
+        Number of claims in each shard (before leaving out the claims without Beneficiary or Provider).
+    '''
+
+    if maxDate is None:
+        maxDate = FindMaxDate(claimFiles)
+
+    # Preprocess each chunk, keeping the empty columns so that all the shards have the same features
+    chunks = (PreprocessData(chunk, maxDate=pd.Timestamp(maxDate), dropEmptyColumns=False)
+              for chunk in StreamMergedClaims(dataProvider, dataBeneficiary, claimFiles, chunkSize))
+
+    return WriteFeatureShards(chunks, shardDir)
+
+class ShardSampler:
+    '''
+    Class to read the feature shards written by WriteFeatureShards one at a time, resampling each shard when it is read
+    instead of resampling a copy of the whole training dataset:
+    - the rows of the majority (negative) class are undersampled, each being kept with the probability
+      'majorityFraction' (as the RandomUnderSampler, without materializing the whole dataset),
+    - the rows of the minority (positive) class are given the weight 'minorityWeight' instead of being oversampled.
+    The random numbers of each shard depend only on 'randomState' and the position of the shard, so that the shard is
+    resampled in the same way each time it is read (e.g. at each pass of the XGBoost iterator).
+    '''
+    def __init__(self, shardDir, majorityFraction=1.0, minorityWeight=1.0, featurizer=None, randomState=0, mmapMode='r'):
+        '''
+        Function to initialize the class members
+
+        Parameter(s):
+        ------------
+        shardDir: str
+            Directory containing the shards and their manifest.
+        majorityFraction: float
+            Fraction of the rows of the majority class kept (1 to keep all of them).
+        minorityWeight: float
+            Weight of the rows of the minority class (1 for no weights).
+        featurizer: object
+            Fitted transformer (e.g. Standardize fitted with partial_fit over the shards) applied to the features of each
+            shard, or None.
+        randomState: int
+            Seed of the random number generator.
+        mmapMode: str
+            Memory-map mode used to load the shards, as in numpy.load.
+        '''
+        self.shardDir = shardDir
+        self.majorityFraction = majorityFraction
+        self.minorityWeight = minorityWeight
+        self.featurizer = featurizer
+        self.randomState = randomState
+        self.mmapMode = mmapMode
+
+        with open(os.path.join(shardDir, 'manifest.json')) as f:
+            self.manifest = json.load(f)
+
+    def __len__(self):
+        return len(self.manifest['shards'])
+
+    def getShard(self, i):
+        '''
+        Returns the features, the class labels and the weights (or None) of the resampled shard at the given position.
+
+        Parameters:
+        ----------
+        i: int
+            Position of the shard.
+        '''
+
+        className = self.manifest['className']
+        data = LoadColumnarCache(os.path.join(self.shardDir, self.manifest['shards'][i]['name']), self.mmapMode)
+
+        yData = np.asarray(data[className])
+        isPositive = yData == 1
+
+        # Undersample the rows of the majority class
+        if self.majorityFraction < 1:
+
+            rng = np.random.default_rng([self.randomState, i])
+            rows = np.flatnonzero(isPositive | (rng.random(yData.shape[0]) < self.majorityFraction))
+
+            data, yData, isPositive = data.iloc[rows], yData[rows], isPositive[rows]
+
+        xData = data[self.manifest['featureColumns']]
+
+        if self.featurizer is not None:
+            xData = self.featurizer.transform(xData)
+
+        weights = np.where(isPositive, self.minorityWeight, 1.0).astype(np.float32) if self.minorityWeight != 1 else None
+
+        return xData, yData, weights
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.getShard(i)
+
+def PartialFitOnShards(transformer, shardSampler):
+    '''
+    Fits the given transformer having a 'partial_fit' method (e.g. Standardize) over the resampled shards, one shard at
+    a time, and returns it.
+
+    Parameters:
+    ----------
+    transformer: object
+        Transformer having a 'partial_fit' method.
+    shardSampler: ShardSampler
+        Sampler of the shards (without featurizer).
+    '''
+
+    for xData, _, _ in shardSampler:
+        transformer.partial_fit(xData)
+
+    return transformer
+
+def GetShardIterator(shardSampler, cachePrefix=None):
+    '''
+    Returns an XGBoost DataIter giving the resampled shards of the given sampler one at a time, from which XGBoost
+    builds its training matrix (in external memory, cached on disk under 'cachePrefix', or as a quantized matrix in
+    memory) without the whole training dataset being held in a DataFrame. xgboost is imported here, so that it is
+    required only for the out-of-core training.
+
+    Parameters:
+    ----------
+    shardSampler: ShardSampler
+        Sampler of the shards.
+    cachePrefix: str
+        Prefix of the files of the external memory cache of XGBoost, or None.
+    '''
+
+    import xgboost as xgb
+
+    class ShardIterator(xgb.DataIter):
+        '''
+        Class giving the resampled shards to XGBoost, one at each call of next().
+        '''
+        def __init__(self):
+            '''
+            Function to initialize the class members
+            '''
+            self.position = 0 # Position of the next shard.
+            super().__init__(cache_prefix=cachePrefix)
+
+        def next(self, inputData):
+
+            if self.position == len(shardSampler):
+                return 0
+
+            xData, yData, weights = shardSampler.getShard(self.position)
+
+            if weights is None:
+                inputData(data=xData, label=yData)
+            else:
+                inputData(data=xData, label=yData, weight=weights)
+
+            self.position += 1
+
+            return 1
+
+        def reset(self):
+            self.position = 0
+
+    return ShardIterator()
+
+def TrainXGBoostFromShards(shardDir, params=None, numBoostRound=100, cacheDir=None, majorityFraction=1.0,
+                           minorityWeight=1.0, featurizer=None, randomState=0):
+    '''
+    Trains an XGBoost Booster from the feature shards written by WriteFeatureShards, resampled when each shard is read
+    (see ShardSampler). With 'cacheDir', the training matrix is built in external memory (pages cached on disk in
+    'cacheDir'), so that the training dataset can be larger than the memory; otherwise, it is built as a quantized
+    matrix in memory (QuantileDMatrix, when the version of XGBoost has it), which is much smaller than the DataFrame.
+    Returns the trained Booster, having the features of the shards (as given to XGBoost) as its feature names, so that
+    the claims scored with it can be reindexed to them (see GetFeatureColumns): the shards keep the columns having all
+    empty values, which PreprocessData drops by default.
+
+    Parameters:
+    ----------
+    shardDir: str
+        Directory containing the shards and their manifest.
+    params: dict
+        Parameters of XGBoost. By default, binary logistic objective with the 'hist' tree method (required by the
+        external memory).
+    numBoostRound: int
+        Number of boosting rounds.
+    cacheDir: str
+        Directory of the external memory cache, or None to build the matrix in memory.
+    majorityFraction: float
+        Fraction of the rows of the majority class kept.
+    minorityWeight: float
+        Weight of the rows of the minority class.
+    featurizer: object
+        Fitted transformer applied to the features of each shard, or None.
+    randomState: int
+        Seed of the random number generator used for the undersampling.
+    '''
+
+    import xgboost as xgb
+
+    params = dict({'objective': 'binary:logistic', 'tree_method': 'hist', 'eval_metric': 'logloss',
+                   'seed': randomState}, **(params or {}))
+
+    shardSampler = ShardSampler(shardDir, majorityFraction, minorityWeight, featurizer, randomState)
+    temporaryDir = None
+
+    if cacheDir is not None:
+
+        os.makedirs(cacheDir, exist_ok=True)
+        dTrain = xgb.DMatrix(GetShardIterator(shardSampler, os.path.join(cacheDir, 'cache')))
+
+    elif hasattr(xgb, 'QuantileDMatrix'):
+
+        dTrain = xgb.QuantileDMatrix(GetShardIterator(shardSampler))
+
+    else:
+
+        # Versions of XGBoost without QuantileDMatrix: the matrix is built in external memory in a temporary directory
+        temporaryDir = tempfile.mkdtemp(prefix='xgboost-cache-')
+        dTrain = xgb.DMatrix(GetShardIterator(shardSampler, os.path.join(temporaryDir, 'cache')))
+
+    try:
+
+        booster = xgb.train(params, dTrain, num_boost_round=numBoostRound)
+
+        # Features of the shards, kept in the Booster (and in the file saved from it)
+        booster.feature_names = list(shardSampler.getShard(0)[0].columns)
+
+        return booster
+
+    finally:
+        if temporaryDir is not None:
+            shutil.rmtree(temporaryDir, ignore_errors=True)
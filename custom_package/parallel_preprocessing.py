@@ -0,0 +1,186 @@
+import os
+import time
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from custom_package.data_preprocessing import GetMaxDate, PreprocessData
+from custom_package.data_ingest import GetStringCategorical, SaveColumnarCache, LoadColumnarCache
+
+# Identifier columns, which are only dropped by PreprocessData. They are not shared with the worker processes.
+IDENTIFIER_COLUMNS = ['ClaimID', 'BeneID', 'Provider']
+
+def getSharedDirectory():
+    '''
+    Returns the directory in which the shared arrays are written: '/dev/shm' (memory) when it exists, otherwise the
+    temporary directory.
+    '''
+
+    return '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir()
+
+def getSharedColumn(col, column):
+    '''
+    Returns the given column in the form written to the shared arrays: the text dates are converted to datetime64 (by
+    converting only their unique values) and the other text columns to categorical codes, whose categories are the
+    string values (see GetStringCategorical).
+
+    Parameters:
+    ----------
+    col: str
+        Name of the column.
+    column: pandas.core.series.Series
+        Values of the column.
+    '''
+
+    if column.dtype != object and not isinstance(column.dtype, pd.CategoricalDtype):
+        return column
+
+    if 'Dt' in col or col in ['DOB', 'DOD']:
+
+        codes, uniques = pd.factorize(np.asarray(column))
+
+        # The last element is for the missing values (code -1)
+        return pd.Series(np.append(pd.to_datetime(uniques).to_numpy(), np.datetime64('NaT'))[codes], index=column.index)
+
+    return GetStringCategorical(column)
+
+def preprocessPartition(inputPath, outputPath, start, end, maxDate):
+    '''
+    Function run by a worker process to preprocess the rows [start, end) of the shared dataset with PreprocessData and
+    write the features to the given output directory. Returns the number of rows written.
+
+    Parameters:
+    ----------
+    inputPath: str
+        Directory of the shared (memory-mapped) dataset.
+    outputPath: str
+        Directory to which the features of the partition are written.
+    start: int
+        First row of the partition.
+    end: int
+        Row after the last row of the partition.
+    maxDate: pandas.Timestamp
+        Maximum Claim End Date or Discharge Date of the whole dataset.
+    '''
+
+    data = LoadColumnarCache(inputPath).iloc[start:end]
+
+    # Placeholders for the identifier columns, which PreprocessData drops
+    for col in IDENTIFIER_COLUMNS:
+        data[col] = 0
+
+    # The class label values are replaced by PreprocessData, so the label is given as text (as in the original dataset)
+    if 'PotentialFraud' in data.columns and isinstance(data['PotentialFraud'].dtype, pd.CategoricalDtype):
+        data['PotentialFraud'] = np.asarray(data['PotentialFraud'])
+
+    dataPreprocessed = PreprocessData(data, maxDate=maxDate, dropEmptyColumns=False)
+
+    SaveColumnarCache(dataPreprocessed.reset_index(drop=True), outputPath, '')
+
+    return dataPreprocessed.shape[0]
+
+def ParallelPreprocessData(xData, maxDate=None, dropEmptyColumns=True, countWorkers=None, countPartitions=None):
+    '''
+    Runs PreprocessData over row partitions of the given dataset in a pool of processes and returns the same features
+    as PreprocessData, in the original order of the rows.
+    The dataset is written once as memory-mapped arrays (one '.npy' file per column, the text columns as categorical
+    codes), from which each process reads its rows, and each process writes its features in the same way, so that no
+    DataFrame is pickled between the processes. The global parameters (maximum date and columns having all null values)
+    are found once on the whole dataset and given to all the partitions.
+
+    Parameters:
+    ----------
+    xData: pandas.core.frame.DataFrame
+        Dataset containing the features (as returned by MergeDatasets).
+    maxDate: pandas.Timestamp
+        Maximum Claim End Date or Discharge Date. If None, it is computed from the given dataset.
+    dropEmptyColumns: bool
+        Whether to drop the columns having all null values in the given dataset.
+    countWorkers: int
+        Number of processes. If None, the number of CPUs.
+    countPartitions: int
+        Number of row partitions. If None, 4 partitions per process, so that the processes finish at about the same time.
+    '''
+
+    countWorkers = countWorkers or os.cpu_count()
+    countPartitions = min(countPartitions or 4*countWorkers, max(xData.shape[0], 1))
+
+    # Global parameters, found on the whole dataset as done by PreprocessData
+    if maxDate is None:
+        maxDate = GetMaxDate(xData)
+
+    columns = [col for col in xData.columns if col not in IDENTIFIER_COLUMNS and
+               not (dropEmptyColumns and xData[col].isna().all())]
+
+    sharedPath = tempfile.mkdtemp(dir=getSharedDirectory(), prefix='preprocess-')
+
+    try:
+
+        # Write the dataset as memory-mapped arrays, with the text columns converted to categorical codes
+        data = pd.DataFrame({col: getSharedColumn(col, xData[col]) for col in columns}).reset_index(drop=True)
+
+        inputPath = os.path.join(sharedPath, 'input')
+        SaveColumnarCache(data, inputPath, '')
+        del data
+
+        bounds = np.linspace(0, xData.shape[0], countPartitions + 1).astype(int)
+        listOutputPaths = [os.path.join(sharedPath, 'output%05d' % i) for i in range(countPartitions)]
+
+        with ProcessPoolExecutor(max_workers=countWorkers) as executor:
+
+            list(executor.map(preprocessPartition, [inputPath]*countPartitions, listOutputPaths, bounds[:-1],
+                              bounds[1:], [pd.Timestamp(maxDate)]*countPartitions))
+
+        # Reassemble the features of the partitions in the original order of the rows
+        dataPreprocessed = pd.concat([LoadColumnarCache(outputPath) for outputPath in listOutputPaths],
+                                     ignore_index=True)
+
+    finally:
+
+        shutil.rmtree(sharedPath, ignore_errors=True)
+
+    dataPreprocessed.index = xData.index
+
+    return dataPreprocessed
+
+def ReportScaling(xData, listCountWorkers=None, maxDate=None, repeat=1):
+    '''
+    Measures the time taken by ParallelPreprocessData on the given dataset with each number of processes and returns a
+    DataFrame with the best time (in seconds), the speedup compared with 1 process and the scaling efficiency (speedup
+    divided by the number of processes).
+
+    Parameters:
+    ----------
+    xData: pandas.core.frame.DataFrame
+        Dataset containing the features (as returned by MergeDatasets).
+    listCountWorkers: iterable
+        Numbers of processes to be measured. If None, the powers of 2 up to the number of CPUs (and the number of CPUs).
+    maxDate: pandas.Timestamp
+        Maximum Claim End Date or Discharge Date. If None, it is computed from the given dataset.
+    repeat: int
+        Number of times each number of processes is run. The best time is reported.
+    '''
+
+    if listCountWorkers is None:
+        listCountWorkers = sorted(set([2**i for i in range(int(np.log2(os.cpu_count())) + 1)] + [os.cpu_count()]))
+
+    listResults = list() # List to store the result of each number of processes.
+
+    for countWorkers in listCountWorkers:
+
+        bestTime = np.inf
+
+        for _ in range(repeat):
+
+            startTime = time.perf_counter()
+            ParallelPreprocessData(xData, maxDate=maxDate, countWorkers=countWorkers)
+            bestTime = min(bestTime, time.perf_counter() - startTime)
+
+        listResults.append({'Workers': countWorkers, 'Time': bestTime})
+
+    dataReport = pd.DataFrame(listResults)
+    dataReport['Speedup'] = dataReport['Time'].iloc[0]/dataReport['Time']
+    dataReport['Efficiency'] = dataReport['Speedup']/(dataReport['Workers']/dataReport['Workers'].iloc[0])
+
+    return dataReport
@@ -0,0 +1,222 @@
+import time
+import functools
+import pandas as pd
+
+try:
+    import resource
+except ImportError: # Not available on Windows: the peak RSS is not measured.
+    resource = None
+
+# State of the profiling: whether it is enabled and the callbacks to which the measures of each stage are given.
+PROFILING = {'Enabled': False, 'Callbacks': list()}
+
+def EnableProfiling(*callbacks):
+    '''
+    Enables the profiling of the stages of the data pipeline (regions of PreprocessData and fit/transform methods of
+    the transformers) and adds the given callbacks. Each callback is called with a dictionary having the measures of a
+    stage: 'Stage', 'Rows', 'WallTime' (seconds), 'RowsPerSecond', 'PeakRSSDelta' (growth of the peak resident memory
+    during the stage, in bytes) and 'FrameBytes' (size of the DataFrame at the end of the stage).
+
+    Parameters:
+    ----------
+    callbacks: callable
+        Functions called with the measures of each stage (e.g. a ProfilingCollector, or a function exporting the
+        measures to a metrics system).
+    '''
+
+    PROFILING['Callbacks'].extend(callbacks)
+    PROFILING['Enabled'] = True
+
+def DisableProfiling():
+    '''
+    Disables the profiling and removes all the callbacks.
+    '''
+
+    PROFILING['Enabled'] = False
+    PROFILING['Callbacks'].clear()
+
+def getPeakRSS():
+    '''
+    Returns the peak resident memory of the process (in bytes), or None if it cannot be measured.
+    '''
+
+    if resource is None:
+        return None
+
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss*1024
+
+def getFrameBytes(data):
+    '''
+    Returns the size (in bytes) of the given DataFrame or array, without the size of the python objects it refers to
+    (so that it is fast to compute), or None for other data.
+
+    Parameters:
+    ----------
+    data: object
+        DataFrame, Series or array.
+    '''
+
+    if isinstance(data, (pd.DataFrame, pd.Series)):
+        return int(data.memory_usage(index=True, deep=False).sum()) if isinstance(data, pd.DataFrame) else \
+               int(data.memory_usage(index=True, deep=False))
+
+    return getattr(data, 'nbytes', None)
+
+class StageProfiler:
+    '''
+    Class to measure a stage of the data pipeline and its regions, and to give the measures to the profiling callbacks.
+    It can be used as a context manager for the whole stage, and endRegion() can be called at the end of each region
+    of the stage to measure the region since the end of the previous one.
+    '''
+    def __init__(self, stage, data=None):
+        '''
+        Function to initialize the class members
+
+        Parameter(s):
+        ------------
+        stage: str
+            Name of the stage (e.g. 'PreprocessData' or 'ResponseEncoder.fit').
+        data: object
+            Dataset processed by the stage, used to count the rows.
+        '''
+        self.stage = stage
+        self.rows = len(data) if data is not None and hasattr(data, '__len__') else None
+        self.startTime = self.regionStartTime = time.perf_counter()
+        self.startPeakRSS = self.regionStartPeakRSS = getPeakRSS()
+
+    def emit(self, stage, startTime, startPeakRSS, data):
+        '''
+        Gives the measures of the given stage (or region) to the profiling callbacks.
+        '''
+
+        wallTime = time.perf_counter() - startTime
+        peakRSS = getPeakRSS()
+
+        measures = {'Stage': stage, 'Rows': self.rows, 'WallTime': wallTime,
+                    'RowsPerSecond': self.rows/wallTime if self.rows is not None and wallTime > 0 else None,
+                    'PeakRSSDelta': peakRSS - startPeakRSS if peakRSS is not None else None,
+                    'FrameBytes': getFrameBytes(data)}
+
+        for callback in PROFILING['Callbacks']:
+            callback(measures)
+
+    def endRegion(self, region, data=None):
+        '''
+        Measures the given region of the stage, from the end of the previous region (or the start of the stage).
+
+        Parameters:
+        ----------
+        region: str
+            Name of the region.
+        data: object
+            Dataset at the end of the region.
+        '''
+
+        self.emit(self.stage + '.' + region, self.regionStartTime, self.regionStartPeakRSS, data)
+
+        self.regionStartTime = time.perf_counter()
+        self.regionStartPeakRSS = getPeakRSS()
+
+    def end(self, data=None):
+        '''
+        Measures the whole stage.
+
+        Parameters:
+        ----------
+        data: object
+            Dataset at the end of the stage.
+        '''
+
+        self.emit(self.stage, self.startTime, self.startPeakRSS, data)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception):
+        self.end()
+
+class NullProfiler:
+    '''
+    Class having the methods of StageProfiler which do nothing, used when the profiling is disabled.
+    '''
+
+    def endRegion(self, region, data=None):
+        pass
+
+    def end(self, data=None):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception):
+        pass
+
+# Profiler used when the profiling is disabled (a single object, so that nothing is created for each stage).
+NULL_PROFILER = NullProfiler()
+
+def GetProfiler(stage, data=None):
+    '''
+    Returns a StageProfiler for the given stage if the profiling is enabled, otherwise a profiler doing nothing.
+
+    Parameters:
+    ----------
+    stage: str
+        Name of the stage.
+    data: object
+        Dataset processed by the stage, used to count the rows.
+    '''
+
+    if not PROFILING['Enabled']:
+        return NULL_PROFILER
+
+    return StageProfiler(stage, data)
+
+def Profiled(method):
+    '''
+    Decorator profiling the given fit/transform method of a transformer as the stage '<Class>.<method>' when the
+    profiling is enabled. When it is disabled, the method is called directly.
+
+    Parameters:
+    ----------
+    method: function
+        Method having the dataset as first argument.
+    '''
+
+    stage = method.__qualname__
+
+    @functools.wraps(method)
+    def profiledMethod(self, X, *args, **kwargs):
+
+        if not PROFILING['Enabled']:
+            return method(self, X, *args, **kwargs)
+
+        profiler = StageProfiler(stage, X)
+        result = method(self, X, *args, **kwargs)
+        profiler.end(result if result is not self else X)
+
+        return result
+
+    return profiledMethod
+
+class ProfilingCollector:
+    '''
+    Class collecting the measures of the stages, to be given as a callback to EnableProfiling.
+    '''
+    def __init__(self):
+        '''
+        Function to initialize the class members
+        '''
+        self.listMeasures = list() # List to store the measures of each stage.
+
+    def __call__(self, measures):
+        self.listMeasures.append(measures)
+
+    def toFrame(self):
+        '''
+        Returns a DataFrame having the measures of each stage, in the order in which the stages ended.
+        '''
+
+        return pd.DataFrame(self.listMeasures, columns=['Stage', 'Rows', 'WallTime', 'RowsPerSecond', 'PeakRSSDelta',
+                                                        'FrameBytes'])
@@ -0,0 +1,317 @@
+import numpy as np
+import pandas as pd
+from custom_package.streaming import getClaimColumns, getClaimDtypes
+
+# Aggregate features of a Provider, in the order of the columns returned by ProviderFeatureStore.getFeatures
+PROVIDER_FEATURES = ['ProvClaimCount', 'ProvInpatientRatio', 'ProvTotalReimbursedAmt', 'ProvMeanReimbursedAmt',
+                     'ProvTotalDeductibleAmt', 'ProvMeanDeductibleAmt', 'ProvUniqueBeneCount', 'ProvUniquePhysCount']
+
+# Kinds of the values of the vocabularies, saved along with their string values so that they are loaded back with
+# their original type (e.g. an integer Provider ID is not loaded as a string).
+VALUE_KINDS = ['str', 'int', 'float']
+
+def getValueKind(value):
+    '''
+    Returns the kind (position in VALUE_KINDS) of the given value of a vocabulary.
+
+    Parameters:
+    ----------
+    value: object
+        Value of a vocabulary.
+    '''
+
+    if isinstance(value, str):
+        return 0
+    elif isinstance(value, (int, np.integer)) and not isinstance(value, (bool, np.bool_)):
+        return 1
+    elif isinstance(value, (float, np.floating)):
+        return 2
+
+    raise TypeError('The value ' + repr(value) + ' of type ' + type(value).__name__ + ' cannot be saved.')
+
+def getVocabularyArrays(vocabulary):
+    '''
+    Returns the string values and the kinds of the values of the given vocabulary, saved without pickling.
+
+    Parameters:
+    ----------
+    vocabulary: pandas.core.indexes.base.Index
+        Values seen so far.
+    '''
+
+    kinds = np.array([getValueKind(value) for value in vocabulary], dtype=np.int8)
+    values = [str(float(value)) if kind == 2 else str(value) for value, kind in zip(vocabulary, kinds)]
+
+    return np.array(values, dtype=str), kinds
+
+def getVocabulary(values, kinds):
+    '''
+    Returns the vocabulary having the given string values converted back to their kinds.
+
+    Parameters:
+    ----------
+    values: numpy.ndarray
+        String values of the vocabulary.
+    kinds: numpy.ndarray
+        Kinds of the values (positions in VALUE_KINDS).
+    '''
+
+    values = values.astype(object)
+
+    for kind, convert in [(1, int), (2, float)]:
+        values[kinds == kind] = [convert(value) for value in values[kinds == kind]]
+
+    return pd.Index(values, dtype=object)
+
+class ProviderFeatureStore:
+    '''
+    Class to maintain aggregate features of each Provider (claim count, inpatient ratio, total and mean amounts, number
+    of unique Beneficiaries and Physicians) over all the claims seen so far.
+    The aggregates are updated incrementally with each new chunk of claims: the counts and sums are added, and the
+    unique Beneficiaries and Physicians are counted exactly from the sorted (Provider, Beneficiary) and
+    (Provider, Physician) pairs, so that only the pairs not seen before are added. Each chunk must contain new claims
+    only (a chunk given twice is counted twice).
+    The store is saved as a single '.npz' file with one array per column, and its features are joined to the claims by
+    looking up the index of the Providers.
+    '''
+    def __init__(self, colPhys=('AttendingPhysician', 'OperatingPhysician', 'OtherPhysician')):
+        '''
+        Function to initialize the class members
+
+        Parameter(s):
+        ------------
+        colPhys: tuple
+            Physician features of the claims data.
+        '''
+        self.colPhys = list(colPhys)
+        self.vocabulary = {'Provider': pd.Index([], dtype=object), 'BeneID': pd.Index([], dtype=object),
+                           'Physician': pd.Index([], dtype=object)} # Dictionary to store the values seen so far.
+        self.claimCount = np.zeros(0, dtype=np.int64)
+        self.inpatientCount = np.zeros(0, dtype=np.int64)
+        self.reimbursedSum = np.zeros(0, dtype=np.float64)
+        self.deductibleSum = np.zeros(0, dtype=np.float64)
+        self.uniqueBeneCount = np.zeros(0, dtype=np.int64)
+        self.uniquePhysCount = np.zeros(0, dtype=np.int64)
+        self.benePairs = np.zeros(0, dtype=np.int64) # Sorted keys of the (Provider, Beneficiary) pairs seen so far.
+        self.physPairs = np.zeros(0, dtype=np.int64) # Sorted keys of the (Provider, Physician) pairs seen so far.
+
+    def getCodes(self, name, values):
+        '''
+        Returns the codes of the given values in the vocabulary of the given name (-1 for the empty values), after
+        adding the values not seen before at the end of the vocabulary.
+
+        Parameters:
+        ----------
+        name: str
+            Name of the vocabulary ('Provider', 'BeneID' or 'Physician').
+        values: array-like
+            Values to be encoded.
+        '''
+
+        values = np.asarray(values, dtype=object)
+        codes = self.vocabulary[name].get_indexer(values)
+
+        isNew = (codes < 0) & pd.notnull(values)
+
+        if isNew.any():
+
+            self.vocabulary[name] = self.vocabulary[name].append(pd.Index(pd.unique(values[isNew]), dtype=object))
+            codes[isNew] = self.vocabulary[name].get_indexer(values[isNew])
+
+        return codes
+
+    def addPairs(self, pairs, providerCodes, otherCodes):
+        '''
+        Adds the given (Provider, other) pairs to the given sorted keys of the pairs seen so far. Returns the new sorted
+        keys and the number of pairs not seen before of each Provider.
+
+        Parameters:
+        ----------
+        pairs: numpy.ndarray
+            Sorted keys of the pairs seen so far.
+        providerCodes: numpy.ndarray
+            Codes of the Providers.
+        otherCodes: numpy.ndarray
+            Codes of the Beneficiaries or Physicians (-1 for the empty values).
+        '''
+
+        isValid = otherCodes >= 0
+
+        # Key of a pair: Provider code in the high 32 bits and the other code in the low 32 bits
+        keys = np.unique((providerCodes[isValid].astype(np.int64) << 32) | otherCodes[isValid].astype(np.int64))
+
+        positions = np.searchsorted(pairs, keys)
+        isSeen = np.zeros(keys.shape[0], dtype=bool)
+        isInRange = positions < pairs.shape[0]
+        isSeen[isInRange] = pairs[positions[isInRange]] == keys[isInRange]
+
+        newKeys = keys[~isSeen]
+
+        return np.insert(pairs, positions[~isSeen], newKeys), \
+               np.bincount(newKeys >> 32, minlength=len(self.vocabulary['Provider']))
+
+    def update(self, dataClaims):
+        '''
+        Updates the aggregates with the given chunk of new claims (Inpatient and/or Outpatient claims, merged or not
+        with the Beneficiary data) and returns the store.
+
+        Parameters:
+        ----------
+        dataClaims: pandas.core.frame.DataFrame
+            DataFrame containing a chunk of claims.
+        '''
+
+        providerCodes = self.getCodes('Provider', dataClaims['Provider'])
+
+        isValid = providerCodes >= 0
+        providerCodes = providerCodes[isValid]
+        countProviders = len(self.vocabulary['Provider'])
+
+        # Extend the aggregates for the new Providers
+        for name in ['claimCount', 'inpatientCount', 'reimbursedSum', 'deductibleSum', 'uniqueBeneCount',
+                     'uniquePhysCount']:
+
+            values = getattr(self, name)
+            setattr(self, name, np.concatenate([values, np.zeros(countProviders - values.shape[0], dtype=values.dtype)]))
+
+        def getColumn(col):
+            return dataClaims[col].to_numpy()[isValid] if col in dataClaims.columns else \
+                   np.full(providerCodes.shape[0], np.nan)
+
+        # The Inpatient claims are the claims having an Admission Date
+        isInpatient = pd.notnull(getColumn('AdmissionDt'))
+
+        self.claimCount += np.bincount(providerCodes, minlength=countProviders)
+        self.inpatientCount += np.bincount(providerCodes[isInpatient], minlength=countProviders)
+        self.reimbursedSum += np.bincount(providerCodes, minlength=countProviders,
+                                          weights=np.nan_to_num(getColumn('InscClaimAmtReimbursed').astype(float)))
+        self.deductibleSum += np.bincount(providerCodes, minlength=countProviders,
+                                          weights=np.nan_to_num(getColumn('DeductibleAmtPaid').astype(float)))
+
+        # Count the (Provider, Beneficiary) and (Provider, Physician) pairs not seen before
+        self.benePairs, newCounts = self.addPairs(self.benePairs, providerCodes,
+                                                  self.getCodes('BeneID', getColumn('BeneID')))
+        self.uniqueBeneCount += newCounts
+
+        colPhys = [col for col in self.colPhys if col in dataClaims.columns]
+
+        if len(colPhys) > 0:
+
+            self.physPairs, newCounts = self.addPairs(self.physPairs, np.tile(providerCodes, len(colPhys)),
+                                                      self.getCodes('Physician',
+                                                                    np.concatenate([getColumn(col) for col in colPhys])))
+            self.uniquePhysCount += newCounts
+
+        return self
+
+    def updateFromFiles(self, claimFiles, chunkSize=500000):
+        '''
+        Updates the aggregates with the claims of the given claims files (e.g. the daily delta of Inpatient and
+        Outpatient claims), read in chunks, and returns the store.
+
+        Parameters:
+        ----------
+        claimFiles: list
+            List of the paths of the claims CSV files.
+        chunkSize: int
+            Number of claims to be read at a time.
+        '''
+
+        claimDtypes = getClaimDtypes(getClaimColumns(claimFiles))
+
+        for claimFile in claimFiles:
+
+            for chunk in pd.read_csv(claimFile, dtype=claimDtypes, chunksize=chunkSize):
+                self.update(chunk)
+
+        return self
+
+    def getFeatures(self):
+        '''
+        Returns a DataFrame having the aggregate features of each Provider, indexed by the Provider.
+        '''
+
+        claimCount = np.maximum(self.claimCount, 1)
+
+        return pd.DataFrame({'ProvClaimCount': self.claimCount,
+                             'ProvInpatientRatio': self.inpatientCount/claimCount,
+                             'ProvTotalReimbursedAmt': self.reimbursedSum,
+                             'ProvMeanReimbursedAmt': self.reimbursedSum/claimCount,
+                             'ProvTotalDeductibleAmt': self.deductibleSum,
+                             'ProvMeanDeductibleAmt': self.deductibleSum/claimCount,
+                             'ProvUniqueBeneCount': self.uniqueBeneCount,
+                             'ProvUniquePhysCount': self.uniquePhysCount},
+                            index=pd.Index(self.vocabulary['Provider'], dtype=object, name='Provider'))[PROVIDER_FEATURES]
+
+    def join(self, data, fillValue=0):
+        '''
+        Returns the given dataset with the aggregate features of the Provider of each datapoint appended, looked up by
+        the index of the Providers. The Providers not in the store get 'fillValue'.
+
+        Parameters:
+        ----------
+        data: pandas.core.frame.DataFrame
+            Dataset having the 'Provider' column.
+        fillValue: float
+            Value of the features of the Providers not in the store.
+        '''
+
+        features = self.getFeatures()
+        positions = self.vocabulary['Provider'].get_indexer(data['Provider'])
+
+        # The last row of the lookup is for the unknown Providers (position -1)
+        lookup = np.vstack([features.to_numpy(dtype=np.float64), np.full((1, features.shape[1]), fillValue, dtype=float)])
+
+        return pd.concat([data, pd.DataFrame(lookup[positions], columns=features.columns, index=data.index)], axis=1)
+
+    def save(self, path, compress=False):
+        '''
+        Saves the store as a '.npz' file having one array per column. The values of the vocabularies (strings, integers
+        or floats) are saved as strings along with their kinds, so that the file is loaded without pickling and the
+        values keep their type.
+
+        Parameters:
+        ----------
+        path: str
+            Path of the file.
+        compress: bool
+            Whether to compress the arrays (smaller file, slower to load).
+        '''
+
+        saveFunction = np.savez_compressed if compress else np.savez
+
+        dictVocabularies = dict() # Dictionary to store the array name as key and the array of a vocabulary as value.
+
+        for name, arrayName in [('Provider', 'providers'), ('BeneID', 'beneIds'), ('Physician', 'physicians')]:
+            dictVocabularies[arrayName], dictVocabularies[arrayName + 'Kinds'] = \
+                getVocabularyArrays(self.vocabulary[name])
+
+        saveFunction(path, colPhys=np.array(self.colPhys, dtype=str), **dictVocabularies,
+                     claimCount=self.claimCount, inpatientCount=self.inpatientCount, reimbursedSum=self.reimbursedSum,
+                     deductibleSum=self.deductibleSum, uniqueBeneCount=self.uniqueBeneCount,
+                     uniquePhysCount=self.uniquePhysCount, benePairs=self.benePairs, physPairs=self.physPairs)
+
+    @classmethod
+    def load(cls, path):
+        '''
+        Loads a store saved with save().
+
+        Parameters:
+        ----------
+        path: str
+            Path of the file.
+        '''
+
+        with np.load(path, allow_pickle=False) as arrays:
+
+            store = cls(colPhys=arrays['colPhys'].tolist())
+
+            store.vocabulary = {name: getVocabulary(arrays[arrayName], arrays[arrayName + 'Kinds'])
+                                for name, arrayName in [('Provider', 'providers'), ('BeneID', 'beneIds'),
+                                                        ('Physician', 'physicians')]}
+
+            for name in ['claimCount', 'inpatientCount', 'reimbursedSum', 'deductibleSum', 'uniqueBeneCount',
+                         'uniquePhysCount', 'benePairs', 'physPairs']:
+                setattr(store, name, arrays[name])
+
+        return store
@@ -1,13 +1,16 @@
 import numpy as np
 import pandas as pd
 from sklearn.base import BaseEstimator, TransformerMixin
+from custom_package.code_counter import FactorizeColumn
+from custom_package.profiling import Profiled
+from custom_package.fold_cache import CachedFit, CachedTransform
 
 class ResponseEncoder(BaseEstimator, TransformerMixin):
     '''
     Class to do Response Encoding for the Categorical features.
     This class can be used in the sklearn's Pipeline to avoid data leakdage issues
     '''
-    def __init__(self, categoricalFeatures, className):
+    def __init__(self, categoricalFeatures, className, smoothing=0, copy=True, cache=None):
         '''
         Function to initialize the class members
         
@@ -17,17 +20,37 @@ class ResponseEncoder(BaseEstimator, TransformerMixin):
             List of features for which the response encoding has to be done to generate new features.
         className: str
             Name of the Class
+        smoothing: float
+            Weight (in number of datapoints) of the prior probability of the classes, added to the counts of each
+            feature value. The probabilities are (count + smoothing * prior) / (total count + smoothing), so that rare
+            feature values get probabilities close to the prior. With 0 (default), no smoothing is done.
+        copy: bool
+            Whether transform() works on a copy of the input DataFrame (True) or updates the input DataFrame in place
+            (False), which avoids copying the whole DataFrame for each batch.
+        cache: custom_package.fold_cache.FoldCache
+            Cache of the fitted Response Tables and of the transformed datasets, so that the encoder refitted on the
+            same fold (e.g. by several RandomizedSearchCV runs) does not compute them again. If None, nothing is cached.
         '''
         self.categoricalFeatures = categoricalFeatures # Categorical Features for which Response Encoding has to be done.
         self.responseTable = dict() # Dictionary to store the key:value pair with the 'key' being the categorical feature 
         # name and its 'value' as the dataFrame containing the Response Table.
         self.className = className
         self.classCount = 0 # Number of unique class labels. For binary classification, it will be 2.
-        
+        self.smoothing = smoothing
+        self.copy = copy
+        self.cache = cache
+        self.lookupTable = dict() # Dictionary to store the key:value pair with the 'key' being the categorical feature
+        # name and its 'value' as the lookup (Index of the feature values and array of class probabilities) used by the
+        # transform() method.
+        
+    @Profiled
+    @CachedFit
     def fit(self, X, y):
         '''
         Function called on a Dataset (usually Train Dataset) and Class Label to generate Response Encoded Table.
         This function is called only for the train dataset and not for any cv/test dataset to avoid data leakage.
+        The counts of each (feature value, class label) pair are found with a single pass over the feature, by
+        factorizing the feature values and the class labels and counting the pairs with 'bincount'.
         
         Parameters:
         ----------
@@ -37,77 +60,114 @@ class ResponseEncoder(BaseEstimator, TransformerMixin):
             Class Labels of the DataFrame
         '''
         
-        # Prepare a DataFrame based on the given the dataset and class label, containing just the input features and class labels
-        data = pd.DataFrame()
-        
-        # Add the features to the dataframe
-        for col in self.categoricalFeatures:
-            data[col] = X[col]
-
-        # Add the Class Label to the dataframe 
-        data['PotentialFraud'] = y
+        # Factorize the class labels: code of the class label of each datapoint and the array of unique class labels
+        labelCodes, uniqueClassLabels = pd.factorize(np.asarray(y), sort=True)
         
         # Store the count of total unique class labels in the class variable 'classCount'
-        self.classCount = len(y.unique())
+        self.classCount = len(uniqueClassLabels)
+        
+        # Prior probability of each class label, used for smoothing
+        classPrior = np.bincount(labelCodes[labelCodes >= 0], minlength=self.classCount)/np.sum(labelCodes >= 0)
         
         # Iterate through each of the categorical features for which Response Encoding has to be done
         for feature in self.categoricalFeatures:
             
-            # Dictionary to store the unique categorical feature names and encoded feature name as keys and their values as
-            # list of their corresponding values, class counts and count probabilities
-            dictResponseTable = dict()
+            # Code of the feature value of each datapoint and the array of unique (sorted) feature values
+            featureCodes, uniqueFeatValues = pd.factorize(np.asarray(X[feature]), sort=True)
             
-            uniqueFeatValues = np.sort(X[feature].unique()) # Array of unique feature values
-            uniqueClassLabels = np.sort(y.unique()) # Array of unique class labels
+            # Count of each (feature value, class label) pair. Datapoints with an empty feature value or class label
+            # are not counted.
+            isValid = (featureCodes >= 0) & (labelCodes >= 0)
+            countClass = np.bincount(featureCodes[isValid]*self.classCount + labelCodes[isValid],
+                                     minlength=len(uniqueFeatValues)*self.classCount)
+            countClass = countClass.reshape(len(uniqueFeatValues), self.classCount)
             
-            # Iterate through each of the categorical feature values and generate the Response Table
-            for featureVal in uniqueFeatValues:
-                
-                countClass = list() # List to store the count/frequency of a Class label for a particular feature.
-                probClass = list() # List to store the probability of occurence of a class label for a particular feature.
-                
-                # Loop through the unique Class Labels and find the count of the feature value
-                for label in uniqueClassLabels:
-                    
-                    # Append the frequency of Class Label 'label' for the feature 'featureVal' to the list 'countClass'
-                    countClass.append(data[(data[feature] == featureVal) & (data[self.className] == label)][self.className].count())
-                    
-                
-                # Loop through the unique Class Labels and find the likelihood probability of the feature value
-                for label in uniqueClassLabels:
-                    
-                    # Append the likelihood probability of the occurence of the class 'label' for the feature 'featureVal'
-                    probClass.append(countClass[label]/sum(countClass))
-                    
-                
-                # Prepare a dictionary having keys as features (original and new features) and their values as 
-                # feature value (for original features), class counts and class probabilities
+            # Likelihood probability of the occurence of each class label for each feature value
+            probClass = (countClass + self.smoothing*classPrior)/(countClass.sum(axis=1, keepdims=True) + self.smoothing)
+            
+            # Prepare a dictionary having keys as features (original and new features) and their values as 
+            # feature values (for original features), class counts and class probabilities
+            dictResponseTable = {feature: uniqueFeatValues}
+            
+            for i, label in enumerate(uniqueClassLabels):
                 
-                # Check if the key already exist or not in the dictionary. If not, create it
-                if (feature not in dictResponseTable.keys()):
-                    dictResponseTable[feature] = []
-                dictResponseTable[feature].append(featureVal) # Append the current iteration's feature value 'feature'
+                dictResponseTable[feature + 'Class' + str(label)] = countClass[:, i]
+                dictResponseTable[feature + '_' + str(label)] = probClass[:, i]
                 
-                # For each unique class label, add the class label and probability to the corresponding keys in the dictionary
-                for label in uniqueClassLabels:
-                    
-                    if (feature + 'Class' + str(label) not in dictResponseTable.keys()):
-                        dictResponseTable[feature + 'Class' + str(label)] = []
-                    if (feature + '_' + str(label) not in dictResponseTable.keys()):
-                        dictResponseTable[feature + '_' + str(label)] = []
-                    dictResponseTable[feature + 'Class' + str(label)].append(countClass[label])
-                    dictResponseTable[feature + '_' + str(label)].append(probClass[label])
-                    
             # Prepare and store the Response Table in the dictionary 'self.responseTable'
             self.responseTable[feature] = pd.DataFrame(dictResponseTable)
+            
+            # Remove the lookup prepared from the previous Response Table (if any)
+            self.getLookupTable().pop(feature, None)
         
         return self
     
+    def getLookupTable(self):
+        '''
+        Returns the dictionary of the lookups used by the transform() method. A model pickled before the lookups were
+        added does not have this attribute, so it is created here when it is missing.
+        '''
+        
+        if not hasattr(self, 'lookupTable'):
+            self.lookupTable = dict()
+            
+        return self.lookupTable
+    
+    def getLookup(self, feature):
+        '''
+        Returns the lookup of the given feature, prepared from its Response Table: the Index of the feature values, the
+        array of the class probabilities (a row for each feature value and a last row having the equal probabilities
+        1/classCount for the feature values which are not present in the Response Table) and the names of the response
+        encoded features.
+        
+        Parameters:
+        ----------
+        feature: str
+            Name of the categorical feature.
+        '''
+        
+        lookupTable = self.getLookupTable()
+        
+        if feature not in lookupTable:
+            
+            responseTable = self.responseTable[feature]
+            
+            # Names of the response encoded features (having the class probabilities)
+            responseEncFeat = [col for col in responseTable.columns if '_' in col]
+            
+            probClass = np.vstack([responseTable[responseEncFeat].to_numpy(dtype=np.float64),
+                                   np.full((1, len(responseEncFeat)), 1/self.classCount)])
+            
+            lookupTable[feature] = (pd.Index(responseTable[feature]), probClass, responseEncFeat)
+            
+        return lookupTable[feature]
+    
+    def getInputFeatures(self, outputFeatures):
+        '''
+        Returns the input features giving the given output features (e.g. the features of the Model following the
+        encoder in a Pipeline): the response encoded features are replaced by their categorical features, which
+        transform() removes and encodes after the other features.
+        
+        Parameters:
+        ----------
+        outputFeatures: list
+            List of the features returned by transform().
+        '''
+        
+        responseEncFeat = set(col for feature in self.categoricalFeatures for col in self.getLookup(feature)[2])
+        
+        return [col for col in outputFeatures if col not in responseEncFeat] + list(self.categoricalFeatures)
+    
+    @Profiled
+    @CachedTransform
     def transform(self, X, y= None):
         '''
         Function called on a Dataset (Train/Test Dataset) and/or Class Label to generate Response Encoded Features.
         This is called to avoid any data leakage. This uses the Response Table already prepared by the fit() method
         and does not consider the test dataset.
+        The feature values which are not present in the Response Table (and the empty values) get the equal
+        probabilities 1/classCount of the classes; the encoder merging the Response Tables left them at 0. The returned
+        DataFrame keeps the index of X, which the merge reset to 0..n-1.
         
         Parameters:
         ----------
@@ -117,31 +177,35 @@ class ResponseEncoder(BaseEstimator, TransformerMixin):
             Class Labels of the DataFrame
         '''
         
-        # Get a copy of the input dataframe such the input dataframe is not modified.
-        xEncoded = X.copy()
-        
-        listResponseEncFeat = list() # List to store the names of the response encoded features.
+        # Get a copy of the input dataframe such the input dataframe is not modified (unless the transformation has to be
+        # done in place).
+        xEncoded = X.copy() if getattr(self, 'copy', True) else X
         
         # Iterate through each of the categorical features for which Response Encoding has to be done
         for feature in self.categoricalFeatures:
-        
-            # Merge with the Response Table Dataframe
-            xEncoded = pd.merge(left=xEncoded, right=self.responseTable[feature], how='left', on=feature)
             
-            # Form the list of the features (original and class count) to be dropped from the Dataset
-            listResponseEncFeat.extend([col for col in list(self.responseTable[feature].columns) if '_' not in col])
+            featureValues, probClass, responseEncFeat = self.getLookup(feature)
             
-        # Fill the values for the datapoints which are not present in the Response Table with equal probabilities of the class
-        xEncoded.fillna(1/self.classCount)
-        
-        # Drop the original features and class count features. Keep only the response encoded features having class prob.
-        xEncoded.drop(columns=listResponseEncFeat, inplace=True)
-        
-        # Convert the values of the dataframe to numeric.
-        xEncoded.apply(pd.to_numeric)
+            # Position of each feature value in the Response Table. The positions are found only for the unique values
+            # of the feature, then gathered for each datapoint. The feature values which are not present in the
+            # Response Table (and the empty values) get the position -1, i.e. the last row of 'probClass' having the
+            # equal probabilities of the classes.
+            codes, uniques = FactorizeColumn(xEncoded[feature])
+            positions = np.append(featureValues.get_indexer(uniques), -1)[codes]
+            
+            # Gather the class probabilities of each datapoint
+            probDatapoints = probClass[positions]
+            
+            # Drop the original feature and add the response encoded features having the class probabilities.
+            del xEncoded[feature]
+            
+            for i, col in enumerate(responseEncFeat):
+                xEncoded[col] = probDatapoints[:, i]
         
-        # Fill the empty/missing values with 0.
-        xEncoded.fillna(0, inplace=True)
+        # Fill the empty/missing values with 0, only for the features having empty values.
+        for col in xEncoded.columns:
+            if xEncoded[col].hasnans:
+                xEncoded[col] = xEncoded[col].fillna(0)
         
         # Return this DataFrame with all the numerical features and the response encoded features for the categorical features
-        return xEncoded
\ No newline at end of file
+        return xEncoded
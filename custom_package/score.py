@@ -0,0 +1,424 @@
+import sys
+import time
+import queue
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Marker of the end of the chunks in the queues of the pipeline
+END_OF_CHUNKS = None
+
+def parseArguments(argv=None):
+    '''
+    Parses the command line arguments.
+
+    Parameters:
+    ----------
+    argv: list
+        Arguments (without the program name). If None, the arguments of the command line.
+    '''
+
+    parser = argparse.ArgumentParser(prog='python -m custom_package.score',
+                                     description='Scores the claims of the given files with a trained Model and writes '
+                                                 'the predicted PotentialFraud of each claim.')
+    parser.add_argument('providerFile', help='CSV file of the Providers.')
+    parser.add_argument('beneficiaryFile', help='CSV file of the Beneficiaries.')
+    parser.add_argument('inpatientFile', help='CSV file of the Inpatient claims.')
+    parser.add_argument('outpatientFile', help='CSV file of the Outpatient claims.')
+    parser.add_argument('modelFile', help='Model artifact (pickled .pkl or joblib .joblib Pipeline).')
+    parser.add_argument('--output', default='Predictions.csv',
+                        help='Output file of the predictions: CSV, or Parquet when it ends with .parquet.')
+    parser.add_argument('--chunk-size', type=int, default=100000, help='Number of claims scored at a time.')
+    parser.add_argument('--max-date', default=None,
+                        help='Maximum Claim End Date or Discharge Date of the training data, used to compute the Age. '
+                             'If not given, it is found from the claims files.')
+    parser.add_argument('--cache', default=None,
+                        help='SQLite file of the score cache, so that the claims already scored by the same Model '
+                             'are not scored again.')
+    parser.add_argument('--features', default=None,
+                        help='Text file having the features of the Model (the columns given to the Model in training), '
+                             'one per line. If not given, they are found from the Model.')
+    parser.add_argument('--queue-size', type=int, default=2,
+                        help='Maximum number of chunks waiting between two stages of the pipeline.')
+
+    return parser.parse_args(argv)
+
+def LoadModel(modelFile):
+    '''
+    Loads the Model artifact: with joblib for the '.joblib' files, otherwise with pickle.
+
+    Parameters:
+    ----------
+    modelFile: str
+        Path of the Model artifact.
+    '''
+
+    if modelFile.endswith('.joblib'):
+
+        import joblib
+        return joblib.load(modelFile)
+
+    import pickle
+
+    with open(modelFile, 'rb') as f:
+        return pickle.load(f)
+
+def GetFeatureColumns(model):
+    '''
+    Returns the features expected by the given Model (or Pipeline), in order, i.e. the columns of the preprocessed
+    claims to be given to it, or None if they cannot be found. They are the features of the Model (or of the final
+    estimator of the Pipeline: 'feature_names_in_', or the feature names of the XGBoost Booster), mapped back through the
+    steps of the Pipeline which change the features (e.g. ResponseEncoder, see its getInputFeatures method).
+
+    Parameters:
+    ----------
+    model: object
+        Trained Model or Pipeline.
+    '''
+
+    if hasattr(model, 'feature_names_in_'):
+        return list(model.feature_names_in_)
+
+    estimator = model.steps[-1][1] if hasattr(model, 'steps') else model
+    featureColumns = getattr(estimator, 'feature_names_in_', None)
+
+    if featureColumns is None and hasattr(estimator, 'get_booster'):
+        featureColumns = estimator.get_booster().feature_names
+
+    if featureColumns is None:
+        return None
+
+    featureColumns = list(featureColumns)
+
+    # The steps which do not have getInputFeatures keep the names of the features (e.g. Standardize)
+    for _, step in reversed(model.steps[:-1] if hasattr(model, 'steps') else []):
+
+        if hasattr(step, 'getInputFeatures'):
+            featureColumns = step.getInputFeatures(featureColumns)
+
+    return featureColumns
+
+def LoadFeatureColumns(featuresFile):
+    '''
+    Returns the features listed in the given text file (one per line, the empty lines being ignored).
+
+    Parameters:
+    ----------
+    featuresFile: str
+        Path of the text file.
+    '''
+
+    with open(featuresFile) as f:
+        return [line.strip() for line in f if line.strip()]
+
+class PredictionWriter:
+    '''
+    Class to write the predictions chunk by chunk to a CSV file or, when the file ends with '.parquet', to a Parquet
+    file (one row group per chunk, pyarrow being imported only in this case).
+    '''
+    def __init__(self, outputFile):
+        '''
+        Function to initialize the class members
+
+        Parameter(s):
+        ------------
+        outputFile: str
+            Path of the output file.
+        '''
+        self.outputFile = outputFile
+        self.isParquet = outputFile.endswith('.parquet')
+        self.parquetWriter = None # Writer of the Parquet file, created with the schema of the first chunk.
+        self.countRows = 0 # Number of rows written.
+
+    def write(self, dataChunk):
+        '''
+        Writes the given chunk of predictions at the end of the file.
+
+        Parameters:
+        ----------
+        dataChunk: pandas.core.frame.DataFrame
+            Predictions of a chunk of claims.
+        '''
+
+        if self.isParquet:
+
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pandas(dataChunk, preserve_index=False)
+
+            if self.parquetWriter is None:
+                self.parquetWriter = pq.ParquetWriter(self.outputFile, table.schema)
+
+            self.parquetWriter.write_table(table)
+
+        else:
+
+            dataChunk.to_csv(self.outputFile, mode='w' if self.countRows == 0 else 'a', header=self.countRows == 0,
+                             index=False)
+
+        self.countRows += dataChunk.shape[0]
+
+    def close(self):
+        '''
+        Closes the file. An empty file (with the header only) is written when there was no chunk.
+        '''
+
+        if self.countRows == 0:
+
+            import pandas as pd
+
+            self.write(pd.DataFrame({'ClaimID': [], 'Provider': [], 'PotentialFraud': [], 'FraudProbability': []}))
+
+        if self.parquetWriter is not None:
+            self.parquetWriter.close()
+
+def ScoreFiles(providerFile, beneficiaryFile, inpatientFile, outpatientFile, modelFile, outputFile, chunkSize=100000,
+               maxDate=None, cacheFile=None, queueSize=2, featuresFile=None):
+    '''
+    Scores the claims of the given files with the given Model artifact and writes the Claim ID, the Provider, the
+    predicted 'PotentialFraud' ('Yes'/'No') and its probability of each claim to the output file.
+    The Model is loaded in a background thread while the Provider and Beneficiary data are read. The claims are then
+    scored chunk by chunk through a pipeline of threads (read and merge, preprocess and predict, write) connected by
+    bounded queues, so that reading and writing the files overlap with the scoring. Returns a dictionary having the
+    time (in seconds) spent in each stage, the total time and the number of scored claims.
+
+    Parameters:
+    ----------
+    providerFile: str
+        CSV file of the Providers.
+    beneficiaryFile: str
+        CSV file of the Beneficiaries.
+    inpatientFile: str
+        CSV file of the Inpatient claims.
+    outpatientFile: str
+        CSV file of the Outpatient claims.
+    modelFile: str
+        Model artifact (pickled or joblib Pipeline having 'predict_proba').
+    outputFile: str
+        Output file of the predictions (CSV, or Parquet when it ends with '.parquet').
+    chunkSize: int
+        Number of claims scored at a time.
+    maxDate: str
+        Maximum Claim End Date or Discharge Date of the training data. If None, it is found from the claims files.
+    cacheFile: str
+        SQLite file of the ScoreCache, or None to score all the claims.
+    queueSize: int
+        Maximum number of chunks waiting between two stages of the pipeline.
+    featuresFile: str
+        Text file having the features of the Model, one per line. If None, they are found from the Model (see
+        GetFeatureColumns). Each preprocessed chunk is reindexed to these features, so that the columns left out of the
+        training data (e.g. the columns which were empty) are removed and the missing ones are filled with 0.
+    '''
+
+    startTime = time.perf_counter()
+    timings = {'LoadModel': 0.0, 'Read': 0.0, 'Preprocess': 0.0, 'Predict': 0.0, 'Write': 0.0}
+    claimFiles = [inpatientFile, outpatientFile]
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+
+        # Load the Model while the data is read
+        def loadModel():
+            modelStartTime = time.perf_counter()
+            model = LoadModel(modelFile)
+            timings['LoadModel'] = time.perf_counter() - modelStartTime
+            return model
+
+        futureModel = executor.submit(loadModel)
+
+        import numpy as np
+        import pandas as pd
+        from custom_package.streaming import FindMaxDate, StreamMergedClaims
+
+        readStartTime = time.perf_counter()
+
+        dataProvider = pd.read_csv(providerFile)
+        dataBeneficiary = pd.read_csv(beneficiaryFile)
+
+        maxDate = pd.Timestamp(maxDate) if maxDate is not None else FindMaxDate(claimFiles)
+
+        timings['Read'] += time.perf_counter() - readStartTime
+
+        model = futureModel.result()
+
+    from custom_package.data_preprocessing import PreprocessData, DataPreprocessor
+
+    # A Pipeline starting with a DataPreprocessor is given the merged claims, otherwise they are preprocessed here
+    hasPreprocessor = hasattr(model, 'steps') and isinstance(model.steps[0][1], DataPreprocessor)
+    featureColumns = LoadFeatureColumns(featuresFile) if featuresFile is not None else GetFeatureColumns(model)
+
+    if featureColumns is None and not hasPreprocessor:
+        raise ValueError('The features of the Model cannot be found from the Model: give them with --features.')
+
+    scoreCache = None
+
+    if cacheFile is not None:
+
+        from custom_package.data_ingest import GetFileHash
+        from custom_package.score_cache import ScoreCache, ScoreClaimsWithCache
+
+        scoreCache = ScoreCache(cacheFile)
+        modelVersion = GetFileHash(modelFile)
+
+        # The DataPreprocessor of the Pipeline preprocesses only the claims which are not in the cache
+        preprocessor = model.steps[0][1] if hasPreprocessor else None
+        cachedModel = model[1:] if hasPreprocessor else model
+
+    queueChunks = queue.Queue(maxsize=queueSize) # Merged chunks of claims, from the reader to the scorer.
+    queuePredictions = queue.Queue(maxsize=queueSize) # Predictions, from the scorer to the writer.
+    listErrors = list() # List to store the errors of the reader and writer threads.
+
+    def readChunks():
+        '''
+        Reads and merges the chunks of claims and puts them in the queue of chunks.
+        '''
+        try:
+            chunks = StreamMergedClaims(dataProvider, dataBeneficiary, claimFiles, chunkSize)
+            while True:
+                chunkStartTime = time.perf_counter()
+                chunk = next(chunks, END_OF_CHUNKS)
+                timings['Read'] += time.perf_counter() - chunkStartTime
+                if chunk is END_OF_CHUNKS:
+                    break
+                queueChunks.put(chunk)
+        except Exception as error:
+            listErrors.append(error)
+        finally:
+            queueChunks.put(END_OF_CHUNKS)
+
+    def writePredictions():
+        '''
+        Writes the predictions taken from the queue of predictions. After an error, the remaining predictions are only
+        taken from the queue, so that the scorer is not blocked.
+        '''
+        predictionWriter = PredictionWriter(outputFile)
+        while True:
+            dataPredictions = queuePredictions.get()
+            if dataPredictions is END_OF_CHUNKS:
+                break
+            if len(listErrors) == 0:
+                try:
+                    writeStartTime = time.perf_counter()
+                    predictionWriter.write(dataPredictions)
+                    timings['Write'] += time.perf_counter() - writeStartTime
+                except Exception as error:
+                    listErrors.append(error)
+        try:
+            predictionWriter.close()
+        except Exception as error:
+            listErrors.append(error)
+
+    readerThread = threading.Thread(target=readChunks, daemon=True)
+    writerThread = threading.Thread(target=writePredictions, daemon=True)
+    readerThread.start()
+    writerThread.start()
+
+    countClaims = 0
+
+    try:
+
+        while True:
+
+            chunk = queueChunks.get()
+
+            if chunk is END_OF_CHUNKS or len(listErrors) > 0:
+                break
+
+            if scoreCache is not None:
+
+                # The preprocessing and the prediction of the claims not in the cache are timed together
+                scoreStartTime = time.perf_counter()
+                dataPredictions = ScoreClaimsWithCache(chunk, cachedModel, scoreCache, modelVersion, maxDate=maxDate,
+                                                       featureColumns=featureColumns, preprocessor=preprocessor)
+                timings['Predict'] += time.perf_counter() - scoreStartTime
+
+            else:
+
+                preprocessStartTime = time.perf_counter()
+
+                if hasPreprocessor:
+
+                    xData = chunk
+
+                else:
+
+                    xData = PreprocessData(chunk, maxDate=maxDate, dropEmptyColumns=False)
+
+                    if 'PotentialFraud' in xData.columns:
+                        xData.drop(columns='PotentialFraud', inplace=True)
+
+                    xData = xData.reindex(columns=featureColumns, fill_value=0)
+
+                timings['Preprocess'] += time.perf_counter() - preprocessStartTime
+
+                predictStartTime = time.perf_counter()
+                predProb = model.predict_proba(xData)[:, 1]
+                timings['Predict'] += time.perf_counter() - predictStartTime
+
+                dataPredictions = pd.DataFrame({'ClaimID': chunk['ClaimID'].to_numpy(),
+                                                'Provider': chunk['Provider'].to_numpy(),
+                                                'PotentialFraud': np.where(predProb >= 0.5, 'Yes', 'No'),
+                                                'FraudProbability': predProb})
+
+            queuePredictions.put(dataPredictions)
+            countClaims += dataPredictions.shape[0]
+
+    finally:
+
+        # Stop the reader (if it is blocked on a full queue) and let the writer finish
+        while readerThread.is_alive():
+            try:
+                queueChunks.get(timeout=0.1)
+            except queue.Empty:
+                pass
+
+        queuePredictions.put(END_OF_CHUNKS)
+        writerThread.join()
+
+    if len(listErrors) > 0:
+        raise listErrors[0]
+
+    timings['Total'] = time.perf_counter() - startTime
+    timings['Claims'] = countClaims
+
+    if scoreCache is not None:
+        timings['CacheHits'] = sum(stats['Hits'] for stats in scoreCache.runStats)
+
+    return timings
+
+def main(argv=None):
+    '''
+    Runs the scoring of the command line and prints the timing breakdown.
+
+    Parameters:
+    ----------
+    argv: list
+        Arguments (without the program name). If None, the arguments of the command line.
+    '''
+
+    args = parseArguments(argv)
+
+    timings = ScoreFiles(args.providerFile, args.beneficiaryFile, args.inpatientFile, args.outpatientFile,
+                         args.modelFile, args.output, chunkSize=args.chunk_size, maxDate=args.max_date,
+                         cacheFile=args.cache, queueSize=args.queue_size, featuresFile=args.features)
+
+    print('Scored %d claims in %.2f s (%.0f claims/s), written to %s' %
+          (timings['Claims'], timings['Total'], timings['Claims']/timings['Total'] if timings['Total'] > 0 else 0,
+           args.output))
+
+    if 'CacheHits' in timings:
+        print('Score cache hits: %d (%.1f%%)' % (timings['CacheHits'],
+                                                100*timings['CacheHits']/timings['Claims'] if timings['Claims'] else 0))
+
+    # The stages run in overlapping threads, so that their times add up to more than the total time
+    print('Timing breakdown (overlapping stages):')
+
+    for stage in ['LoadModel', 'Read', 'Preprocess', 'Predict', 'Write']:
+        print('  %-10s %8.2f s' % (stage, timings[stage]))
+
+    print('  %-10s %8.2f s' % ('Total', timings['Total']))
+
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
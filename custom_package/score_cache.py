@@ -0,0 +1,256 @@
+import os
+import time
+import sqlite3
+import itertools
+import threading
+import contextlib
+import numpy as np
+import pandas as pd
+from custom_package.data_preprocessing import PreprocessData
+from custom_package.fold_cache import GetFingerprint
+
+def GetClaimKeys(data, cacheVersion, excludeColumns=('PotentialFraud',)):
+    '''
+    Returns the key (64-bit hash, as int64) of each row of the given merged claims dataset (claim, Beneficiary and
+    Provider columns, as returned by MergeDatasets or StreamMergedClaims) for the given version of the cache. The key is
+    the hash of the values of all the columns of the row (in the order of their names, Claim ID included) except the
+    excluded ones, keyed by the version, so that a resubmitted claim has the same key and an amended claim (or a claim
+    scored by another version) has another key. The key of a row does not depend on the other rows, on the index or on
+    the run. The values are hashed with their datatypes (e.g. a column read as float instead of int gives other keys),
+    which can only make the claims be scored again.
+
+    Parameters:
+    ----------
+    data: pandas.core.frame.DataFrame
+        Merged claims dataset.
+    cacheVersion: str
+        Version of the cache (hexadecimal fingerprint of the Model and preprocessing versions).
+    excludeColumns: tuple
+        Columns which do not change the score of a claim (e.g. the class label).
+    '''
+
+    columns = sorted(col for col in data.columns if col not in excludeColumns)
+
+    return pd.util.hash_pandas_object(data[columns], index=False, hash_key=cacheVersion[:16]).to_numpy().view(np.int64)
+
+class ScoreCache:
+    '''
+    Class to keep, in a local SQLite database, the fraud probability of each scored claim, keyed by the hash of the
+    merged claim record and of the version of the Model (see GetClaimKeys). A claim is found in the cache only when it
+    was scored by the same version and was not amended since.
+    The entries are used as a LRU cache: reading an entry updates its last use time, and the least recently used entries
+    are removed when the cache has more than maxEntries entries (down to 90% of maxEntries, so that the entries are not
+    sorted by their last use at each run). The database can be shared by several processes.
+    '''
+    def __init__(self, cachePath='ScoreCache.sqlite', maxEntries=10000000, batchSize=10000):
+        '''
+        Function to initialize the class members
+
+        Parameter(s):
+        ------------
+        cachePath: str
+            Path of the SQLite database file.
+        maxEntries: int
+            Maximum number of entries (scored claims, all the Model versions together) kept in the cache.
+        batchSize: int
+            Number of keys looked up by each query.
+        '''
+        self.cachePath = cachePath
+        self.maxEntries = maxEntries
+        self.batchSize = batchSize
+        self.runStats = list() # List to store the hit-rate statistics of each scoring run.
+        self.lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(cachePath)), exist_ok=True)
+
+        with self.connect() as connection:
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('CREATE TABLE IF NOT EXISTS scores (claimKey INTEGER PRIMARY KEY, probability REAL, '
+                               'lastUsed INTEGER)')
+
+    @contextlib.contextmanager
+    def connect(self):
+        '''
+        Opens a connection to the database, commits its changes at the end (or rolls them back on error) and closes it.
+        '''
+
+        connection = sqlite3.connect(self.cachePath, timeout=60)
+
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def get(self, claimKeys):
+        '''
+        Returns the cached probability of each of the given claims (nan when the claim is not found). The entries found
+        are marked as recently used.
+
+        Parameters:
+        ----------
+        claimKeys: numpy.ndarray
+            Keys of the claims (see GetClaimKeys).
+        '''
+
+        claimKeys = np.asarray(claimKeys, dtype=np.int64)
+        probabilities = np.full(claimKeys.shape[0], np.nan)
+
+        # The keys are looked up in sorted order, which reads the pages of the table in order
+        uniqueKeys = np.unique(claimKeys)
+        listRows = list() # List to store the (key, probability) of the entries found.
+        lastUsed = time.time_ns()
+
+        with self.lock, self.connect() as connection:
+
+            for start in range(0, uniqueKeys.shape[0], self.batchSize):
+
+                keys = uniqueKeys[start:start + self.batchSize].tolist()
+                placeholders = ','.join('?'*len(keys))
+
+                listRows += connection.execute('SELECT claimKey, probability FROM scores WHERE claimKey IN (%s)'
+                                               % placeholders, keys).fetchall()
+                connection.execute('UPDATE scores SET lastUsed = ? WHERE claimKey IN (%s)' % placeholders,
+                                   [lastUsed] + keys)
+
+        if len(listRows) > 0:
+
+            foundKeys, foundProbabilities = (np.array(values) for values in zip(*listRows))
+            order = np.argsort(foundKeys)
+            foundKeys, foundProbabilities = foundKeys[order].astype(np.int64), foundProbabilities[order]
+
+            # Find the position of the key of each claim among the keys found
+            positions = np.minimum(np.searchsorted(foundKeys, claimKeys), foundKeys.shape[0] - 1)
+            isFound = foundKeys[positions] == claimKeys
+
+            probabilities[isFound] = foundProbabilities[positions[isFound]]
+
+        return probabilities
+
+    def put(self, claimKeys, probabilities):
+        '''
+        Adds the given scored claims to the cache, then removes the least recently used entries if the cache has too
+        many entries.
+
+        Parameters:
+        ----------
+        claimKeys: numpy.ndarray
+            Keys of the claims (see GetClaimKeys).
+        probabilities: numpy.ndarray
+            Fraud probabilities of the claims.
+        '''
+
+        claimKeys = np.asarray(claimKeys, dtype=np.int64)
+        order = np.argsort(claimKeys)
+        lastUsed = time.time_ns()
+
+        with self.lock, self.connect() as connection:
+
+            probabilities = np.asarray(probabilities, dtype=np.float64)[order]
+
+            connection.executemany('INSERT OR REPLACE INTO scores VALUES (?, ?, ?)',
+                                   zip(claimKeys[order].tolist(), probabilities.tolist(), itertools.repeat(lastUsed)))
+
+            self.evict(connection)
+
+    def evict(self, connection):
+        '''
+        Removes the least recently used entries, down to 90% of maxEntries, when the cache has more than maxEntries
+        entries.
+
+        Parameters:
+        ----------
+        connection: sqlite3.Connection
+            Open connection to the database.
+        '''
+
+        countEntries = connection.execute('SELECT COUNT(*) FROM scores').fetchone()[0]
+
+        if countEntries > self.maxEntries:
+            connection.execute('DELETE FROM scores WHERE claimKey IN (SELECT claimKey FROM scores ORDER BY lastUsed '
+                               'LIMIT ?)', (countEntries - int(0.9*self.maxEntries),))
+
+    def clear(self):
+        '''
+        Removes all the entries of the cache.
+        '''
+
+        with self.lock, self.connect() as connection:
+            connection.execute('DELETE FROM scores')
+
+def ScoreClaimsWithCache(data, model, scoreCache, modelVersion, maxDate=None, featureColumns=None, preprocessor=None):
+    '''
+    Scores the given merged claims dataset (as returned by MergeDatasets or StreamMergedClaims) like ScoreClaimsInChunks
+    does for a chunk, but preprocesses and scores only the claims which are not in the given ScoreCache: the new
+    claims and the claims amended since they were scored. The probabilities of the other claims are taken from the
+    cache, and the new probabilities are added to it. The features of a claim depend only on the claim and on the
+    maximum date, so that its cached probability is the one it would get again.
+    Returns a DataFrame with the Claim ID, the Provider, the predicted 'PotentialFraud' ('Yes'/'No') and its
+    probability, in the order of the dataset. The hit-rate statistics of the run are appended to scoreCache.runStats.
+
+    Parameters:
+    ----------
+    data: pandas.core.frame.DataFrame
+        Merged claims dataset.
+    model: object
+        Trained model (or Pipeline) having 'predict_proba'.
+    scoreCache: ScoreCache
+        Cache of the probabilities of the scored claims.
+    modelVersion: str
+        Version of the Model (e.g. its version in the ModelRegistry or the hash of its artifact). It is combined with
+        the maximum date and the features (or the fitted state of the preprocessor), so that the claims are scored again
+        when any of them changes.
+    maxDate: pandas.Timestamp
+        Maximum Claim End Date or Discharge Date of the training data, required when 'preprocessor' is None.
+    featureColumns: list
+        Features expected by the model, in order, used when 'preprocessor' is None.
+    preprocessor: custom_package.data_preprocessing.DataPreprocessor
+        Fitted DataPreprocessor to be used instead of PreprocessData.
+    '''
+
+    if preprocessor is None and maxDate is None:
+        raise ValueError('maxDate is required when no fitted preprocessor is given.')
+
+    startTime = time.perf_counter()
+
+    if preprocessor is not None:
+        cacheVersion = GetFingerprint(str(modelVersion), preprocessor.maxDate_, preprocessor.featureNames_)
+    else:
+        cacheVersion = GetFingerprint(str(modelVersion), pd.Timestamp(maxDate), featureColumns)
+
+    claimKeys = GetClaimKeys(data, cacheVersion)
+
+    predProb = scoreCache.get(claimKeys)
+    missPositions = np.flatnonzero(np.isnan(predProb))
+
+    if len(missPositions) > 0:
+
+        dataMisses = data.iloc[missPositions]
+
+        if preprocessor is not None:
+
+            xData = preprocessor.transform(dataMisses)
+
+        else:
+
+            xData = PreprocessData(dataMisses, maxDate=pd.Timestamp(maxDate), dropEmptyColumns=False)
+
+            if 'PotentialFraud' in xData.columns:
+                xData.drop(columns='PotentialFraud', inplace=True)
+
+            if featureColumns is not None:
+                xData = xData.reindex(columns=featureColumns, fill_value=0)
+
+        predProb[missPositions] = model.predict_proba(xData)[:, 1]
+
+        scoreCache.put(claimKeys[missPositions], predProb[missPositions])
+
+    countClaims, countMisses = data.shape[0], len(missPositions)
+
+    scoreCache.runStats.append({'Claims': countClaims, 'Hits': countClaims - countMisses, 'Misses': countMisses,
+                                'HitRate': (countClaims - countMisses)/countClaims if countClaims else 0,
+                                'Time': time.perf_counter() - startTime})
+
+    return pd.DataFrame({'ClaimID': data['ClaimID'].to_numpy(), 'Provider': data['Provider'].to_numpy(),
+                         'PotentialFraud': np.where(predProb >= 0.5, 'Yes', 'No'), 'FraudProbability': predProb},
+                        index=data.index)
@@ -0,0 +1,407 @@
+import json
+import time
+import asyncio
+import numpy as np
+import pandas as pd
+from collections import deque
+from custom_package.data_preprocessing import PreprocessData
+from custom_package.merge_datasets import ClaimEnricher
+from custom_package.streaming import CLAIM_COLUMNS, CoerceClaimDtypes
+
+class ClaimScorer:
+    '''
+    Class to score batches of claim records: each batch is combined with the in-memory Beneficiary and Provider data,
+    preprocessed and scored with the Model at once.
+    '''
+    def __init__(self, dataProvider, dataBeneficiary, model, preprocessor=None, maxDate=None, featureColumns=None,
+                 claimColumns=None):
+        '''
+        Function to initialize the class members
+
+        Parameter(s):
+        ------------
+        dataProvider: pandas.core.frame.DataFrame
+            DataFrame containing the Provider Unique Identifier.
+        dataBeneficiary: pandas.core.frame.DataFrame
+            DataFrame containing the Beneficiary related data.
+        model: object
+            Trained Model (or Pipeline) having 'predict_proba'.
+        preprocessor: custom_package.data_preprocessing.DataPreprocessor
+            Fitted DataPreprocessor. If None, PreprocessData is used with 'maxDate' and 'featureColumns'.
+        maxDate: pandas.Timestamp
+            Maximum Claim End Date or Discharge Date of the training data, required when 'preprocessor' is None.
+        featureColumns: list
+            Features expected by the Model, in order, used when 'preprocessor' is None.
+        claimColumns: list
+            Columns of the claim records. Defaults to the columns of the Inpatient claims.
+        '''
+        if preprocessor is None and maxDate is None:
+            raise ValueError('maxDate is required when no fitted preprocessor is given.')
+
+        self.claimEnricher = ClaimEnricher(dataProvider, dataBeneficiary)
+        self.model = model
+        self.preprocessor = preprocessor
+        self.maxDate = None if maxDate is None else pd.Timestamp(maxDate)
+        self.featureColumns = featureColumns
+        self.claimColumns = CLAIM_COLUMNS if claimColumns is None else claimColumns
+
+    def score(self, records):
+        '''
+        Scores the given claim records and returns a DataFrame having, for each record (in the same order), the Claim ID,
+        the predicted 'PotentialFraud' ('Yes'/'No') and its probability. The records whose Beneficiary or Provider is
+        unknown get no prediction (None).
+
+        Parameters:
+        ----------
+        records: list
+            List of claim records (dictionaries having the claim columns as keys).
+        '''
+
+        dataClaims = CoerceClaimDtypes(pd.DataFrame.from_records(records, columns=self.claimColumns))
+
+        # Combine the claims with the Beneficiary and Provider data
+        data = self.claimEnricher.enrich(dataClaims, self.claimColumns)
+
+        predProb = np.array([], dtype=np.float64)
+
+        if data.shape[0] > 0:
+
+            if self.preprocessor is not None:
+
+                xData = self.preprocessor.transform(data)
+
+            else:
+
+                xData = PreprocessData(data, maxDate=self.maxDate, dropEmptyColumns=False)
+
+                if 'PotentialFraud' in xData.columns:
+                    xData.drop(columns='PotentialFraud', inplace=True)
+
+                if self.featureColumns is not None:
+                    xData = xData.reindex(columns=self.featureColumns, fill_value=0)
+
+            predProb = self.model.predict_proba(xData)[:, 1]
+
+        # Align the probabilities to the input records (the merged claims are the matched records, in the same order)
+        benePositions, providerPositions = self.claimEnricher.getPositions(dataClaims)
+        isMatched = (benePositions >= 0) & (providerPositions >= 0)
+
+        dataResult = pd.DataFrame({'ClaimID': dataClaims['ClaimID'], 'FraudProbability': np.nan})
+        dataResult.loc[isMatched, 'FraudProbability'] = predProb
+        dataResult['PotentialFraud'] = np.where(dataResult['FraudProbability'].isna(), None,
+                                                np.where(dataResult['FraudProbability'] >= 0.5, 'Yes', 'No'))
+
+        return dataResult
+
+class ScoringService:
+    '''
+    Class implementing a local HTTP scoring service (asyncio based) around a ClaimScorer.
+    The concurrent requests are coalesced into micro-batches: the first request of a batch waits at most 'maxLatencyMs'
+    milliseconds for other requests, and the whole batch is scored at once.
+
+    Endpoints:
+    ---------
+    POST /score: Body containing a claim record or a list of claim records (JSON). Returns the list of predictions.
+    GET /stats: Returns the latency (p50/p99 in milliseconds) and throughput counters.
+    '''
+    def __init__(self, scorer, host='127.0.0.1', port=8080, maxBatchSize=256, maxLatencyMs=5, latencyWindow=10000):
+        '''
+        Function to initialize the class members
+
+        Parameter(s):
+        ------------
+        scorer: ClaimScorer
+            Scorer used to score each micro-batch.
+        host: str
+            Host on which the service listens.
+        port: int
+            Port on which the service listens (0 for any free port).
+        maxBatchSize: int
+            Maximum number of claim records in a micro-batch.
+        maxLatencyMs: float
+            Maximum time (in milliseconds) the first request of a micro-batch waits for other requests.
+        latencyWindow: int
+            Number of most recent requests used to compute the latency percentiles.
+        '''
+        self.scorer = scorer
+        self.host = host
+        self.port = port
+        self.maxBatchSize = maxBatchSize
+        self.maxLatencyMs = maxLatencyMs
+        self.latencies = deque(maxlen=latencyWindow) # Latency (in seconds) of the most recent requests.
+        self.counters = {'Requests': 0, 'Claims': 0, 'Batches': 0, 'Errors': 0}
+        self.startTime = None
+        self.queue = None
+        self.server = None
+        self.batcherTask = None
+
+    #region - Micro-batching----------------------------------------------------------------------------------------
+    #================================================================================================================
+
+    async def scoreRecords(self, records):
+        '''
+        Adds the given claim records to the next micro-batch and returns their predictions once the batch is scored.
+
+        Parameters:
+        ----------
+        records: list
+            List of claim records.
+        '''
+
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((records, future))
+
+        return await future
+
+    async def runBatcher(self):
+        '''
+        Collects the requests into micro-batches and scores each batch in a worker thread, so that the event loop keeps
+        accepting requests while a batch is scored.
+        '''
+
+        loop = asyncio.get_running_loop()
+
+        while True:
+
+            listRequests = [await self.queue.get()]
+            countRecords = len(listRequests[0][0])
+            deadline = loop.time() + self.maxLatencyMs/1000
+
+            # Wait for other requests until the deadline or until the batch is full
+            while countRecords < self.maxBatchSize:
+
+                timeout = deadline - loop.time()
+
+                if timeout <= 0:
+                    break
+
+                try:
+                    request = await asyncio.wait_for(self.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+
+                listRequests.append(request)
+                countRecords += len(request[0])
+
+            await self.scoreBatch(listRequests)
+
+    async def scoreBatch(self, listRequests):
+        '''
+        Scores the claim records of the given requests at once in a worker thread and sets the predictions of each
+        request. When the batch cannot be scored (e.g. a request has a malformed record), each request is scored
+        separately, so that only the requests which cannot be scored fail.
+
+        Parameters:
+        ----------
+        listRequests: list
+            List of the (claim records, future) of each request of the micro-batch.
+        '''
+
+        loop = asyncio.get_running_loop()
+        records = [record for requestRecords, _ in listRequests for record in requestRecords]
+
+        try:
+
+            dataResult = await loop.run_in_executor(None, self.scorer.score, records)
+
+        except Exception as error:
+
+            if len(listRequests) == 1:
+
+                self.counters['Errors'] += 1
+
+                if not listRequests[0][1].done():
+                    listRequests[0][1].set_exception(error)
+
+            else:
+
+                for request in listRequests:
+                    await self.scoreBatch([request])
+
+            return
+
+        # Split the predictions of the batch into the predictions of each request
+        listResults = dataResult.to_dict(orient='records')
+        start = 0
+
+        for requestRecords, future in listRequests:
+            if not future.done():
+                future.set_result(listResults[start:start + len(requestRecords)])
+            start += len(requestRecords)
+
+        self.counters['Batches'] += 1
+        self.counters['Claims'] += len(records)
+
+    #endregion - Micro-batching-------------------------------------------------------------------------------------
+    #================================================================================================================
+
+
+
+    #region - HTTP---------------------------------------------------------------------------------------------------
+    #================================================================================================================
+
+    def getStats(self):
+        '''
+        Returns the latency (p50/p99 in milliseconds, over the most recent requests) and throughput counters.
+        '''
+
+        latencies = np.array(self.latencies)*1000
+        elapsedTime = time.perf_counter() - self.startTime if self.startTime is not None else 0
+
+        return {
+            'Requests': self.counters['Requests'],
+            'Claims': self.counters['Claims'],
+            'Batches': self.counters['Batches'],
+            'Errors': self.counters['Errors'],
+            'MeanBatchSize': self.counters['Claims']/self.counters['Batches'] if self.counters['Batches'] else 0,
+            'LatencyP50Ms': float(np.percentile(latencies, 50)) if len(latencies) else None,
+            'LatencyP99Ms': float(np.percentile(latencies, 99)) if len(latencies) else None,
+            'ClaimsPerSecond': self.counters['Claims']/elapsedTime if elapsedTime > 0 else 0
+        }
+
+    async def handleRequest(self, method, path, body):
+        '''
+        Handles an HTTP request and returns the status code and the JSON response.
+
+        Parameters:
+        ----------
+        method: str
+            HTTP method of the request.
+        path: str
+            Path of the request.
+        body: bytes
+            Body of the request.
+        '''
+
+        if method == 'GET' and path == '/stats':
+            return 200, self.getStats()
+
+        if method != 'POST' or path != '/score':
+            return 404, {'error': 'Not found'}
+
+        startTime = time.perf_counter()
+
+        try:
+            records = json.loads(body)
+        except ValueError:
+            return 400, {'error': 'Invalid JSON'}
+
+        if isinstance(records, dict):
+            records = [records]
+
+        if not isinstance(records, list) or not all(isinstance(record, dict) for record in records):
+            return 400, {'error': 'Expected a claim record or a list of claim records'}
+
+        self.counters['Requests'] += 1
+
+        if len(records) == 0:
+            return 200, []
+
+        try:
+            results = await self.scoreRecords(records)
+        except Exception as error:
+            return 500, {'error': str(error)}
+
+        self.latencies.append(time.perf_counter() - startTime)
+
+        # Replace the missing probabilities (nan) with null
+        for result in results:
+            if pd.isnull(result['FraudProbability']):
+                result['FraudProbability'] = None
+
+        return 200, results
+
+    async def handleConnection(self, reader, writer):
+        '''
+        Reads the HTTP requests of a connection (HTTP/1.1 with keep-alive) and writes their responses.
+
+        Parameters:
+        ----------
+        reader: asyncio.StreamReader
+            Stream to read the requests.
+        writer: asyncio.StreamWriter
+            Stream to write the responses.
+        '''
+
+        try:
+
+            while True:
+
+                requestLine = await reader.readline()
+
+                if not requestLine:
+                    break
+
+                method, path, _ = requestLine.decode('latin-1').split(' ', 2)
+
+                # Read the headers
+                headers = dict()
+
+                while True:
+
+                    line = await reader.readline()
+
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                body = await reader.readexactly(int(headers.get('content-length', 0)))
+
+                status, response = await self.handleRequest(method, path, body)
+
+                payload = json.dumps(response).encode('utf-8')
+                keepAlive = headers.get('connection', '').lower() != 'close'
+
+                writer.write(('HTTP/1.1 %d %s\r\nContent-Type: application/json\r\nContent-Length: %d\r\n'
+                              'Connection: %s\r\n\r\n' % (status, 'OK' if status == 200 else 'Error', len(payload),
+                                                         'keep-alive' if keepAlive else 'close')).encode('latin-1'))
+                writer.write(payload)
+                await writer.drain()
+
+                if not keepAlive:
+                    break
+
+        except (ValueError, asyncio.IncompleteReadError, ConnectionError):
+            pass
+
+        finally:
+            writer.close()
+
+    #endregion - HTTP------------------------------------------------------------------------------------------------
+    #================================================================================================================
+
+    async def start(self):
+        '''
+        Starts the service and returns the port on which it listens.
+        '''
+
+        self.queue = asyncio.Queue()
+        self.startTime = time.perf_counter()
+        self.batcherTask = asyncio.get_running_loop().create_task(self.runBatcher())
+        self.server = await asyncio.start_server(self.handleConnection, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+        return self.port
+
+    async def stop(self):
+        '''
+        Stops the service.
+        '''
+
+        self.server.close()
+        await self.server.wait_closed()
+        self.batcherTask.cancel()
+
+    def run(self):
+        '''
+        Starts the service and serves the requests until it is interrupted.
+        '''
+
+        async def serve():
+            await self.start()
+            async with self.server:
+                await self.server.serve_forever()
+
+        asyncio.run(serve())
@@ -1,12 +1,15 @@
+import numpy as np
 from sklearn.preprocessing import StandardScaler
 from sklearn.base import BaseEstimator, TransformerMixin
+from custom_package.profiling import Profiled
+from custom_package.fold_cache import CachedFit, CachedTransform
 
 class Standardize(BaseEstimator, TransformerMixin):
     '''
     Class to do standardization of the numerical features.
     This class can be used in the sklearn's Pipeline to avoid data leakdage issues
     '''
-    def __init__(self, numericalFeatures):
+    def __init__(self, numericalFeatures, cache=None, dtype=None, copy=True):
         '''
         Function to initialize the class members
         
@@ -14,10 +17,25 @@ class Standardize(BaseEstimator, TransformerMixin):
         ------------
         numericalFeatures: list
             List of numerical features to be standardized.
+        cache: custom_package.fold_cache.FoldCache
+            Cache of the fitted StandardScaler and of the standardized datasets, so that the standardization refitted on
+            the same fold (e.g. by several RandomizedSearchCV runs) is not computed again. If None, nothing is cached.
+        dtype: numpy.dtype
+            Datatype of the standardized features (e.g. np.float64 to always standardize in double precision). If None,
+            the floating datatype of the input features, so that compacted features (e.g. float32 or int16) are not
+            upcast (int32/int64 features, which float32 cannot represent exactly, give float64).
+        copy: bool
+            Whether transform() and transformArray() work on a copy of the input dataset (True) or update the input
+            dataset in place (False).
         '''
         self.numericalFeatures = numericalFeatures # Numerical Features to be standardized.
         self.standardScaler = StandardScaler() # Object of StandardScaler.
+        self.cache = cache
+        self.dtype = dtype
+        self.copy = copy
         
+    @Profiled
+    @CachedFit
     def fit(self, X, y=None):        
         '''
         Function called on a Dataset (usually Train Dataset) to fit the train dataset.
@@ -34,6 +52,140 @@ class Standardize(BaseEstimator, TransformerMixin):
             
         return self
     
+    @Profiled
+    def partial_fit(self, X, y=None):
+        '''
+        Function called on each chunk of the train dataset, so that the standardization is fitted without having the
+        whole train dataset in memory. The running mean and variance of the numerical features are updated with the
+        chunk (as done by StandardScaler.partial_fit).
+
+        Parameters:
+        ----------
+        X: pandas.core.frame.DataFrame
+            Chunk of the dataset to be considered for standardization.
+        '''
+
+        self.standardScaler.partial_fit(X[self.numericalFeatures])
+
+        # The fitted state changed: the datasets cached for the previous state must not be used
+        self.foldCacheKey = None
+
+        return self
+
+    def merge(self, other):
+        '''
+        Function to merge the running mean and variance of another Standardize object, fitted (or partially fitted) on
+        another part of the train dataset (e.g. by another worker process), into this object. The merged mean and
+        variance are those of both parts together.
+
+        Parameters:
+        ----------
+        other: Standardize
+            Standardize object fitted on another part of the train dataset.
+        '''
+
+        scaler, otherScaler = self.standardScaler, other.standardScaler
+
+        if not hasattr(otherScaler, 'n_samples_seen_'):
+            return self
+
+        featureNames, otherFeatureNames = getattr(scaler, 'feature_names_in_', None), \
+                                          getattr(otherScaler, 'feature_names_in_', None)
+
+        if featureNames is not None and otherFeatureNames is not None and list(featureNames) != list(otherFeatureNames):
+            raise ValueError('The Standardize objects to be merged have different numerical features.')
+
+        # The fitted state changes: the datasets cached for the previous state must not be used
+        self.foldCacheKey = None
+
+        if not hasattr(scaler, 'n_samples_seen_'):
+
+            for attribute in ['n_samples_seen_', 'mean_', 'var_', 'scale_', 'n_features_in_', 'feature_names_in_']:
+                if hasattr(otherScaler, attribute):
+                    setattr(scaler, attribute, np.copy(getattr(otherScaler, attribute)))
+
+            return self
+
+        # Merge the counts, means and variances of both parts (pairwise update of Chan et al.)
+        count, otherCount = scaler.n_samples_seen_, otherScaler.n_samples_seen_
+        totalCount = count + otherCount
+        delta = otherScaler.mean_ - scaler.mean_
+
+        scaler.mean_ = scaler.mean_ + delta*otherCount/totalCount
+        scaler.var_ = (scaler.var_*count + otherScaler.var_*otherCount + delta**2*count*otherCount/totalCount)/totalCount
+        scaler.n_samples_seen_ = totalCount
+
+        # Features having a null variance are not scaled
+        scaler.scale_ = np.sqrt(scaler.var_)
+        scaler.scale_[scaler.scale_ < 10*np.finfo(scaler.scale_.dtype).eps] = 1.0
+
+        return self
+
+    def checkFeatures(self, X):
+        '''
+        Checks that the given dataset has the numerical features, and that they are the features on which the
+        StandardScaler was fitted (as done by StandardScaler.transform).
+
+        Parameters:
+        ----------
+        X: pandas.core.frame.DataFrame
+            Dataset to be standardized.
+        '''
+
+        missingFeatures = [col for col in self.numericalFeatures if col not in X.columns]
+
+        if len(missingFeatures) > 0:
+            raise KeyError('The dataset does not have the numerical features: ' + str(missingFeatures))
+
+        featureNames = getattr(self.standardScaler, 'feature_names_in_', None)
+
+        if featureNames is not None and list(featureNames) != list(self.numericalFeatures):
+            raise ValueError('The numerical features should match the features that were passed during fit.')
+
+    def getDtype(self, dtypes):
+        '''
+        Returns the datatype of the standardized features: the given 'dtype', else the floating datatype of the given
+        datatypes of the input features (float64 for non NumPy datatypes).
+
+        Parameters:
+        ----------
+        dtypes: list
+            Datatypes of the input features.
+        '''
+
+        if getattr(self, 'dtype', None) is not None:
+            return self.dtype
+
+        try:
+            dtype = np.result_type(*dtypes, np.float32)
+        except TypeError:
+            return np.float64
+
+        return dtype if dtype.kind == 'f' else np.float64
+
+    def standardizeValues(self, values, columns=None):
+        '''
+        Standardizes, in place, the given array of the numerical features (or the given columns of the array).
+
+        Parameters:
+        ----------
+        values: numpy.ndarray
+            Array having the values of the numerical features, in the order of 'numericalFeatures'.
+        columns: numpy.ndarray
+            Columns of the array having the numerical features. If None, all the columns.
+        '''
+
+        if columns is None:
+            values -= self.standardScaler.mean_.astype(values.dtype)
+            values /= self.standardScaler.scale_.astype(values.dtype)
+        else:
+            values[:, columns] = (values[:, columns] - self.standardScaler.mean_.astype(values.dtype)) / \
+                                 self.standardScaler.scale_.astype(values.dtype)
+
+        return values
+
+    @Profiled
+    @CachedTransform
     def transform(self, X, y=None):
         '''
         Function called on a Dataset (Train/Test Dataset) to standardize the data based on the Train Dataset.
@@ -46,11 +198,36 @@ class Standardize(BaseEstimator, TransformerMixin):
             Dataset to be standardized.
         '''
         
-        # Create a copy of the dataframe so that it does not modify the input dataframe
-        xStandardized = X.copy()
+        self.checkFeatures(X)
+
+        # Create a copy of the dataframe so that it does not modify the input dataframe (unless the standardization has
+        # to be done in place).
+        xStandardized = X.copy() if getattr(self, 'copy', True) else X
         
-        # Standardize the numerical features of the dataset.
-        xStandardized[self.numericalFeatures] = self.standardScaler.transform(xStandardized[self.numericalFeatures])
+        # Standardize the numerical features of the dataset, in the datatype of the output.
+        xFeatures = xStandardized[self.numericalFeatures]
+        values = xFeatures.to_numpy(dtype=self.getDtype(xFeatures.dtypes))
+        xStandardized[self.numericalFeatures] = self.standardizeValues(values)
             
         # Return the standardized dataset
-        return xStandardized
\ No newline at end of file
+        return xStandardized
+
+    @Profiled
+    def transformArray(self, X, y=None):
+        '''
+        Function to standardize the dataset and return it as a NumPy array (having the columns of the dataset in the
+        same order), to be given directly to the downstream models. When the copy is disabled and all the columns of the
+        dataset already have the datatype of the output, the array is a view of the dataset standardized in place,
+        i.e. no data is copied.
+
+        Parameters:
+        ----------
+        X: pandas.core.frame.DataFrame
+            Dataset to be standardized.
+        '''
+
+        self.checkFeatures(X)
+
+        values = X.to_numpy(dtype=self.getDtype(X.dtypes), copy=getattr(self, 'copy', True))
+
+        return self.standardizeValues(values, X.columns.get_indexer(self.numericalFeatures))
\ No newline at end of file
@@ -0,0 +1,256 @@
+import numpy as np
+import pandas as pd
+from custom_package.data_preprocessing import PreprocessData
+from custom_package.merge_datasets import ClaimEnricher
+
+# Columns of the claims data (Inpatient claims; the Outpatient claims have no 'AdmissionDt', 'DischargeDt' and
+# 'DiagnosisGroupCode'), in the same order as the concatenated Inpatient and Outpatient claims.
+CLAIM_COLUMNS = ['BeneID', 'ClaimID', 'ClaimStartDt', 'ClaimEndDt', 'Provider', 'InscClaimAmtReimbursed',
+                 'AttendingPhysician', 'OperatingPhysician', 'OtherPhysician', 'AdmissionDt', 'ClmAdmitDiagnosisCode',
+                 'DeductibleAmtPaid', 'DischargeDt', 'DiagnosisGroupCode'] + \
+                ['ClmDiagnosisCode_' + str(i) for i in range(1, 11)] + ['ClmProcedureCode_' + str(i) for i in range(1, 7)]
+
+def getClaimDtypes(columns):
+    '''
+    Returns the fixed datatypes of the given claims columns, used for the claims which do not come from a file (e.g. the
+    claims received as JSON records): the Claim Procedure Codes are float (e.g. '9904.0'), as they are when reading the
+    whole file, and the other codes are strings. A code column which pandas.read_csv infers as numeric for a whole file
+    (e.g. a Claim Diagnosis Code column having only numbers and empty values) gives other string values (e.g. '4019'
+    instead of '4019.0'), hence the claims files are read with the datatypes of InferClaimDtypes instead.
+
+    Parameters:
+    ----------
+    columns: list
+        List of the columns of the claims data.
+    '''
+
+    dictDtypes = dict() # Dictionary to store the column name as key and its datatype as value.
+
+    for col in columns:
+
+        if 'ProcedureCode' in col:
+            dictDtypes[col] = float
+        elif 'Physician' in col or 'DiagnosisCode' in col or 'DiagnosisGroupCode' in col:
+            dictDtypes[col] = object
+
+    return dictDtypes
+
+def InferClaimDtypes(claimFiles, chunkSize=500000):
+    '''
+    Returns, for each of the given claims files, the datatypes of its code columns as inferred by pandas.read_csv for
+    the whole file and kept by the concatenation of the files done by MergeDatasets, so that the chunks read with these
+    datatypes have the same values (and the same features) as the whole merged dataset. The code columns are read in
+    chunks, with the datatype inferred for each chunk: a column is read as strings when a chunk has a text value, as
+    float when a chunk has an empty value (or when another file does not have it or has it as float) and as int
+    otherwise.
+
+    Parameters:
+    ----------
+    claimFiles: list
+        List of the paths of the claims CSV files.
+    chunkSize: int
+        Number of rows to be read at a time.
+    '''
+
+    listDtypes = list() # List to store the dictionary of the datatype of each code column of each file.
+
+    for claimFile in claimFiles:
+
+        codeColumns = list(getClaimDtypes(pd.read_csv(claimFile, nrows=0).columns))
+        dictDtypes = {col: np.dtype(np.int64) for col in codeColumns}
+
+        if len(codeColumns) > 0:
+
+            for chunk in pd.read_csv(claimFile, usecols=codeColumns, chunksize=chunkSize):
+
+                for col in codeColumns:
+
+                    if chunk[col].dtype == object or dictDtypes[col] == object:
+                        dictDtypes[col] = np.dtype(object)
+                    elif chunk[col].dtype.kind == 'f' or dictDtypes[col].kind == 'f':
+                        dictDtypes[col] = np.dtype(np.float64)
+
+        listDtypes.append(dictDtypes)
+
+    # The integer columns become float when they are concatenated with the empty (or float) columns of another file
+    for dictDtypes in listDtypes:
+
+        for col, dtype in dictDtypes.items():
+
+            if dtype.kind == 'i' and any(otherDtypes.get(col, np.dtype(np.float64)).kind == 'f'
+                                         for otherDtypes in listDtypes):
+                dictDtypes[col] = np.dtype(np.float64)
+
+    return listDtypes
+
+def getClaimColumns(claimFiles):
+    '''
+    Returns the union of the columns of the given claims files (e.g. Inpatient and Outpatient claims), in the same order
+    as the columns of their concatenated DataFrame.
+
+    Parameters:
+    ----------
+    claimFiles: list
+        List of the paths of the claims CSV files.
+    '''
+
+    listColumns = list() # List to store the union of the columns of all the files.
+
+    for claimFile in claimFiles:
+
+        for col in pd.read_csv(claimFile, nrows=0).columns:
+
+            if col not in listColumns:
+                listColumns.append(col)
+
+    return listColumns
+
+def FindMaxDate(claimFiles, chunkSize=500000):
+    '''
+    Finds the maximum Claim End Date or Discharge Date of the given claims files, by reading only these two columns in
+    chunks. The result is used as the 'maxDate' of PreprocessData, so that the 'Age' feature does not depend on the chunk.
+
+    Parameters:
+    ----------
+    claimFiles: list
+        List of the paths of the claims CSV files.
+    chunkSize: int
+        Number of rows to be read at a time.
+    '''
+
+    maxDate = pd.NaT
+
+    for claimFile in claimFiles:
+
+        for chunk in pd.read_csv(claimFile, usecols=lambda col: col in ['ClaimEndDt', 'DischargeDt'],
+                                 chunksize=chunkSize):
+
+            for col in chunk.columns:
+
+                chunkMaxDate = pd.to_datetime(chunk[col]).max()
+
+                if pd.notnull(chunkMaxDate) and (pd.isnull(maxDate) or chunkMaxDate > maxDate):
+                    maxDate = chunkMaxDate
+
+    return maxDate
+
+def CoerceClaimDtypes(dataClaims):
+    '''
+    Converts, in place, the code columns of the given claims data to the fixed datatypes of getClaimDtypes, e.g. for
+    the claims received as JSON records where a code can be a number or a string.
+
+    Parameters:
+    ----------
+    dataClaims: pandas.core.frame.DataFrame
+        DataFrame containing the claims data.
+    '''
+
+    for col, dtype in getClaimDtypes(dataClaims.columns).items():
+
+        if dtype == float:
+            dataClaims[col] = pd.to_numeric(dataClaims[col], errors='coerce')
+        else:
+            dataClaims[col] = dataClaims[col].map(lambda value: str(value) if pd.notnull(value) else np.nan)
+
+    return dataClaims
+
+def StreamMergedClaims(dataProvider, dataBeneficiary, claimFiles, chunkSize=100000):
+    '''
+    Reads the given claims files in chunks and yields each chunk combined with the Beneficiary data and the Provider
+    data, as MergeDatasets does for the whole dataset. The Beneficiary and Provider rows are looked up by a ClaimEnricher,
+    whose indexes on 'BeneID' and 'Provider' are built once. As with MergeDatasets, claims without a matching
+    Beneficiary or Provider are left out. The code columns are read with the datatypes of InferClaimDtypes (found by a
+    first pass reading only the code columns), so that the chunks have the same values as the whole merged dataset.
+
+    Parameters:
+    ----------
+    dataProvider: pandas.core.frame.DataFrame
+        DataFrame containing the Provider Unique Identifier.
+    dataBeneficiary: pandas.core.frame.DataFrame
+        DataFrame containing the Beneficiary related data.
+    claimFiles: list
+        List of the paths of the claims CSV files (e.g. Inpatient and Outpatient claims).
+    chunkSize: int
+        Number of claims to be read at a time.
+    '''
+
+    # Columns of the claims data. All the chunks are aligned to these columns (the Outpatient claims have no Admission
+    # Date, Discharge Date and Diagnosis Group Code).
+    claimColumns = getClaimColumns(claimFiles)
+
+    # Build the indexes of the Beneficiary and Provider data
+    claimEnricher = ClaimEnricher(dataProvider, dataBeneficiary)
+
+    for claimFile, claimDtypes in zip(claimFiles, InferClaimDtypes(claimFiles)):
+
+        for chunk in pd.read_csv(claimFile, dtype=claimDtypes, chunksize=chunkSize):
+
+            yield claimEnricher.enrich(chunk, claimColumns)
+
+def ScoreClaimsInChunks(dataProvider, dataBeneficiary, claimFiles, model=None, maxDate=None, featureColumns=None,
+                        chunkSize=100000, preprocessor=None):
+    '''
+    Scores the claims of the given claims files chunk by chunk, so that the memory used is bounded by the size of a
+    chunk (plus the Beneficiary and Provider data). Each chunk is merged with the Beneficiary and Provider data,
+    preprocessed with PreprocessData and scored with the model. Yields a DataFrame for each chunk with the Claim ID,
+    the Provider, the predicted 'PotentialFraud' ('Yes'/'No') and its probability.
+
+    Parameters:
+    ----------
+    dataProvider: pandas.core.frame.DataFrame
+        DataFrame containing the Provider Unique Identifier.
+    dataBeneficiary: pandas.core.frame.DataFrame
+        DataFrame containing the Beneficiary related data.
+    claimFiles: list
+        List of the paths of the claims CSV files (e.g. Inpatient and Outpatient claims).
+    model: object
+        Trained model (or Pipeline) having 'predict_proba'. If None, the preprocessed chunks are yielded, along with the
+        Claim ID and the Provider, without scoring.
+    maxDate: pandas.Timestamp
+        Maximum Claim End Date or Discharge Date. If None, it is found by a first pass over the claims files which
+        reads only the date columns.
+    featureColumns: list
+        Features expected by the model, in order. The features missing from a chunk are filled with 0 and the other
+        features are removed. If None, all the features generated by PreprocessData are kept.
+    chunkSize: int
+        Number of claims to be processed at a time.
+    preprocessor: custom_package.data_preprocessing.DataPreprocessor
+        Fitted DataPreprocessor to be used instead of PreprocessData. Its frozen features and maximum date are used, and
+        'maxDate' and 'featureColumns' are ignored.
+    '''
+
+    if maxDate is None and preprocessor is None:
+        maxDate = FindMaxDate(claimFiles)
+
+    for chunk in StreamMergedClaims(dataProvider, dataBeneficiary, claimFiles, chunkSize):
+
+        # Fetch the Claim Id and Provider Id from the chunk
+        identifierData = chunk[['ClaimID', 'Provider']]
+
+        if preprocessor is not None:
+
+            data = preprocessor.transform(chunk)
+
+        else:
+
+            # Preprocess the chunk, keeping the empty columns so that all the chunks have the same features.
+            data = PreprocessData(chunk, maxDate=pd.Timestamp(maxDate), dropEmptyColumns=False)
+
+            if 'PotentialFraud' in data.columns:
+                data.drop(columns='PotentialFraud', inplace=True)
+
+            if featureColumns is not None:
+                data = data.reindex(columns=featureColumns, fill_value=0)
+
+        if model is None:
+
+            yield pd.concat([identifierData, data], axis=1)
+
+        else:
+
+            # Probability of the claim being fraudulent
+            predProb = model.predict_proba(data)[:, 1]
+
+            yield pd.DataFrame({'ClaimID': identifierData['ClaimID'], 'Provider': identifierData['Provider'],
+                                'PotentialFraud': np.where(predProb >= 0.5, 'Yes', 'No'),
+                                'FraudProbability': predProb})
@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+import pytest
+from benchmarks.synthetic import GenerateDatasets
+from custom_package.code_sketch import HeavyHitterSketch, SketchTopCodes
+from custom_package.data_preprocessing import DataPreprocessor, PreprocessData, getTopCodeLists
+from custom_package.merge_datasets import MergeDatasets
+
+def getStream(countValues=50000, randomState=0):
+    '''
+    Returns a stream of codes (Zipf distributed, with missing values) as a list of chunks.
+    '''
+
+    rng = np.random.default_rng(randomState)
+    values = rng.zipf(1.3, size=countValues).astype(np.float64)
+    values[values > 5000] = np.nan
+
+    return [pd.Series(chunk) for chunk in np.array_split(values, 13)]
+
+def getTrueCounts(listChunks):
+    '''
+    Returns the true count of each code of the given chunks (index: string value of the code).
+    '''
+
+    values = pd.concat(listChunks).dropna()
+
+    return values.map(str).value_counts()
+
+def test_estimated_counts_are_within_the_max_error():
+
+    listChunks = getStream()
+    trueCounts = getTrueCounts(listChunks)
+
+    sketch = HeavyHitterSketch(capacity=20)
+
+    for chunk in listChunks:
+        sketch.update(chunk)
+
+    estimates = sketch.counts.reindex(trueCounts.index, fill_value=0)
+
+    assert sketch.counts.shape[0] <= 20
+    assert sketch.countValues == trueCounts.sum()
+    assert 0 < sketch.maxError <= sketch.countValues/21
+    assert np.all(estimates <= trueCounts)
+    assert np.all(estimates >= trueCounts - sketch.maxError)
+
+    # The codes more frequent than the max error are kept
+    assert set(trueCounts.index[trueCounts > sketch.maxError]) <= set(sketch.counts.index)
+
+@pytest.mark.parametrize('capacity', [20, 100000])
+def test_merged_sketches_equal_a_single_stream(capacity):
+
+    listChunks = getStream()
+    trueCounts = getTrueCounts(listChunks)
+
+    single = HeavyHitterSketch(capacity)
+
+    for chunk in listChunks:
+        single.update(chunk)
+
+    # Sketches of two workers (each having every other chunk), merged
+    listSketches = [HeavyHitterSketch(capacity), HeavyHitterSketch(capacity)]
+
+    for i, chunk in enumerate(listChunks):
+        listSketches[i % 2].update(chunk)
+
+    merged = listSketches[0].merge(listSketches[1])
+    estimates = merged.counts.reindex(trueCounts.index, fill_value=0)
+
+    assert merged.countValues == single.countValues
+    assert merged.getTop(5) == single.getTop(5) == trueCounts.index[:5].tolist()
+    assert np.all(estimates <= trueCounts)
+    assert np.all(estimates >= trueCounts - merged.maxError)
+    assert merged.maxError <= merged.countValues/(capacity + 1)
+
+    # Without pruning, the counts are the true counts
+    if capacity >= trueCounts.shape[0]:
+        assert merged.maxError == single.maxError == 0
+        pd.testing.assert_series_equal(merged.counts.sort_index(), trueCounts.sort_index(), check_names=False)
+        pd.testing.assert_series_equal(merged.counts.sort_index(), single.counts.sort_index())
+
+def test_sketched_top_codes_give_the_features_of_preprocess_data():
+
+    data = MergeDatasets(*GenerateDatasets(3000))
+
+    preprocessor = DataPreprocessor(topCodes='sketch').fit(data)
+    expected = PreprocessData(data.copy(), maxDate=preprocessor.maxDate_,
+                              topCodes=preprocessor.topCodes_).drop(columns='PotentialFraud')
+    actual = preprocessor.transform(data)
+
+    # The top codes of the generated claims are not all the codes found by the EDA
+    assert preprocessor.topCodes_['ProcedureCodes'] != getTopCodeLists()[2]
+    assert preprocessor.topCodes_ == SketchTopCodes(np.array_split(data, 4)).getTopCodes()
+    assert list(actual.columns) == list(expected.columns)
+    np.testing.assert_allclose(actual.to_numpy(dtype=np.float64), expected.to_numpy(dtype=np.float64), rtol=1e-6)
@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.calibration import CalibratedClassifierCV
+from sklearn.ensemble import GradientBoostingClassifier, RandomForestClassifier
+from sklearn.pipeline import Pipeline
+from sklearn.tree import DecisionTreeClassifier
+from custom_package.compiled_model import CompileModel, parseBaseScore
+from custom_package.standardize import Standardize
+
+FEATURES = ['Age', 'TotalClaimAmount', 'PhysRoleCount', 'ChronicCond_Diabetes']
+
+def getDataset(countDatapoints=600, randomState=0):
+    '''
+    Returns a dataset (with empty values) and its class labels.
+    '''
+
+    rng = np.random.default_rng(randomState)
+    X = pd.DataFrame(rng.normal(size=(countDatapoints, len(FEATURES))), columns=FEATURES)
+    y = (X['Age'] + 0.5*X['TotalClaimAmount'] + rng.normal(scale=0.5, size=countDatapoints) > 0).astype(int)
+    X.loc[rng.random(countDatapoints) < 0.05, 'PhysRoleCount'] = np.nan
+
+    return X, y
+
+@pytest.mark.parametrize('model', [
+    DecisionTreeClassifier(max_depth=6, random_state=0),
+    RandomForestClassifier(n_estimators=20, max_depth=5, random_state=0),
+    GradientBoostingClassifier(n_estimators=30, max_depth=3, random_state=0),
+    CalibratedClassifierCV(GradientBoostingClassifier(n_estimators=20, random_state=0), method='sigmoid', cv=3),
+    CalibratedClassifierCV(RandomForestClassifier(n_estimators=10, random_state=0), method='isotonic', cv=3)])
+def test_same_probabilities_as_model(model):
+
+    X, y = getDataset()
+    X = X.fillna(0) if not isinstance(model, DecisionTreeClassifier) else X
+    model.fit(X, y)
+
+    np.testing.assert_allclose(CompileModel(model).predict_proba(X), model.predict_proba(X), atol=1e-6)
+    np.testing.assert_array_equal(CompileModel(model).predict(X), model.predict(X))
+
+@pytest.mark.parametrize('case', ['classifier', 'calibrated', 'early-stopping'])
+def test_same_probabilities_as_xgboost(case):
+
+    xgb = pytest.importorskip('xgboost')
+
+    # The empty values are kept: XGBoost sends them in the default direction of each split
+    X, y = getDataset(1000)
+
+    if case == 'classifier':
+        model = xgb.XGBClassifier(n_estimators=40, max_depth=4, base_score=0.3).fit(X, y)
+    elif case == 'calibrated':
+        model = CalibratedClassifierCV(xgb.XGBClassifier(n_estimators=20, max_depth=3), method='sigmoid', cv=3)
+        model.fit(X, y)
+    else:
+        model = xgb.XGBClassifier(n_estimators=300, max_depth=3, learning_rate=0.3, early_stopping_rounds=5)
+        model.fit(X.iloc[:700], y.iloc[:700], eval_set=[(X.iloc[700:], y.iloc[700:])], verbose=False)
+
+        # The trees after the best iteration are not used for the predictions
+        assert model.best_iteration + 1 < model.get_booster().num_boosted_rounds()
+
+    np.testing.assert_allclose(CompileModel(model).predict_proba(X), model.predict_proba(X), atol=1e-6)
+    np.testing.assert_array_equal(CompileModel(model).predict(X), model.predict(X))
+
+def test_same_probabilities_as_pipeline():
+
+    X, y = getDataset()
+    X = X.fillna(0)
+    pipeline = Pipeline([('std', Standardize(FEATURES)),
+                         ('model', GradientBoostingClassifier(n_estimators=20, random_state=0))]).fit(X, y)
+
+    np.testing.assert_allclose(CompileModel(pipeline).predict_proba(X), pipeline.predict_proba(X), atol=1e-6)
+
+@pytest.mark.parametrize('value, expected', [('5E-1', 0.5), ('0.5', 0.5), ('[3.8853887E-1]', 0.38853887),
+                                             ('[5E-1,2.5E-1]', 0.5), (0.25, 0.25)])
+def test_parse_base_score(value, expected):
+
+    assert parseBaseScore(value) == pytest.approx(expected)
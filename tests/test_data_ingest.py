@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+from custom_package.data_ingest import IngestDataset, ParseDataset
+
+def writeClaims(path):
+    '''
+    Writes a small claims CSV file whose code columns are inferred as strings, float (numbers with empty values) and
+    int (numbers only) by pandas.read_csv.
+    '''
+
+    pd.DataFrame({'BeneID': ['BENE1', 'BENE2', 'BENE3'], 'ClaimID': ['CLM1', 'CLM2', 'CLM3'],
+                  'ClaimStartDt': ['2009-01-01', '2009-02-01', '2009-03-01'],
+                  'AttendingPhysician': ['PHY1', np.nan, 'PHY2'],
+                  'ClmDiagnosisCode_1': ['4019', 'V5869', np.nan],
+                  'ClmDiagnosisCode_9': [4019, np.nan, 2724],
+                  'DiagnosisGroupCode': [882, 945, 882],
+                  'ClmProcedureCode_1': [9904.0, np.nan, np.nan]}).to_csv(path, index=False)
+
+def assertSameValues(data, expected):
+    '''
+    Checks that the parsed dataset has the values (and their string values) of the dataset read by pandas.read_csv.
+    '''
+
+    for col in ['AttendingPhysician', 'ClmDiagnosisCode_1', 'ClmDiagnosisCode_9', 'DiagnosisGroupCode']:
+
+        assert isinstance(data[col].dtype, pd.CategoricalDtype)
+        assert [str(value) for value in np.asarray(data[col], dtype=object)] == \
+               [str(value) for value in np.asarray(expected[col], dtype=object)]
+
+    np.testing.assert_array_equal(data['ClmProcedureCode_1'], expected['ClmProcedureCode_1'])
+    assert data['ClaimStartDt'].tolist() == pd.to_datetime(expected['ClaimStartDt']).tolist()
+
+def test_codes_keep_the_inferred_datatypes(tmp_path):
+
+    claimFile = str(tmp_path / 'claims.csv')
+    writeClaims(claimFile)
+    expected = pd.read_csv(claimFile)
+
+    assertSameValues(ParseDataset(claimFile), expected)
+    assert ParseDataset(claimFile)['ClmDiagnosisCode_9'].cat.categories.dtype == np.float64
+
+def test_cached_dataset_is_the_parsed_dataset(tmp_path):
+
+    claimFile = str(tmp_path / 'claims.csv')
+    writeClaims(claimFile)
+    expected = pd.read_csv(claimFile)
+
+    for _ in range(2):
+        assertSameValues(IngestDataset(claimFile, cacheDir=str(tmp_path / 'Cache')), expected)
@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+import pytest
+from benchmarks.synthetic import GenerateDatasets
+from custom_package.data_preprocessing import DataPreprocessor, PreprocessData
+from custom_package.merge_datasets import MergeDatasets
+
+@pytest.fixture(scope='module')
+def datasets():
+    return GenerateDatasets(3000)
+
+def test_max_date_of_outpatient_claims(datasets):
+
+    dataProvider, dataBeneficiary, _, dataOutpatient = datasets
+    data = MergeDatasets(dataProvider, dataBeneficiary, dataOutpatient.iloc[:0], dataOutpatient)
+    maxDate = pd.to_datetime(data['ClaimEndDt']).max()
+
+    # Outpatient claims without the Discharge Date, or having only empty Discharge Dates
+    assert 'DischargeDt' not in data.columns
+    assert DataPreprocessor().fit(data).maxDate_ == maxDate
+    assert DataPreprocessor().fit(data.assign(DischargeDt=np.nan)).maxDate_ == maxDate
+
+def test_max_date_without_dates(datasets):
+
+    dataProvider, dataBeneficiary, dataInpatient, dataOutpatient = datasets
+    data = MergeDatasets(dataProvider, dataBeneficiary, dataInpatient, dataOutpatient)
+    data[['ClaimEndDt', 'DischargeDt']] = np.nan
+
+    with pytest.raises(ValueError, match='maxDate'):
+        DataPreprocessor().fit(data)
+
+    with pytest.raises(ValueError, match='maxDate'):
+        DataPreprocessor().fit(data.drop(columns=['ClaimEndDt', 'DischargeDt']))
+
+    assert DataPreprocessor(maxDate='2009-12-31').fit(data).maxDate_ == pd.Timestamp('2009-12-31')
+
+def test_same_features_as_preprocess_data(datasets):
+
+    data = MergeDatasets(*datasets)
+    maxDate = max(pd.to_datetime(data['ClaimEndDt']).max(), pd.to_datetime(data['DischargeDt']).max())
+
+    expected = PreprocessData(data.copy(), maxDate=maxDate).drop(columns='PotentialFraud')
+    actual = DataPreprocessor().fit(data).transform(data)
+
+    assert list(actual.columns) == list(expected.columns)
+    np.testing.assert_allclose(actual.to_numpy(dtype=np.float64), expected.to_numpy(dtype=np.float64), rtol=1e-6)
@@ -0,0 +1,107 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.calibration import CalibratedClassifierCV
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+from sklearn.tree import DecisionTreeClassifier
+from custom_package.explanations import BatchExplainer
+from custom_package.response_encoder import ResponseEncoder
+from custom_package.standardize import Standardize
+
+FEATURES = ['Age', 'TotalClaimAmount', 'PhysRoleCount', 'State']
+
+def getDataset(countDatapoints=400, randomState=0):
+    '''
+    Returns a dataset (with a categorical 'State' feature) and its class labels.
+    '''
+
+    rng = np.random.default_rng(randomState)
+    X = pd.DataFrame(rng.normal(size=(countDatapoints, len(FEATURES) - 1)), columns=FEATURES[:-1])
+    X['State'] = rng.integers(0, 5, size=countDatapoints)
+    y = (X['Age'] + 0.5*X['TotalClaimAmount'] + 0.3*X['State'] + rng.normal(scale=0.5, size=countDatapoints) > 0.6)
+
+    return X, y.astype(int)
+
+def getPipeline(model):
+    '''
+    Returns a Pipeline featurizing the claims as in the Modelling notebook, followed by the given Model.
+    '''
+
+    return Pipeline([('std', Standardize(['Age', 'TotalClaimAmount'])),
+                     ('re', ResponseEncoder(['State'], 'PotentialFraud')), ('model', model)])
+
+@pytest.mark.parametrize('model', [DecisionTreeClassifier(max_depth=5, random_state=0),
+                                   RandomForestClassifier(n_estimators=15, max_depth=4, random_state=0)])
+def test_tree_contributions_sum_to_probability(model):
+
+    X, y = getDataset()
+    pipeline = getPipeline(model).fit(X, y)
+    explainer = BatchExplainer(pipeline)
+
+    dataExplanations = explainer.explain(X)
+
+    assert explainer.kind == 'sklearn-tree-path'
+    featureNames = [col for col in dataExplanations.columns if col not in ['BaseValue', 'Output']]
+    np.testing.assert_allclose(dataExplanations[featureNames].sum(axis=1) + dataExplanations['BaseValue'],
+                               pipeline.predict_proba(X)[:, 1], atol=1e-5)
+    np.testing.assert_allclose(dataExplanations['Output'], pipeline.predict_proba(X)[:, 1], atol=1e-5)
+
+def test_xgboost_contributions_sum_to_margin():
+
+    xgb = pytest.importorskip('xgboost')
+
+    X, y = getDataset()
+    pipeline = getPipeline(xgb.XGBClassifier(n_estimators=30, max_depth=3)).fit(X, y)
+    explainer = BatchExplainer(pipeline)
+
+    dataExplanations = explainer.explain(X)
+
+    assert explainer.kind == 'xgboost'
+    margin = pipeline[-1].predict(pipeline[:-1].transform(X), output_margin=True)
+    np.testing.assert_allclose(dataExplanations['Output'], margin, atol=1e-4)
+
+def test_empty_batch_gives_empty_explanations():
+
+    X, y = getDataset()
+    pipeline = getPipeline(RandomForestClassifier(n_estimators=5, random_state=0)).fit(X, y)
+
+    dataExplanations = BatchExplainer(pipeline).explain(X.iloc[:0])
+
+    assert dataExplanations.shape[0] == 0
+    assert list(dataExplanations.columns) == ['Age', 'TotalClaimAmount', 'PhysRoleCount', 'State_0', 'State_1',
+                                              'BaseValue', 'Output']
+
+def test_cached_explanations_are_reused_in_order():
+
+    X, y = getDataset()
+    explainer = BatchExplainer(getPipeline(RandomForestClassifier(n_estimators=5, random_state=0)).fit(X, y))
+
+    dataFirst = explainer.explain(X.iloc[:50])
+    dataSecond = explainer.explain(X.iloc[50:0:-1])
+
+    assert explainer.hits == 49
+    pd.testing.assert_frame_equal(dataSecond.loc[dataFirst.index[1:]], dataFirst.iloc[1:])
+
+def test_calibrated_tree_model_is_rejected():
+
+    X, y = getDataset()
+    model = CalibratedClassifierCV(RandomForestClassifier(n_estimators=5, random_state=0), cv=3)
+
+    with pytest.raises(ValueError, match='CalibratedClassifierCV'):
+        BatchExplainer(getPipeline(model).fit(X, y))
+
+def test_other_models_are_explained_by_perturbation():
+
+    X, y = getDataset()
+    pipeline = getPipeline(CalibratedClassifierCV(LogisticRegression(), cv=3)).fit(X, y)
+
+    with pytest.raises(ValueError, match='backgroundData'):
+        BatchExplainer(pipeline)
+
+    explainer = BatchExplainer(pipeline, backgroundData=X, countBackground=20)
+    dataExplanations = explainer.explain(X.iloc[:30])
+
+    assert explainer.kind == 'perturbation'
+    assert dataExplanations.shape == (30, 7)
@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+import pytest
+from benchmarks.reference import getLegacyFeatures
+from custom_package.feature_kernels import ComputeAge, ComputeIsNotNull, ComputePhysicianCounts, \
+    ComputeIsSamePhysMultiRole
+
+COL_PHYS = ['AttendingPhysician', 'OperatingPhysician', 'OtherPhysician']
+MAX_DATE = pd.Timestamp('2009-12-31')
+
+def getDataset(countDatapoints=2000, randomState=0):
+    '''
+    Returns a dataset having the 'DOB', 'DOD', Physician and Claim Diagnosis Code features, with empty values, repeated
+    Physicians and the edge cases of the rounding of the Age.
+    '''
+
+    rng = np.random.default_rng(randomState)
+
+    data = pd.DataFrame({'DOB': pd.Timestamp('1909-01-01') + pd.to_timedelta(rng.integers(0, 30000, countDatapoints),
+                                                                               unit='D')})
+    data['DOD'] = MAX_DATE - pd.to_timedelta(rng.integers(0, 3000, countDatapoints), unit='D')
+    data.loc[rng.random(countDatapoints) < 0.9, 'DOD'] = pd.NaT
+
+    # Ages of exactly half a year (rounded half to even) and of a single day
+    data.loc[0, ['DOB', 'DOD']] = [pd.Timestamp('2000-01-01'), pd.Timestamp('2000-01-01') + pd.Timedelta(days=182)]
+    data.loc[1, ['DOB', 'DOD']] = [pd.Timestamp('2000-01-01'), pd.Timestamp('2000-01-01') + pd.Timedelta(days=547)]
+    data.loc[2, ['DOB', 'DOD']] = [pd.Timestamp('2000-01-01'), pd.Timestamp('2000-01-01') + pd.Timedelta(days=912)]
+    data.loc[3, ['DOB', 'DOD']] = [MAX_DATE - pd.Timedelta(days=1), pd.NaT]
+
+    physicians = np.array(['PHY%d' % i for i in range(20)] + [np.nan]*10, dtype=object)
+
+    for col in COL_PHYS:
+        data[col] = rng.choice(physicians, countDatapoints)
+
+    # Datapoints having no Physician, the same Physician in all the roles and the same Physician in two roles
+    data.loc[4, COL_PHYS] = np.nan
+    data.loc[5, COL_PHYS] = 'PHY1'
+    data.loc[6, COL_PHYS] = ['PHY1', np.nan, 'PHY1']
+    data.loc[7, COL_PHYS] = ['PHY1', 'PHY2', 'PHY1']
+
+    data['ClmDiagnosisCode_1'] = rng.choice(np.array(['4019', '2724', 'V5869', np.nan], dtype=object), countDatapoints)
+
+    return data
+
+@pytest.fixture(scope='module')
+def dataset():
+    return getDataset()
+
+@pytest.fixture(scope='module')
+def legacyFeatures(dataset):
+    return {name: np.asarray(compute()) for name, compute in getLegacyFeatures(dataset, COL_PHYS, MAX_DATE).items()}
+
+def test_age(dataset, legacyFeatures):
+
+    np.testing.assert_array_equal(ComputeAge(dataset['DOB'], dataset['DOD'], MAX_DATE), legacyFeatures['Age'])
+
+def test_age_rounds_half_to_even():
+
+    dob = pd.Series(pd.to_datetime(['2000-01-01']*3))
+    dod = dob + pd.to_timedelta([182, 547, 912], unit='D')
+
+    np.testing.assert_array_equal(ComputeAge(dob, dod, MAX_DATE), [round(182/365), round(547/365), round(912/365)])
+
+@pytest.mark.parametrize('feature, legacyFeature', [('DOD', 'IsDead'), ('ClmDiagnosisCode_1', 'ClmDiagnosisCode_1')])
+def test_is_not_null(dataset, legacyFeatures, feature, legacyFeature):
+
+    np.testing.assert_array_equal(ComputeIsNotNull(dataset[feature]), legacyFeatures[legacyFeature])
+    np.testing.assert_array_equal(ComputeIsNotNull(dataset[feature].astype('category')), legacyFeatures[legacyFeature])
+
+@pytest.mark.parametrize('asCategory', [False, True])
+def test_physician_counts(dataset, legacyFeatures, asCategory):
+
+    data = dataset.astype({col: 'category' for col in COL_PHYS}) if asCategory else dataset
+    uniquePhysCount, physRoleCount = ComputePhysicianCounts(data, COL_PHYS)
+
+    np.testing.assert_array_equal(uniquePhysCount, legacyFeatures['UniquePhysCount'])
+    np.testing.assert_array_equal(physRoleCount, legacyFeatures['PhysRoleCount'])
+    np.testing.assert_array_equal(uniquePhysCount[4:8], [0, 1, 1, 2])
+    np.testing.assert_array_equal(physRoleCount[4:8], [0, 3, 2, 3])
+
+def test_physician_counts_without_physician_features(dataset):
+
+    uniquePhysCount, physRoleCount = ComputePhysicianCounts(dataset, [])
+
+    assert uniquePhysCount.shape == physRoleCount.shape == (dataset.shape[0],)
+    assert not uniquePhysCount.any() and not physRoleCount.any()
+
+@pytest.mark.parametrize('countUnique', [1, 2])
+def test_is_same_phys_multi_role(dataset, legacyFeatures, countUnique):
+
+    uniquePhysCount, physRoleCount = ComputePhysicianCounts(dataset, COL_PHYS)
+
+    np.testing.assert_array_equal(ComputeIsSamePhysMultiRole(uniquePhysCount, physRoleCount, countUnique),
+                                  legacyFeatures['IsSamePhysMultiRole%d' % countUnique])
@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+from custom_package.fold_cache import FoldCache, GetFingerprint
+
+def getDataset(countDatapoints=100, randomState=0):
+    '''
+    Returns a dataset having numerical, text, categorical and date features.
+    '''
+
+    rng = np.random.default_rng(randomState)
+
+    return pd.DataFrame({'Amount': rng.normal(size=countDatapoints), 'Count': rng.integers(0, 10, countDatapoints),
+                         'State': rng.choice(['A', 'B', None], countDatapoints),
+                         'Gender': pd.Categorical(rng.choice(['F', 'M'], countDatapoints)),
+                         'ClaimStartDt': pd.Timestamp('2009-01-01') +
+                                         pd.to_timedelta(rng.integers(0, 365, countDatapoints), unit='D')})
+
+def test_same_content_gives_same_fingerprint():
+
+    X = getDataset()
+
+    assert GetFingerprint(X, 'fit', 1) == GetFingerprint(X.copy(), 'fit', 1)
+    assert GetFingerprint(X.to_numpy()) == GetFingerprint(X.to_numpy())
+
+def test_other_content_gives_other_fingerprint():
+
+    X = getDataset()
+    fingerprint = GetFingerprint(X)
+
+    listOthers = [X.rename(columns={'Amount': 'Other'}), X.set_axis(X.index + 1), X.astype({'Count': np.int32}),
+                  X.iloc[:-1], X[list(reversed(X.columns))]]
+
+    for col in X.columns:
+        xOther = X.copy()
+        xOther.loc[5, col] = X.loc[X[col].astype(str) != str(X.loc[5, col]), col].iloc[0]
+        listOthers.append(xOther)
+
+    # Values moved between positions (sums of the values unchanged)
+    xSwapped = X.copy()
+    xSwapped.loc[[1, 2], 'Count'] = [X.loc[1, 'Count'] + 1, X.loc[2, 'Count'] - 1]
+    listOthers.append(xSwapped)
+
+    fingerprints = [GetFingerprint(xOther) for xOther in listOthers]
+
+    assert fingerprint not in fingerprints
+    assert len(set(fingerprints)) == len(fingerprints)
+
+def test_array_shape_and_dtype_are_hashed():
+
+    values = np.arange(12, dtype=np.int64)
+
+    fingerprints = {GetFingerprint(values), GetFingerprint(values.reshape(3, 4)), GetFingerprint(values.reshape(4, 3)),
+                    GetFingerprint(values.view(np.float64)), GetFingerprint(values.astype(np.int32))}
+
+    assert len(fingerprints) == 5
+
+def test_fold_cache_round_trip(tmp_path):
+
+    foldCache = FoldCache(str(tmp_path))
+    X = getDataset()
+    key = GetFingerprint(X)
+
+    assert foldCache.get(key) is None
+
+    foldCache.put(key, X)
+
+    pd.testing.assert_frame_equal(foldCache.get(key), X)
+    assert (foldCache.hits, foldCache.misses) == (1, 1)
@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+import pytest
+from benchmarks.synthetic import GenerateDatasets
+from custom_package import merge_datasets
+from custom_package.merge_datasets import ClaimEnricher, MergeDatasets
+
+@pytest.fixture(scope='module')
+def datasets():
+
+    dataProvider, dataBeneficiary, dataInpatient, dataOutpatient = GenerateDatasets(3000)
+
+    # Claims whose Beneficiary or Provider is unknown are left out
+    dataOutpatient.loc[dataOutpatient.index[:20], 'BeneID'] = 'BENE0'
+    dataInpatient.loc[dataInpatient.index[:5], 'Provider'] = 'PRV0'
+
+    return dataProvider, dataBeneficiary, dataInpatient, dataOutpatient
+
+def mergeWithPandas(dataProvider, dataBeneficiary, dataInpatient, dataOutpatient):
+    '''
+    Returns the datasets combined with pd.merge, as MergeDatasets does when the Beneficiaries or the Providers are not
+    unique.
+    '''
+
+    return pd.merge(pd.merge(pd.concat([dataInpatient, dataOutpatient]), dataBeneficiary, on='BeneID'), dataProvider,
+                    on='Provider')
+
+def test_same_rows_in_the_same_order_as_merge(datasets):
+
+    # Order of pd.merge with the installed version of pandas
+    expected = mergeWithPandas(*datasets)
+    actual = MergeDatasets(*datasets)
+
+    assert actual.shape[0] == datasets[2].shape[0] + datasets[3].shape[0] - 25
+    np.testing.assert_array_equal(actual['ClaimID'], expected['ClaimID'])
+    pd.testing.assert_frame_equal(actual, expected, check_dtype=False)
+
+@pytest.mark.parametrize('groupsKeys', [True, False])
+def test_merge_order_of_each_pandas_version(datasets, monkeypatch, groupsKeys):
+
+    dataProvider, dataBeneficiary, dataInpatient, dataOutpatient = datasets
+    dataClaims = pd.concat([dataInpatient, dataOutpatient], ignore_index=True)
+
+    monkeypatch.setattr(merge_datasets, 'MERGE_GROUPS_KEYS', groupsKeys)
+    dataMerged = MergeDatasets(*datasets)
+
+    if groupsKeys:
+
+        # Grouped by Beneficiary by the first merge, then by Provider by the second merge (in order of first appearance)
+        dataExpected = dataClaims[dataClaims['BeneID'].isin(dataBeneficiary['BeneID'])]
+        dataExpected = dataExpected.iloc[np.argsort(pd.factorize(dataExpected['BeneID'])[0], kind='stable')]
+        dataExpected = dataExpected[dataExpected['Provider'].isin(dataProvider['Provider'])]
+        dataExpected = dataExpected.iloc[np.argsort(pd.factorize(dataExpected['Provider'])[0], kind='stable')]
+
+        # The claims of each Provider are contiguous
+        assert (dataMerged['Provider'] != dataMerged['Provider'].shift()).sum() == dataMerged['Provider'].nunique()
+
+    else:
+
+        dataExpected = dataClaims[dataClaims['BeneID'].isin(dataBeneficiary['BeneID']) &
+                                  dataClaims['Provider'].isin(dataProvider['Provider'])]
+
+    np.testing.assert_array_equal(dataMerged['ClaimID'], dataExpected['ClaimID'])
+
+def test_enrich_keeps_the_order_of_the_claims(datasets):
+
+    dataProvider, dataBeneficiary, dataInpatient, dataOutpatient = datasets
+    dataClaims = pd.concat([dataInpatient, dataOutpatient], ignore_index=True).sample(frac=1, random_state=0)
+
+    dataEnriched = ClaimEnricher(dataProvider, dataBeneficiary).enrich(dataClaims)
+    isMatched = dataClaims['BeneID'].isin(dataBeneficiary['BeneID']) & \
+                dataClaims['Provider'].isin(dataProvider['Provider'])
+
+    np.testing.assert_array_equal(dataEnriched['ClaimID'], dataClaims.loc[isMatched, 'ClaimID'])
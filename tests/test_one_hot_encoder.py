@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytest
+from custom_package.one_hot_encoder import OneHotEncoder, SparseOneHotEncoder
+
+FEATURES = ['Gender', 'State', 'RenalDiseaseIndicator']
+
+def getDataset(countDatapoints=1000, randomState=0):
+    '''
+    Returns a dataset having a numerical feature and categorical features (with empty values).
+    '''
+
+    rng = np.random.default_rng(randomState)
+
+    data = pd.DataFrame({'Age': rng.integers(20, 100, countDatapoints).astype(float),
+                         'Gender': rng.choice(['F', 'M'], countDatapoints),
+                         'State': rng.choice([1, 2, 10, 39, np.nan], countDatapoints),
+                         'RenalDiseaseIndicator': rng.choice(['Y', '0'], countDatapoints).astype(object)})
+
+    # Empty values as read by pandas.read_csv
+    data.loc[rng.random(countDatapoints) < 0.2, 'RenalDiseaseIndicator'] = np.nan
+
+    return data
+
+def assertSameEncoding(xTrain, xTest):
+    '''
+    Checks that SparseOneHotEncoder gives the same matrix as OneHotEncoder.
+    '''
+
+    expected = OneHotEncoder(FEATURES).fit(xTrain).transform(xTest)
+    actual = SparseOneHotEncoder(FEATURES).fit(xTrain).transform(xTest)
+
+    assert actual.shape == expected.shape
+    np.testing.assert_array_equal(actual.toarray(), expected.toarray())
+
+def test_same_encoding_as_one_hot_encoder():
+
+    X = getDataset()
+
+    assertSameEncoding(X, X)
+    assertSameEncoding(X.iloc[:500], X.iloc[500:])
+
+def test_unseen_categories_are_ignored():
+
+    X = getDataset()
+
+    assertSameEncoding(X[X['Gender'] == 'F'], X)
+
+@pytest.mark.parametrize('unusedCategory', ['U', 'Z'])
+def test_unused_categories_are_not_encoded(unusedCategory):
+
+    X = getDataset()
+    xCategorical = X.copy()
+
+    for feature in ['Gender', 'RenalDiseaseIndicator']:
+        xCategorical[feature] = pd.Categorical(X[feature], categories=sorted(X[feature].dropna().unique().tolist() +
+                                                                             [unusedCategory]))
+
+    assertSameEncoding(xCategorical, xCategorical)
+    assertSameEncoding(xCategorical, X)
+
+def test_values_are_tokenized_on_whitespace():
+
+    X = pd.DataFrame({'Age': [70.0, 65.0, 80.0, 75.0, 60.0],
+                      'Gender': ['F', 'M', 'F', 'M', 'F'],
+                      'State': ['New York', 'new  jersey', 'York York', 'Ohio', np.nan],
+                      'RenalDiseaseIndicator': ['Y', '0', 'Y', '0', 'Y']})
+
+    encoder = SparseOneHotEncoder(FEATURES).fit(X)
+
+    # A value having several tokens sets the feature of each token, and a repeated token is counted (the one-hot encoded
+    # features of 'State' follow 'Age' and the 2 features of 'Gender')
+    assert list(encoder.vocabulary['State']) == ['jersey', 'nan', 'new', 'ohio', 'york']
+    np.testing.assert_array_equal(encoder.transform(X).toarray()[:, 3:8], [[0, 0, 1, 0, 1],
+                                                                           [1, 0, 1, 0, 0],
+                                                                           [0, 0, 0, 0, 2],
+                                                                           [0, 0, 0, 1, 0],
+                                                                           [0, 1, 0, 0, 0]])
+
+    assertSameEncoding(X, X)
+    assertSameEncoding(X.iloc[:2], pd.concat([X, X.assign(State=['Texas', 'york', 'new  mexico', 'Ohio', 'A B'])]))
@@ -0,0 +1,105 @@
+import numpy as np
+import pandas as pd
+import pytest
+from benchmarks.synthetic import GenerateDatasets
+from custom_package.data_preprocessing import PreprocessData
+from custom_package.out_of_core import ShardSampler, TrainXGBoostFromShards, WriteClaimShards
+from custom_package.score import GetFeatureColumns
+from custom_package.streaming import FindMaxDate, StreamMergedClaims
+
+CHUNK_SIZE = 1500
+
+@pytest.fixture(scope='module')
+def claimShards(tmp_path_factory):
+    '''
+    Writes the generated datasets as CSV files and their claims as feature shards, and returns the Provider and
+    Beneficiary data, the paths of the claims files, the maximum date and the directory of the shards.
+    '''
+
+    path = tmp_path_factory.mktemp('shards')
+    listFiles = list() # List to store the path of each file.
+
+    for name, data in zip(['Provider', 'Beneficiary', 'Inpatient', 'Outpatient'], GenerateDatasets(5000)):
+
+        listFiles.append(str(path / (name + '.csv')))
+        data.to_csv(listFiles[-1], index=False)
+
+    dataProvider, dataBeneficiary = pd.read_csv(listFiles[0]), pd.read_csv(listFiles[1])
+    maxDate = FindMaxDate(listFiles[2:])
+    shardDir = str(path / 'shards')
+
+    WriteClaimShards(dataProvider, dataBeneficiary, listFiles[2:], shardDir, chunkSize=CHUNK_SIZE)
+
+    return dataProvider, dataBeneficiary, listFiles[2:], maxDate, shardDir
+
+def test_shards_give_the_features_of_the_whole_dataset(claimShards):
+
+    dataProvider, dataBeneficiary, claimFiles, maxDate, shardDir = claimShards
+    shardSampler = ShardSampler(shardDir)
+
+    # Features of the whole dataset, preprocessed at once
+    dataMerged = pd.concat(list(StreamMergedClaims(dataProvider, dataBeneficiary, claimFiles, CHUNK_SIZE)),
+                           ignore_index=True)
+    data = PreprocessData(dataMerged, maxDate=maxDate, dropEmptyColumns=False)
+
+    listShards = list(shardSampler)
+    xShards = pd.concat([xData for xData, _, _ in listShards], ignore_index=True)
+    yShards = np.concatenate([yData for _, yData, _ in listShards])
+
+    assert len(shardSampler) > 1
+    assert list(xShards.columns) == [col for col in data.columns if col != 'PotentialFraud']
+    assert all(weights is None for _, _, weights in listShards)
+    pd.testing.assert_frame_equal(xShards, data[xShards.columns].astype(np.float32))
+    np.testing.assert_array_equal(yShards, data['PotentialFraud'])
+    assert sum(shard['positives'] for shard in shardSampler.manifest['shards']) == data['PotentialFraud'].sum()
+
+def test_resampling_is_the_same_at_each_pass(claimShards):
+
+    shardDir = claimShards[-1]
+    shardSampler = ShardSampler(shardDir, majorityFraction=0.3, minorityWeight=2.0, randomState=7)
+
+    firstPass, secondPass = list(shardSampler), list(ShardSampler(shardDir, 0.3, 2.0, randomState=7))
+
+    for (xFirst, yFirst, weightsFirst), (xSecond, ySecond, weightsSecond), shard in zip(
+            firstPass, secondPass, shardSampler.manifest['shards']):
+
+        pd.testing.assert_frame_equal(xFirst, xSecond)
+        np.testing.assert_array_equal(yFirst, ySecond)
+        np.testing.assert_array_equal(weightsFirst, weightsSecond)
+
+        # All the positive rows are kept, with the minority weight, and only a part of the negative rows
+        assert (yFirst == 1).sum() == shard['positives']
+        assert (yFirst == 0).sum() < 0.5*(shard['rows'] - shard['positives'])
+        np.testing.assert_array_equal(weightsFirst, np.where(yFirst == 1, 2.0, 1.0))
+
+    # Another seed gives another sample
+    assert not all(x.shape == xOther.shape and (x.index == xOther.index).all() for (x, _, _), (xOther, _, _) in
+                   zip(firstPass, ShardSampler(shardDir, 0.3, 2.0, randomState=8)))
+
+@pytest.mark.parametrize('useCacheDir', [False, True])
+def test_train_xgboost_from_shards(claimShards, tmp_path, useCacheDir):
+
+    xgb = pytest.importorskip('xgboost')
+
+    shardDir = claimShards[-1]
+    booster = TrainXGBoostFromShards(shardDir, params={'max_depth': 3}, numBoostRound=10,
+                                     cacheDir=str(tmp_path / 'cache') if useCacheDir else None, majorityFraction=0.5)
+
+    # The shards keep the columns having all empty values, which the Booster is trained with
+    featureColumns = ShardSampler(shardDir).manifest['featureColumns']
+    assert 'ClmProcedureCode_6' in featureColumns
+    assert booster.feature_names == featureColumns
+    assert booster.num_boosted_rounds() == 10
+
+    # The features of the shards are saved with the Booster, so that the scored claims can be reindexed to them
+    booster.save_model(str(tmp_path / 'model.json'))
+    model = xgb.XGBClassifier()
+    model.load_model(str(tmp_path / 'model.json'))
+
+    assert GetFeatureColumns(model) == featureColumns
+
+    xData, yData, _ = ShardSampler(shardDir).getShard(0)
+    predProb = model.predict_proba(xData)[:, 1]
+
+    assert np.all((predProb > 0) & (predProb < 1))
+    assert predProb[yData == 1].mean() > predProb[yData == 0].mean()
@@ -0,0 +1,31 @@
+import numpy as np
+import pandas as pd
+import pytest
+from benchmarks.synthetic import GenerateDatasets
+from custom_package.data_preprocessing import PreprocessData
+from custom_package.merge_datasets import MergeDatasets
+from custom_package.parallel_preprocessing import ParallelPreprocessData
+
+@pytest.fixture(scope='module')
+def dataset():
+    return MergeDatasets(*GenerateDatasets(3000))
+
+def test_same_features_as_preprocess_data(dataset):
+
+    data = dataset.copy()
+
+    # Code column read as mixed numbers and strings, as pandas.read_csv does for the large files
+    isNumber = (data['ClmDiagnosisCode_1'] == '4019').to_numpy() & (np.arange(data.shape[0]) % 2 == 0)
+    data['ClmDiagnosisCode_1'] = data['ClmDiagnosisCode_1'].astype(object)
+    data.loc[isNumber, 'ClmDiagnosisCode_1'] = 4019
+    assert isNumber.any()
+
+    expected = PreprocessData(data.copy())
+    actual = ParallelPreprocessData(data, countWorkers=2, countPartitions=3)
+
+    pd.testing.assert_frame_equal(actual, expected, check_dtype=False)
+
+def test_max_date_without_dates(dataset):
+
+    with pytest.raises(ValueError, match='maxDate'):
+        ParallelPreprocessData(dataset.drop(columns=['ClaimEndDt', 'DischargeDt']), countWorkers=1)
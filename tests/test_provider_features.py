@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+import pytest
+from custom_package.provider_features import ProviderFeatureStore
+
+def getClaims(providers, countClaims=500, randomState=0):
+    '''
+    Returns a chunk of claims of the given Providers.
+    '''
+
+    rng = np.random.default_rng(randomState)
+
+    dataClaims = pd.DataFrame({'Provider': np.asarray(providers, dtype=object)[rng.integers(0, len(providers),
+                                                                                            countClaims)],
+                               'BeneID': rng.integers(0, 100, countClaims),
+                               'InscClaimAmtReimbursed': rng.integers(0, 5000, countClaims).astype(float),
+                               'DeductibleAmtPaid': rng.choice([0, 1068, np.nan], countClaims),
+                               'AdmissionDt': rng.choice(['2009-01-01', np.nan], countClaims),
+                               'AttendingPhysician': rng.choice(['PHY1', 'PHY2', 'PHY3', np.nan], countClaims),
+                               'OperatingPhysician': rng.choice([1.5, 2.5, np.nan], countClaims)})
+    dataClaims['BeneID'] = dataClaims['BeneID'].map(lambda value: 'BENE%d' % value)
+
+    return dataClaims
+
+# The vocabularies having values of several types are built as object Indexes, without the FutureWarning of pandas
+@pytest.mark.filterwarnings('error::FutureWarning')
+@pytest.mark.parametrize('providers', [['PRV51001', 'PRV51003', 'PRV51004'], [51001, 51003, 51004],
+                                       ['PRV51001', 51003, 51004.5]])
+def test_save_and_load_keep_the_values(tmp_path, providers):
+
+    dataClaims = getClaims(providers)
+    store = ProviderFeatureStore().update(dataClaims.iloc[:300])
+
+    path = str(tmp_path / 'ProviderFeatures.npz')
+    store.save(path)
+    storeLoaded = ProviderFeatureStore.load(path)
+
+    for name, vocabulary in store.vocabulary.items():
+        assert storeLoaded.vocabulary[name].tolist() == vocabulary.tolist()
+        assert [type(value) for value in storeLoaded.vocabulary[name]] == [type(value) for value in vocabulary]
+
+    pd.testing.assert_frame_equal(storeLoaded.join(dataClaims), store.join(dataClaims))
+    assert (storeLoaded.join(dataClaims)['ProvClaimCount'] > 0).all()
+
+    # The loaded store is updated as the original store
+    pd.testing.assert_frame_equal(storeLoaded.update(dataClaims.iloc[300:]).getFeatures(),
+                                  store.update(dataClaims.iloc[300:]).getFeatures())
+
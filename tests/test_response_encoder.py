@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+from benchmarks.reference import fitResponseTableLoop
+from custom_package.response_encoder import ResponseEncoder
+
+CATEGORICAL_FEATURES = ['State', 'County']
+
+def getDataset(countDatapoints=2000, randomState=0):
+    '''
+    Returns a dataset having the categorical features (with rare values) and its class labels.
+    '''
+
+    rng = np.random.default_rng(randomState)
+    X = pd.DataFrame({'State': rng.integers(1, 40, countDatapoints), 'County': rng.zipf(1.5, countDatapoints) % 500,
+                      'Age': rng.normal(70, 10, countDatapoints)})
+    y = pd.Series((rng.random(countDatapoints) < 0.1 + 0.01*X['State']).astype(int), name='PotentialFraud')
+
+    return X, y
+
+def test_same_response_tables_as_loop():
+
+    X, y = getDataset()
+    responseEncoder = ResponseEncoder(CATEGORICAL_FEATURES, 'PotentialFraud').fit(X, y)
+    expected = fitResponseTableLoop(X, y, CATEGORICAL_FEATURES, 'PotentialFraud')
+
+    for feature in CATEGORICAL_FEATURES:
+        pd.testing.assert_frame_equal(responseEncoder.responseTable[feature], expected[feature], check_dtype=False)
+
+@pytest.mark.parametrize('smoothing', [0, 1, 20])
+def test_smoothing(smoothing):
+
+    X, y = getDataset()
+    responseTable = ResponseEncoder(['County'], 'PotentialFraud', smoothing=smoothing).fit(X, y).responseTable['County']
+
+    # Probabilities computed from the counts: (count + smoothing * prior) / (total count + smoothing)
+    counts = pd.crosstab(X['County'], y)
+    prior = y.value_counts(normalize=True).sort_index()
+    expected = (counts + smoothing*prior)/(counts.sum(axis=1).to_numpy()[:, np.newaxis] + smoothing)
+
+    np.testing.assert_array_equal(responseTable['County'], counts.index)
+    np.testing.assert_array_equal(responseTable[['CountyClass0', 'CountyClass1']], counts)
+    np.testing.assert_allclose(responseTable[['County_0', 'County_1']], expected)
+    np.testing.assert_allclose(responseTable[['County_0', 'County_1']].sum(axis=1), 1)
+
+    # The rare values are drawn to the prior: the smoothed probabilities are between the unsmoothed ones and the prior
+    unsmoothed = (counts/counts.sum(axis=1).to_numpy()[:, np.newaxis])[1].to_numpy()
+    smoothed = responseTable['County_1'].to_numpy()
+
+    assert np.all(np.abs(smoothed - prior[1]) <= np.abs(unsmoothed - prior[1]) + 1e-12)
+
+def test_unseen_and_empty_values_get_equal_probabilities():
+
+    X, y = getDataset()
+    responseEncoder = ResponseEncoder(['State'], 'PotentialFraud').fit(X, y)
+
+    xTest = pd.DataFrame({'State': [1.0, 1000.0, np.nan], 'County': [1, 2, 3], 'Age': [60.0, 70.0, 80.0]})
+    xEncoded = responseEncoder.transform(xTest)
+
+    expected = responseEncoder.responseTable['State'].set_index('State').loc[1, ['State_0', 'State_1']].to_numpy()
+
+    np.testing.assert_allclose(xEncoded.loc[0, ['State_0', 'State_1']].to_numpy(dtype=np.float64), expected)
+    np.testing.assert_allclose(xEncoded.loc[[1, 2], ['State_0', 'State_1']], 0.5)
+
+def test_index_of_the_input_is_kept():
+
+    X, y = getDataset()
+    responseEncoder = ResponseEncoder(CATEGORICAL_FEATURES, 'PotentialFraud').fit(X, y)
+
+    xTest = X.iloc[::-3].set_index(pd.Index(['CLM%d' % i for i in range(X.iloc[::-3].shape[0])]))
+    xEncoded = responseEncoder.transform(xTest)
+
+    pd.testing.assert_index_equal(xEncoded.index, xTest.index)
+    pd.testing.assert_frame_equal(xEncoded.reset_index(drop=True),
+                                  responseEncoder.transform(xTest.reset_index(drop=True)))
+    assert list(xEncoded.columns) == ['Age', 'State_0', 'State_1', 'County_0', 'County_1']
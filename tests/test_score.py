@@ -0,0 +1,110 @@
+import os
+import sys
+import pickle
+import subprocess
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import GradientBoostingClassifier
+from sklearn.pipeline import Pipeline
+from benchmarks.synthetic import FEATURES_TO_STD, GenerateDatasets
+from custom_package.data_preprocessing import PreprocessData
+from custom_package.merge_datasets import MergeDatasets
+from custom_package.response_encoder import ResponseEncoder
+from custom_package.score import GetFeatureColumns, main
+from custom_package.standardize import Standardize
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAX_DATE = '2009-12-31'
+
+@pytest.fixture(scope='module')
+def scoringFiles(tmp_path_factory):
+    '''
+    Writes the generated source CSV files and a pickled Pipeline trained as in the Modelling notebook (on the
+    PreprocessData output, whose empty columns are left out), and returns their paths and the expected predictions.
+    '''
+
+    path = tmp_path_factory.mktemp('score')
+    listFiles = list() # List to store the path of each source file.
+
+    for name, data in zip(['Provider', 'Beneficiary', 'Inpatient', 'Outpatient'], GenerateDatasets(3000)):
+
+        listFiles.append(str(path / (name + '.csv')))
+        data.to_csv(listFiles[-1], index=False)
+
+    dataMerged = MergeDatasets(*[pd.read_csv(sourceFile) for sourceFile in listFiles])
+    data = PreprocessData(dataMerged.copy(), maxDate=pd.Timestamp(MAX_DATE))
+    xData, yData = data.drop(columns='PotentialFraud'), data['PotentialFraud']
+
+    # The training data has no empty column, which the chunks preprocessed for scoring keep
+    assert 'ClmProcedureCode_6' not in xData.columns
+
+    pipeline = Pipeline([('std', Standardize(numericalFeatures=FEATURES_TO_STD)),
+                         ('resp', ResponseEncoder(categoricalFeatures=['State', 'Country'], className='PotentialFraud')),
+                         ('model', GradientBoostingClassifier(n_estimators=20, random_state=0))]).fit(xData, yData)
+
+    modelFile = str(path / 'Model.pkl')
+
+    with open(modelFile, 'wb') as f:
+        pickle.dump(pipeline, f)
+
+    expected = pd.DataFrame({'ClaimID': dataMerged['ClaimID'].to_numpy(),
+                             'FraudProbability': pipeline.predict_proba(xData)[:, 1]})
+
+    return listFiles + [modelFile], list(xData.columns), expected
+
+def checkPredictions(outputFile, expected):
+    '''
+    Checks that the predictions written to the output file are the expected ones.
+    '''
+
+    predictions = pd.read_csv(outputFile).set_index('ClaimID').loc[expected['ClaimID']]
+
+    np.testing.assert_allclose(predictions['FraudProbability'], expected['FraudProbability'], atol=1e-9)
+    np.testing.assert_array_equal(predictions['PotentialFraud'],
+                                  np.where(expected['FraudProbability'] >= 0.5, 'Yes', 'No'))
+
+def test_feature_columns_of_the_pipeline(scoringFiles):
+
+    files, featureColumns, _ = scoringFiles
+
+    with open(files[-1], 'rb') as f:
+        pipeline = pickle.load(f)
+
+    # The categorical features are encoded after the other features, whatever their position in the input
+    assert sorted(GetFeatureColumns(pipeline)) == sorted(featureColumns)
+    assert [col for col in GetFeatureColumns(pipeline) if col not in ['State', 'Country']] == \
+           [col for col in featureColumns if col not in ['State', 'Country']]
+
+def test_command_line(scoringFiles, tmp_path):
+
+    files, _, expected = scoringFiles
+    outputFile = str(tmp_path / 'Predictions.csv')
+
+    result = subprocess.run([sys.executable, '-m', 'custom_package.score'] + files +
+                            ['--output', outputFile, '--max-date', MAX_DATE, '--chunk-size', '700'],
+                            cwd=ROOT_DIR, capture_output=True, text=True)
+
+    assert result.returncode == 0, result.stderr
+    assert 'Scored %d claims' % expected.shape[0] in result.stdout
+    checkPredictions(outputFile, expected)
+
+def test_command_line_with_cache(scoringFiles, tmp_path, capsys):
+
+    files, featureColumns, expected = scoringFiles
+    outputFile, cacheFile = str(tmp_path / 'Predictions.csv'), str(tmp_path / 'ScoreCache.sqlite')
+
+    # The features given as a file, and the claims scored again from the cache
+    featuresFile = str(tmp_path / 'Features.txt')
+
+    with open(featuresFile, 'w') as f:
+        f.write('\n'.join(featureColumns))
+
+    for run in range(2):
+
+        assert main(files + ['--output', outputFile, '--max-date', MAX_DATE, '--chunk-size', '700',
+                             '--cache', cacheFile, '--features', featuresFile]) == 0
+        checkPredictions(outputFile, expected)
+
+        hits = 0 if run == 0 else expected.shape[0]
+        assert 'Score cache hits: %d ' % hits in capsys.readouterr().out
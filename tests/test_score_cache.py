@@ -0,0 +1,122 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import GradientBoostingClassifier
+from benchmarks.synthetic import GenerateDatasets
+from custom_package.data_preprocessing import PreprocessData
+from custom_package.merge_datasets import MergeDatasets
+from custom_package.score_cache import GetClaimKeys, ScoreCache, ScoreClaimsWithCache
+
+MAX_DATE = pd.Timestamp('2009-12-31')
+
+@pytest.fixture(scope='module')
+def scoringData():
+    '''
+    Returns a merged claims dataset, a model trained on its features and the features of the model.
+    '''
+
+    dataMerged = MergeDatasets(*GenerateDatasets(2000))
+    data = PreprocessData(dataMerged.copy(), maxDate=MAX_DATE)
+    xData = data.drop(columns='PotentialFraud')
+
+    model = GradientBoostingClassifier(n_estimators=10, random_state=0).fit(xData, data['PotentialFraud'])
+
+    return dataMerged, model, list(xData.columns)
+
+def getExpectedProbabilities(data, model, featureColumns):
+    '''
+    Returns the probabilities of the given claims, scored without the cache.
+    '''
+
+    xData = PreprocessData(data.copy(), maxDate=MAX_DATE, dropEmptyColumns=False)
+
+    return model.predict_proba(xData.reindex(columns=featureColumns, fill_value=0))[:, 1]
+
+def test_amended_claim_is_a_miss_and_resubmitted_claim_is_a_hit(scoringData, tmp_path):
+
+    dataMerged, model, featureColumns = scoringData
+    scoreCache = ScoreCache(str(tmp_path / 'cache.sqlite'))
+
+    ScoreClaimsWithCache(dataMerged, model, scoreCache, 'v1', maxDate=MAX_DATE, featureColumns=featureColumns)
+
+    # Resubmit all the claims, one of them being amended
+    dataAmended = dataMerged.copy()
+    dataAmended.loc[dataAmended.index[5], 'InscClaimAmtReimbursed'] += 1000
+
+    dataPredictions = ScoreClaimsWithCache(dataAmended, model, scoreCache, 'v1', maxDate=MAX_DATE,
+                                           featureColumns=featureColumns)
+
+    assert scoreCache.runStats[-1]['Misses'] == 1
+    assert scoreCache.runStats[-1]['Hits'] == dataMerged.shape[0] - 1
+    np.testing.assert_allclose(dataPredictions['FraudProbability'],
+                               getExpectedProbabilities(dataAmended, model, featureColumns))
+
+def test_new_model_version_invalidates_the_cache(scoringData, tmp_path):
+
+    dataMerged, model, featureColumns = scoringData
+    scoreCache = ScoreCache(str(tmp_path / 'cache.sqlite'))
+
+    for modelVersion in ['v1', 'v1', 'v2']:
+        ScoreClaimsWithCache(dataMerged, model, scoreCache, modelVersion, maxDate=MAX_DATE,
+                             featureColumns=featureColumns)
+
+    assert [stats['Misses'] for stats in scoreCache.runStats] == [dataMerged.shape[0], 0, dataMerged.shape[0]]
+
+    # The keys of the claims for another version of the cache are all different
+    claimKeys = GetClaimKeys(dataMerged, '0123456789abcdef')
+
+    assert np.unique(claimKeys).shape[0] == dataMerged.shape[0]
+    assert not np.any(np.isin(claimKeys, GetClaimKeys(dataMerged, 'fedcba9876543210')))
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+
+    scoreCache = ScoreCache(str(tmp_path / 'cache.sqlite'), maxEntries=10)
+
+    scoreCache.put(np.arange(10), np.linspace(0, 1, 10))
+
+    # Mark the first 3 entries as recently used, then add 2 entries: the cache has 12 entries, and 3 of the least
+    # recently used ones are removed (down to 90% of maxEntries)
+    scoreCache.get(np.arange(3))
+    scoreCache.put(np.array([10, 11]), np.array([0.25, 0.75]))
+
+    probabilities = scoreCache.get(np.arange(12))
+
+    assert np.sum(~np.isnan(probabilities)) == 9
+    np.testing.assert_allclose(probabilities[[0, 1, 2, 10, 11]], [0, 1/9, 2/9, 0.25, 0.75])
+
+def test_cached_and_scored_claims_are_in_the_order_of_the_dataset(scoringData, tmp_path):
+
+    dataMerged, model, featureColumns = scoringData
+    scoreCache = ScoreCache(str(tmp_path / 'cache.sqlite'))
+
+    # Half of the claims are cached, then all the claims are scored in another order
+    ScoreClaimsWithCache(dataMerged.iloc[::2], model, scoreCache, 'v1', maxDate=MAX_DATE, featureColumns=featureColumns)
+
+    dataShuffled = dataMerged.sample(frac=1, random_state=0)
+    dataPredictions = ScoreClaimsWithCache(dataShuffled, model, scoreCache, 'v1', maxDate=MAX_DATE,
+                                           featureColumns=featureColumns)
+
+    assert scoreCache.runStats[-1]['Hits'] == dataMerged.iloc[::2].shape[0]
+    pd.testing.assert_index_equal(dataPredictions.index, dataShuffled.index)
+    np.testing.assert_array_equal(dataPredictions['ClaimID'], dataShuffled['ClaimID'])
+    np.testing.assert_allclose(dataPredictions['FraudProbability'],
+                               getExpectedProbabilities(dataShuffled, model, featureColumns))
+    np.testing.assert_array_equal(dataPredictions['PotentialFraud'],
+                                  np.where(dataPredictions['FraudProbability'] >= 0.5, 'Yes', 'No'))
+
+def test_run_stats(scoringData, tmp_path):
+
+    dataMerged, model, featureColumns = scoringData
+    scoreCache = ScoreCache(str(tmp_path / 'cache.sqlite'))
+
+    ScoreClaimsWithCache(dataMerged.iloc[:100], model, scoreCache, 'v1', maxDate=MAX_DATE,
+                         featureColumns=featureColumns)
+    ScoreClaimsWithCache(dataMerged.iloc[:400], model, scoreCache, 'v1', maxDate=MAX_DATE,
+                         featureColumns=featureColumns)
+    ScoreClaimsWithCache(dataMerged.iloc[:0], model, scoreCache, 'v1', maxDate=MAX_DATE, featureColumns=featureColumns)
+
+    assert [{key: stats[key] for key in ['Claims', 'Hits', 'Misses', 'HitRate']} for stats in scoreCache.runStats] == [
+        {'Claims': 100, 'Hits': 0, 'Misses': 100, 'HitRate': 0},
+        {'Claims': 400, 'Hits': 100, 'Misses': 300, 'HitRate': 0.25},
+        {'Claims': 0, 'Hits': 0, 'Misses': 0, 'HitRate': 0}]
+    assert all(stats['Time'] >= 0 for stats in scoreCache.runStats)
@@ -0,0 +1,128 @@
+import json
+import asyncio
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import GradientBoostingClassifier
+from benchmarks.synthetic import GenerateDatasets
+from custom_package.data_preprocessing import PreprocessData
+from custom_package.merge_datasets import MergeDatasets
+from custom_package.scoring_service import ClaimScorer, ScoringService
+
+MAX_DATE = pd.Timestamp('2009-12-31')
+
+@pytest.fixture(scope='module')
+def scorer():
+    '''
+    Returns a ClaimScorer having a Model trained on the generated claims, and the Inpatient claim records.
+    '''
+
+    dataProvider, dataBeneficiary, dataInpatient, dataOutpatient = GenerateDatasets(2000)
+    data = PreprocessData(MergeDatasets(dataProvider, dataBeneficiary, dataInpatient, dataOutpatient), maxDate=MAX_DATE)
+    xData, yData = data.drop(columns='PotentialFraud'), data['PotentialFraud']
+
+    model = GradientBoostingClassifier(n_estimators=10, random_state=0).fit(xData, yData)
+    claimScorer = ClaimScorer(dataProvider, dataBeneficiary, model, maxDate=MAX_DATE, featureColumns=list(xData.columns))
+
+    # Claim records as received in JSON (null for the empty values)
+    records = json.loads(dataInpatient.head(40).to_json(orient='records'))
+
+    return claimScorer, records
+
+async def sendRequest(port, method, path, payload=None):
+    '''
+    Sends an HTTP request to the service and returns the status code and the JSON response.
+    '''
+
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    body = b'' if payload is None else json.dumps(payload).encode('utf-8')
+
+    writer.write(('%s %s HTTP/1.1\r\nHost: localhost\r\nContent-Length: %d\r\nConnection: close\r\n\r\n' %
+                  (method, path, len(body))).encode('latin-1') + body)
+    await writer.drain()
+
+    response = await reader.read()
+    writer.close()
+
+    head, _, payload = response.partition(b'\r\n\r\n')
+
+    return int(head.split(b' ')[1]), json.loads(payload)
+
+def runWithService(service, function):
+    '''
+    Starts the service on a free port, runs the given coroutine function with the port and stops the service.
+    '''
+
+    async def run():
+        port = await service.start()
+        try:
+            return await function(port)
+        finally:
+            await service.stop()
+
+    return asyncio.run(run())
+
+def test_concurrent_requests_are_coalesced(scorer):
+
+    claimScorer, records = scorer
+    service = ScoringService(claimScorer, port=0, maxLatencyMs=500)
+
+    # Requests of several records, including an unknown Beneficiary and an unknown Provider
+    records = [dict(record) for record in records[:20]]
+    records[3]['BeneID'], records[14]['Provider'] = 'BENE-UNKNOWN', 'PRV-UNKNOWN'
+    listRequests = [records[i:i + 5] for i in range(0, 20, 5)]
+
+    async def sendRequests(port):
+        listResponses = await asyncio.gather(*[sendRequest(port, 'POST', '/score', requestRecords)
+                                               for requestRecords in listRequests])
+        return listResponses, await sendRequest(port, 'GET', '/stats')
+
+    listResponses, (statusStats, stats) = runWithService(service, sendRequests)
+
+    expected = claimScorer.score(records)
+
+    for i, (status, results) in enumerate(listResponses):
+
+        assert status == 200
+        expectedRequest = expected.iloc[5*i:5*i + 5]
+
+        assert [result['ClaimID'] for result in results] == expectedRequest['ClaimID'].tolist()
+        np.testing.assert_allclose([np.nan if result['FraudProbability'] is None else result['FraudProbability']
+                                    for result in results], expectedRequest['FraudProbability'])
+
+    # The unmatched records get null predictions
+    for position in [3, 14]:
+        assert listResponses[position//5][1][position % 5]['FraudProbability'] is None
+        assert listResponses[position//5][1][position % 5]['PotentialFraud'] is None
+
+    assert statusStats == 200
+    assert (stats['Requests'], stats['Batches'], stats['Claims']) == (4, 1, 20)
+    assert stats['LatencyP50Ms'] is not None and stats['LatencyP99Ms'] >= stats['LatencyP50Ms']
+
+def test_malformed_request_fails_alone(scorer):
+
+    claimScorer, records = scorer
+    service = ScoringService(claimScorer, port=0, maxLatencyMs=500)
+
+    malformedRecord = dict(records[0], ClaimStartDt='not a date')
+    listRequests = [records[:3], [malformedRecord], records[3:6]]
+
+    async def sendRequests(port):
+        return await asyncio.gather(*[sendRequest(port, 'POST', '/score', requestRecords)
+                                      for requestRecords in listRequests])
+
+    listResponses = runWithService(service, sendRequests)
+
+    assert [status for status, _ in listResponses] == [200, 500, 200]
+    assert [result['ClaimID'] for result in listResponses[2][1]] == [record['ClaimID'] for record in records[3:6]]
+    assert service.counters['Errors'] == 1
+
+def test_invalid_requests(scorer):
+
+    service = ScoringService(scorer[0], port=0)
+
+    async def sendRequests(port):
+        return await asyncio.gather(sendRequest(port, 'POST', '/score', [1, 2]), sendRequest(port, 'GET', '/other'),
+                                    sendRequest(port, 'POST', '/score', []))
+
+    assert [status for status, _ in runWithService(service, sendRequests)] == [400, 404, 200]
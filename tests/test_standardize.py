@@ -0,0 +1,97 @@
+import numpy as np
+import pandas as pd
+import pytest
+from custom_package.fold_cache import FoldCache
+from custom_package.standardize import Standardize
+
+FEATURES = ['Age', 'TotalClaimAmount', 'PhysRoleCount']
+
+def getDataset(countDatapoints=1000, randomState=0):
+    '''
+    Returns a dataset having the numerical features and a text feature.
+    '''
+
+    rng = np.random.default_rng(randomState)
+    data = pd.DataFrame(rng.integers(0, 1000, (countDatapoints, len(FEATURES))).astype(float), columns=FEATURES)
+    data['State'] = rng.choice(['A', 'B'], countDatapoints)
+
+    return data
+
+def test_partial_fit_and_merge_match_fit():
+
+    X = getDataset()
+    standardize = Standardize(FEATURES).fit(X)
+
+    first = Standardize(FEATURES).partial_fit(X.iloc[:300]).partial_fit(X.iloc[300:500])
+    second = Standardize(FEATURES).partial_fit(X.iloc[500:])
+    first.merge(second)
+
+    np.testing.assert_allclose(first.standardScaler.mean_, standardize.standardScaler.mean_)
+    np.testing.assert_allclose(first.standardScaler.scale_, standardize.standardScaler.scale_)
+    pd.testing.assert_frame_equal(first.transform(X), standardize.transform(X))
+
+def test_merge_rejects_other_features():
+
+    X = getDataset()
+
+    with pytest.raises(ValueError):
+        Standardize(FEATURES).fit(X).merge(Standardize(FEATURES[:2]).fit(X))
+
+@pytest.mark.parametrize('update', ['partial_fit', 'merge'])
+def test_cached_transform_after_update_is_not_stale(tmp_path, update):
+
+    X = getDataset()
+    standardize = Standardize(FEATURES, cache=FoldCache(str(tmp_path))).fit(X.iloc[:500])
+    standardize.transform(X)
+
+    if update == 'partial_fit':
+        standardize.partial_fit(X.iloc[500:])
+    else:
+        standardize.merge(Standardize(FEATURES).fit(X.iloc[500:]))
+
+    pd.testing.assert_frame_equal(standardize.transform(X), Standardize(FEATURES).fit(X).transform(X))
+
+def test_transform_array_matches_transform():
+
+    X = getDataset().drop(columns='State')
+    standardize = Standardize(FEATURES).fit(X)
+
+    np.testing.assert_allclose(standardize.transformArray(X), standardize.transform(X).to_numpy())
+
+def test_missing_feature_raises():
+
+    X = getDataset()
+    standardize = Standardize(FEATURES).fit(X)
+
+    with pytest.raises(KeyError):
+        standardize.transformArray(X.drop(columns='Age'))
+
+    with pytest.raises(KeyError):
+        standardize.transform(X.drop(columns='Age'))
+
+def test_other_fitted_features_raise():
+
+    X = getDataset()
+    standardize = Standardize(FEATURES).fit(X)
+    standardize.numericalFeatures = list(reversed(FEATURES))
+
+    with pytest.raises(ValueError):
+        standardize.transform(X)
+
+def test_compacted_features_are_not_upcast():
+
+    X = getDataset()
+    X['Age'] = X['Age'].astype(np.int16)
+    X[['TotalClaimAmount', 'PhysRoleCount']] = X[['TotalClaimAmount', 'PhysRoleCount']].astype(np.float32)
+    standardize = Standardize(FEATURES).fit(X)
+
+    assert (standardize.transform(X)[FEATURES].dtypes == np.float32).all()
+    assert standardize.transformArray(X.drop(columns='State')).dtype == np.float32
+    assert (Standardize(FEATURES, dtype=np.float64).fit(X).transform(X)[FEATURES].dtypes == np.float64).all()
+
+def test_float64_features_stay_float64():
+
+    X = getDataset()
+    X['Age'] = X['Age'].astype(np.int64)
+
+    assert (Standardize(FEATURES).fit(X).transform(X)[FEATURES].dtypes == np.float64).all()
@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+from benchmarks.synthetic import GenerateDatasets
+from custom_package.data_preprocessing import PreprocessData
+from custom_package.streaming import FindMaxDate, InferClaimDtypes, StreamMergedClaims
+
+def writeDatasets(path, countClaims=6000):
+    '''
+    Writes the generated Provider, Beneficiary, Inpatient and Outpatient datasets as CSV files and returns their paths.
+    '''
+
+    listFiles = list() # List to store the path of each file.
+
+    for name, data in zip(['Provider', 'Beneficiary', 'Inpatient', 'Outpatient'], GenerateDatasets(countClaims)):
+
+        listFiles.append(str(path / (name + '.csv')))
+        data.to_csv(listFiles[-1], index=False)
+
+    return listFiles
+
+def test_infer_claim_dtypes(tmp_path):
+
+    inpatientFile, outpatientFile = str(tmp_path / 'Inpatient.csv'), str(tmp_path / 'Outpatient.csv')
+
+    pd.DataFrame({'ClaimID': ['CLM%d' % i for i in range(6)], 'DiagnosisGroupCode': [882, 945, 882, 1, 2, 3],
+                  'ClmDiagnosisCode_1': ['4019', 'V5869', '2724', '4019', '4019', '2724'],
+                  'ClmDiagnosisCode_2': [4019, 2724, 4019, 2724, 4019, 'V5869'],
+                  'ClmDiagnosisCode_9': [4019, 2724, 4019, np.nan, np.nan, np.nan],
+                  'ClmDiagnosisCode_10': [4019, 2724, 4019, 2724, 4019, 2724]}).to_csv(inpatientFile, index=False)
+    pd.DataFrame({'ClaimID': ['CLM6'], 'ClmDiagnosisCode_1': ['4019'], 'ClmDiagnosisCode_2': [4019],
+                  'ClmDiagnosisCode_9': [4019], 'ClmDiagnosisCode_10': ['V5869']}).to_csv(outpatientFile, index=False)
+
+    inpatientDtypes, outpatientDtypes = InferClaimDtypes([inpatientFile, outpatientFile], chunkSize=3)
+
+    # The datatypes of the whole files, as concatenated
+    assert inpatientDtypes == {'DiagnosisGroupCode': np.float64, 'ClmDiagnosisCode_1': object,
+                               'ClmDiagnosisCode_2': object, 'ClmDiagnosisCode_9': np.float64,
+                               'ClmDiagnosisCode_10': np.int64}
+    assert outpatientDtypes == {'ClmDiagnosisCode_1': np.int64, 'ClmDiagnosisCode_2': np.int64,
+                                'ClmDiagnosisCode_9': np.float64, 'ClmDiagnosisCode_10': object}
+
+def test_streamed_chunks_give_the_features_of_the_merged_dataset(tmp_path):
+
+    providerFile, beneficiaryFile, inpatientFile, outpatientFile = writeDatasets(tmp_path)
+    dataProvider, dataBeneficiary, dataInpatient, dataOutpatient = [
+        pd.read_csv(sourceFile) for sourceFile in [providerFile, beneficiaryFile, inpatientFile, outpatientFile]]
+    maxDate = FindMaxDate([inpatientFile, outpatientFile])
+
+    # Original merge of the datasets read as a whole
+    dataMerged = pd.merge(pd.merge(pd.concat([dataInpatient, dataOutpatient]), dataBeneficiary, on='BeneID'),
+                          dataProvider, on='Provider')
+    dataStreamed = pd.concat(list(StreamMergedClaims(dataProvider, dataBeneficiary, [inpatientFile, outpatientFile],
+                                                     chunkSize=1000)), ignore_index=True)
+
+    xMerged = PreprocessData(dataMerged, maxDate=maxDate, dropEmptyColumns=False)
+    xStreamed = PreprocessData(dataStreamed, maxDate=maxDate, dropEmptyColumns=False)
+    xMerged.index, xStreamed.index = dataMerged['ClaimID'].to_numpy(), dataStreamed['ClaimID'].to_numpy()
+
+    pd.testing.assert_frame_equal(xStreamed.loc[xMerged.index, xMerged.columns], xMerged, check_dtype=False)